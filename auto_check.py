@@ -5,26 +5,46 @@ YouTube チャンネル統計 自動チェックスクリプト
 GitHub Actionsで定期実行される（JST 00:00）
 
 - 全アーティストのチャンネル統計・動画データを収集
-- Movie/Short/LiveArchive自動判別（並列処理）
+- Movie/Short/LiveArchive自動判別（並列処理、判定結果は shorts_cache.json にキャッシュ）
 - video_flags.json による例外設定対応
 - チャンネルIDキャッシュで無駄なAPIコールを削減
+- all_snapshots.json は実行開始時に1回読み込み、終了時に1回だけ書き出す
+- API使用量・レイテンシ・段階ごとの所要時間を run_metrics.json に記録
+- チャンネルごとの完了段階を run_journal.jsonl に記録し、同じ日の再実行は続きから処理
+- API呼び出しはエンドポイントごとの適応的な流量制御・ジッター付きリトライ・実行期限の下で行い、
+  クォータ切れ・期限切れの後は新しい呼び出しをしない（request_control.py）
 - データ保存先:
     all_snapshots.json            : 全アーティストの最新スナップショット
-    history_{channel_name}.json   : チャンネルごとの動画履歴（日次集約済み）
+    history_{channel_name}.json   : チャンネルごとの動画履歴（日次集約済み、列指向コンパクト形式）
+    history.sqlite3               : 履歴の SQLite 版（集計・横断クエリ用。history_*.json から作り直せる）
 """
 
 import os
 import sys
 import json
+import asyncio
 import requests
 import threading
 import tempfile
 from datetime import datetime, timezone, timedelta
 from googleapiclient.discovery import build
-from googleapiclient.errors import HttpError
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from googleapiclient.http import BatchHttpRequest
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
 import time
 import isodate
+import history_store
+import history_shards
+import history_series
+import history_analytics
+import history_db
+import history_queries
+import history_anomalies
+import rankings
+import publish_data
+import run_journal
+import request_control
+from history_store import history_file
+from run_metrics import RunMetrics, endpoint_name, print_run, METRICS_FILE
 
 # ----------------------------------------------------------------
 # 設定
@@ -37,16 +57,74 @@ try:
 except Exception:
     CHANNELS = []
 
-MAX_WORKERS = 10       # Short判定の同時並列数
+MAX_WORKERS = 10       # Short判定の同時並列数（全チャンネル合計の上限）
 CHANNEL_WORKERS = 3   # チャンネル処理の同時並列数
 
+# 動画詳細（videos().list）の取得方法
+#   'global' : 全チャンネルの動画IDをまとめて50件単位で一括取得
+#   'channel': チャンネルごとに取得（従来方式）
+STATS_FETCH = 'global'
+STATS_FETCH_WORKERS = 4   # 'global' の同時並列数
+STATS_BATCH_CALLS = 0     # >0 なら BatchHttpRequest で N回分を1往復にまとめる（0 = 並列プール）
+
+# 収集エンジン
+#   'thread': スレッドプール（STATS_FETCH に従う）
+#   'async' : 全チャンネルの API 呼び出し・Short判定をコルーチンで重ね、
+#             エンドポイントごとの同時リクエスト数を ASYNC_LIMITS で抑える（--engine async）
+ENGINE = 'thread'
+ASYNC_LIMITS = {
+    'channels': 4,
+    'playlistItems': 4,
+    'videos': STATS_FETCH_WORKERS,
+    'shorts': MAX_WORKERS,
+    'local': CHANNEL_WORKERS,  # タイプ判定・保存（API呼び出しなし）
+}
+
+# ローカルの検証用サーバー（bench/fake_youtube.py）に向ける場合のみ設定
+API_ENDPOINT = os.environ.get('YOUTUBE_API_ENDPOINT')
+WEB_ENDPOINT = os.environ.get('YOUTUBE_WEB_ENDPOINT', 'https://www.youtube.com')  # Short判定のアクセス先
+
+SHORT_MAX_SECONDS = 180                # これより長い動画は Short になり得ないので判定を省略
+SHORTS_CACHE_FILE = 'shorts_cache.json'  # Short判定結果のキャッシュ（動画ID → true/false）
+
 SNAPSHOTS_FILE = 'all_snapshots.json'
+SNAPSHOT_CHECKPOINT_EVERY = 0  # N チャンネル更新ごとに途中保存（0 = 実行終了時の1回のみ）
+
+DISCOVERY_FULL_SWEEP_DAYS = 7  # 動画一覧の全件取得の間隔（日）。それ以外の日はキャッシュ済み動画で打ち切る差分取得
+
+# 実行メトリクス（API使用量・レイテンシ・段階ごとの所要時間）を METRICS_FILE に追記
+metrics = RunMetrics()
+
+# API呼び出しの流量制御（エンドポイントごとの送信速度・リトライ・実行期限。request_control.py）
+RUN_DEADLINE_SEC = 40 * 60   # 実行開始からこの秒数を過ぎたら新しいAPI呼び出しをしない（0 = 無制限。--deadline）
+RETRY_PASS_WAIT = 30         # 失敗チャンネルをリトライするまでの待ち時間（秒）
+controller = request_control.RequestController(on_call=metrics.record_call, on_retry=metrics.record_retry)
+
+HISTORY_JOURNAL = True     # 履歴は日次差分をジャーナルへ追記（本体は畳み込み時のみ書き換え）
+HISTORY_COMPACT_DAYS = 7   # ジャーナルがこの日数分たまったら本体へ畳み込む
+HISTORY_SHARDS = True      # Web用に月別シャード history/{talent}/{YYYY-MM}.json と manifest も更新
+SERIES_FILES = True        # Webのグラフ用に間引いた動画別推移 series_{talent}.json も更新
+ANALYTICS_FILES = True     # 動画別の伸びの指標（移動平均・伸び率・予測）analytics_{talent}.json も更新（NumPy が必要）
+PUBLISH_DATA = True        # Web公開用に minify・ハッシュ付きファイル名で data/ に書き出す
+HISTORY_DB = False         # 履歴を history.sqlite3 にも書き込み、summary の全件再集計は SQLite で行う（history_db.py。
+                           # ローカル専用のファイルなので、毎回まっさらな環境で動く CI では取り込み直しになる。--history-db）
+
+# チャンネルごとの完了段階（統計・動画一覧・Short判定・動画リスト・履歴）を run_journal.jsonl に記録し、
+# 同じ日の再実行では完了済みの段階を飛ばす（--fresh で記録を捨てて最初から）
+RUN_JOURNAL = True
+FRESH_RUN = False
+journal = run_journal.RunJournal()
 
-# スナップショット書き込みの排他制御用ロック（並列処理による競合防止）
-_snapshot_lock = threading.Lock()
+# summary の集計前に全履歴の異常値（一時的な0・跳ね・下落）を走査して history_anomalies.json に書き出し、
+# 補正値で集計する（history_anomalies.py。走査には NumPy が必要で、無ければ前回のレポートの補正値を使う）
+ANOMALY_REPAIRS = True
 
-def history_file(channel_name):
-    return f'history_{channel_name}.json'
+# dashboard_summary.json の期間別ランキング（指標・種別・期間ごとの伸びの上位K件。rankings.py）
+RANKING_TOP_K = 20             # Web の表示件数と同じ
+RANKING_WINDOWS = (1, 7, 30)   # 日数
+
+# 全件再集計・series 生成をタレント単位でプロセス並列にする数（1 = 直列。--summary-workers）
+SUMMARY_WORKERS = min(4, os.cpu_count() or 1)
 
 # ----------------------------------------------------------------
 # ファイル読み書き
@@ -68,6 +146,60 @@ def save_json(path, data, indent=2):
         tmp_path = f.name
     os.replace(tmp_path, path)
 
+# ----------------------------------------------------------------
+# スナップショットストア（実行単位でメモリ保持）
+# ----------------------------------------------------------------
+
+class SnapshotStore:
+    """
+    all_snapshots.json を実行開始時に1回だけ読み込み、チャンネルごとの更新は
+    メモリ上で行い、実行終了時に1回だけアトミックに書き出す。
+
+    各チャンネルのエントリは更新時に丸ごと差し替える（中身を書き換えない）ため、
+    読み取り側はロックなしで get_channel() の戻り値を参照してよい。
+    """
+
+    def __init__(self, path=SNAPSHOTS_FILE, checkpoint_every=SNAPSHOT_CHECKPOINT_EVERY):
+        self.path = path
+        self.checkpoint_every = checkpoint_every
+        self._lock = threading.Lock()
+        self._data = load_json(path, {})
+        self._dirty = False
+        self._updates_since_flush = 0
+
+    def get_channel(self, channel_name):
+        return self._data.get(channel_name, {})
+
+    def get_channel_id(self, channel_name):
+        return self.get_channel(channel_name).get('channel_id')
+
+    def get_videos(self, channel_name):
+        return self.get_channel(channel_name).get('videos', {})
+
+    def update_channel(self, channel_name, entry):
+        with self._lock:
+            self._data[channel_name] = entry
+            self._dirty = True
+            self._updates_since_flush += 1
+            checkpoint = (
+                self.checkpoint_every > 0
+                and self._updates_since_flush >= self.checkpoint_every
+            )
+        if checkpoint:
+            self.flush()
+
+    def flush(self):
+        """未保存の更新があればアトミックに書き出す"""
+        with self._lock:
+            if not self._dirty:
+                return False
+            data = dict(self._data)  # チャンネル単位の浅いコピー（エントリは差し替えのみ）
+            self._dirty = False
+            self._updates_since_flush = 0
+        save_json(self.path, data)
+        print(f'  スナップショット保存: {self.path}')
+        return True
+
 # ----------------------------------------------------------------
 # 例外設定
 # ----------------------------------------------------------------
@@ -83,38 +215,109 @@ def load_overrides():
 # APIリトライ
 # ----------------------------------------------------------------
 
-def execute_with_retry(request, max_retries=3):
-    for attempt in range(max_retries + 1):
-        try:
-            return request.execute()
-        except HttpError as e:
-            if e.status_code in (500, 503) and attempt < max_retries:
-                wait = 2 ** attempt
-                print(f'  ⚠️  API {e.status_code}エラー、{wait}秒後にリトライ ({attempt + 1}/{max_retries})')
-                time.sleep(wait)
-                continue
-            raise
+def execute_with_retry(request, retries=None):
+    """
+    API呼び出しを controller（送信速度・ジッター付きリトライ・実行期限）を通して実行する。
+    クォータ切れ・期限切れの後は送信せずに request_control.ApiStopped を送出する
+    """
+    return controller.execute(endpoint_name(request), request.execute, retries)
 
 # ----------------------------------------------------------------
 # Short判定
 # ----------------------------------------------------------------
 
+class ShortVerdictCache:
+    """
+    Short判定結果（動画ID → true/false）のディスクキャッシュ。
+    all_snapshots.json とは独立しているため、スナップショットにない動画
+    （新規タレントのバックフィル、一度消えて戻った動画など）でも判定をやり直さない。
+    初回参照時に読み込み、実行終了時に flush() で1回だけ書き出す。
+    """
+
+    def __init__(self, path=SHORTS_CACHE_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+        self._data = None
+        self._dirty = False
+
+    def _loaded(self):
+        if self._data is None:
+            self._data = load_json(self.path, {})
+        return self._data
+
+    def get(self, video_id):
+        """判定済みなら True/False、未判定なら None"""
+        with self._lock:
+            return self._loaded().get(video_id)
+
+    def update(self, verdicts):
+        if not verdicts:
+            return
+        with self._lock:
+            self._loaded().update(verdicts)
+            self._dirty = True
+
+    def flush(self):
+        with self._lock:
+            if not self._dirty:
+                return False
+            data = dict(self._data)
+            self._dirty = False
+        save_json(self.path, data, indent=None)
+        print(f'  Short判定キャッシュ保存: {self.path}（{len(data)}本）')
+        return True
+
+short_verdicts = ShortVerdictCache()
+
+# Short判定は全チャンネルで1つのセッション（keep-alive）と1つのスレッドプールを共有し、
+# 同時接続数を MAX_WORKERS に抑える
+_short_lock = threading.Lock()
+_short_session = None
+_short_executor = None
+
+def short_session():
+    global _short_session
+    with _short_lock:
+        if _short_session is None:
+            adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=MAX_WORKERS)
+            _short_session = requests.Session()
+            _short_session.mount('https://', adapter)
+            _short_session.mount('http://', adapter)
+        return _short_session
+
+def short_executor():
+    global _short_executor
+    with _short_lock:
+        if _short_executor is None:
+            _short_executor = ThreadPoolExecutor(max_workers=MAX_WORKERS)
+        return _short_executor
+
 def is_short_video(video_id):
-    """ShortsのURLにアクセスしてリダイレクト先で判定"""
-    url = f'https://www.youtube.com/shorts/{video_id}'
-    for attempt in range(3):
-        try:
-            response = requests.head(url, allow_redirects=True, timeout=5)
-            return 'shorts' in response.url.lower()
-        except Exception:
-            if attempt < 2:
-                wait = 2 ** attempt
-                print(f'  ⚠️  Short判定失敗、{wait}秒後にリトライ ({attempt + 1}/2): {video_id}')
-                time.sleep(wait)
-    return False
+    """
+    ShortsのURLにHEADを送り、リダイレクトの有無で判定（リダイレクト先は取得しない）。
+    /shorts/ のまま 200 なら Short、/watch 等へのリダイレクトなら Short ではない。
+    判定できなかった場合は None（キャッシュしない）
+    """
+    url = f'{WEB_ENDPOINT}/shorts/{video_id}'
+
+    def probe():
+        response = short_session().head(url, allow_redirects=False, timeout=5)
+        if response.is_redirect:
+            return 'shorts' in response.headers.get('Location', '').lower()
+        if response.status_code == 200:
+            return True
+        raise request_control.HttpStatusError(response.status_code, response.headers.get('Retry-After'))
+
+    try:
+        return controller.execute('shorts.head', probe, retries=2)
+    except request_control.ApiStopped:
+        return None
+    except Exception as e:
+        print(f'  ⚠️  Short判定失敗: {video_id}（{e}）')
+        return None
 
 def check_shorts_batch(video_ids):
-    """複数動画のShort判定を並列実行"""
+    """複数動画のShort判定を共有プールで並列実行。{動画ID: True/False/None} を返す"""
     results = {}
     if not video_ids:
         return results
@@ -122,36 +325,80 @@ def check_shorts_batch(video_ids):
     print(f'  並列Short判定: {len(video_ids)}本 ({MAX_WORKERS}並列)')
     start = time.time()
 
-    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
-        future_to_id = {executor.submit(is_short_video, vid): vid for vid in video_ids}
-        completed = 0
-        for future in as_completed(future_to_id):
-            vid = future_to_id[future]
-            try:
-                results[vid] = future.result()
-            except Exception:
-                results[vid] = False
-            completed += 1
-            if completed % 20 == 0:
-                print(f'    → {completed}/{len(video_ids)}本完了')
+    executor = short_executor()
+    future_to_id = {executor.submit(is_short_video, vid): vid for vid in video_ids}
+    completed = 0
+    for future in as_completed(future_to_id):
+        vid = future_to_id[future]
+        try:
+            results[vid] = future.result()
+        except Exception:
+            results[vid] = None
+        completed += 1
+        if completed % 20 == 0:
+            print(f'    → {completed}/{len(video_ids)}本完了')
 
     elapsed = time.time() - start
     short_count = sum(1 for v in results.values() if v)
     print(f'  Short判定完了: {elapsed:.1f}秒 ({short_count}本がShort)')
     return results
 
+@metrics.timed('shorts')
+def classify_shorts(items):
+    """
+    動画（videos().list の item）の Short 判定。{動画ID: bool} を返す。
+    1. 再生時間が SHORT_MAX_SECONDS を超える動画は Short ではない（アクセス不要）
+    2. Short判定キャッシュにあればそれを使う
+    3. 残りだけ HEAD で判定し、判定できたものをキャッシュに記録
+    """
+    results, probe_ids = short_candidates(items)
+    probed = check_shorts_batch(probe_ids)
+    record_short_verdicts(results, probed)
+    return results
+
+def short_candidates(items):
+    """
+    再生時間とキャッシュで判定できる分を埋め、({動画ID: bool}, 要判定の動画ID) を返す
+    """
+    results = {}
+    probe_ids = []
+    long_count = cached_count = 0
+    for item in items:
+        vid = item['id']
+        if get_duration_seconds(item) > SHORT_MAX_SECONDS:
+            results[vid] = False
+            long_count += 1
+            continue
+        verdict = short_verdicts.get(vid)
+        if verdict is not None:
+            results[vid] = verdict
+            cached_count += 1
+            continue
+        probe_ids.append(vid)
+
+    print(f'  Short判定: 長尺で除外 {long_count}本 / キャッシュ {cached_count}本 / 要判定 {len(probe_ids)}本')
+    return results, probe_ids
+
+def record_short_verdicts(results, probed):
+    """HEAD判定の結果を results に反映し、判定できたものをキャッシュに記録"""
+    short_verdicts.update({vid: v for vid, v in probed.items() if v is not None})
+    results.update({vid: bool(v) for vid, v in probed.items()})
+
 # ----------------------------------------------------------------
 # 動画タイプ判定
 # ----------------------------------------------------------------
 
-def get_duration_minutes(video):
+def get_duration_seconds(video):
     try:
         duration_str = video['contentDetails']['duration']
         duration = isodate.parse_duration(duration_str)
-        return duration.total_seconds() / 60
+        return duration.total_seconds()
     except Exception:
         return 0
 
+def get_duration_minutes(video):
+    return get_duration_seconds(video) / 60
+
 def determine_video_type(video, short_cache, overrides, channel_name):
     """
     判定順序:
@@ -189,6 +436,18 @@ def determine_video_type(video, short_cache, overrides, channel_name):
 # YouTube API
 # ----------------------------------------------------------------
 
+def build_youtube():
+    if API_ENDPOINT:
+        return build('youtube', 'v3', developerKey=API_KEY,
+                     client_options={'api_endpoint': API_ENDPOINT})
+    return build('youtube', 'v3', developerKey=API_KEY)
+
+def new_batch_request(youtube, callback):
+    if API_ENDPOINT:
+        return BatchHttpRequest(callback=callback, batch_uri=API_ENDPOINT.rstrip('/') + '/batch')
+    return youtube.new_batch_http_request(callback=callback)
+
+@metrics.timed('id_lookup')
 def get_channel_id(youtube, channel_url):
     """チャンネルURLからチャンネルIDを取得"""
     try:
@@ -212,6 +471,7 @@ def get_channel_id(youtube, channel_url):
         print(f'  ⚠️  チャンネルID取得エラー: {e}')
     return None
 
+@metrics.timed('stats')
 def get_channel_stats(youtube, channel_id):
     """チャンネル統計を取得"""
     try:
@@ -237,216 +497,402 @@ def get_channel_stats(youtube, channel_id):
         print(f'  ⚠️  チャンネル統計取得エラー: {e}')
     return None
 
-def get_all_videos(youtube, channel_id, channel_name, overrides):
-    """チャンネルの全動画を取得してタイプ判定（Short判定はキャッシュ活用）"""
-    snapshots = load_json(SNAPSHOTS_FILE, {})
-    cached_videos = snapshots.get(channel_name, {}).get('videos', {})
+@metrics.timed('stats')
+def get_uploads_playlist_id(youtube, channel_id):
+    """チャンネルのアップロード再生リストIDを取得"""
+    resp = execute_with_retry(youtube.channels().list(
+        part='contentDetails', id=channel_id
+    ))
+    if not resp['items']:
+        return None
+    return resp['items'][0]['contentDetails']['relatedPlaylists']['uploads']
 
-    for attempt in range(3):
-        videos = []
-        try:
-            resp = execute_with_retry(youtube.channels().list(
-                part='contentDetails', id=channel_id
+VIDEO_PARTS = 'snippet,statistics,liveStreamingDetails,contentDetails,status'
+
+def list_upload_ids(youtube, playlist_id, cached_videos=None):
+    """
+    アップロード再生リストの動画IDを新しい順に返す。
+    cached_videos を渡すと、全件キャッシュ済みのページが出た時点でページングを打ち切り、
+    新規ID＋キャッシュ済みIDを返す（差分取得）。
+    """
+    ids = []
+    new_ids = []
+    pages = 0
+    next_page_token = None
+    while True:
+        playlist_resp = execute_with_retry(youtube.playlistItems().list(
+            part='snippet',
+            playlistId=playlist_id,
+            maxResults=50,
+            pageToken=next_page_token
+        ))
+        pages += 1
+        page_ids = [
+            item['snippet']['resourceId']['videoId']
+            for item in playlist_resp['items']
+        ]
+        next_page_token = playlist_resp.get('nextPageToken')
+
+        if cached_videos is None:
+            ids.extend(page_ids)
+            if not next_page_token:
+                break
+            continue
+
+        page_new = [vid for vid in page_ids if vid not in cached_videos and vid not in new_ids]
+        new_ids.extend(page_new)
+        if not page_new or not next_page_token:
+            break
+
+    if cached_videos is None:
+        print(f'  全件取得: 再生リスト{pages}ページ / {len(ids)}本')
+        return ids
+    print(f'  差分取得: 再生リスト{pages}ページ / 新規{len(new_ids)}本 / キャッシュ済み{len(cached_videos)}本')
+    return new_ids + list(cached_videos)
+
+@metrics.timed('paging')
+def list_channel_video_ids(youtube, playlist_id, cached_videos, full_sweep):
+    """
+    動画ID一覧を取得。失敗時は None
+    （一時的な 404 playlistNotFound は controller がそのページだけをバックオフしてリトライする）
+    """
+    try:
+        if full_sweep:
+            return list_upload_ids(youtube, playlist_id)
+        return list_upload_ids(youtube, playlist_id, cached_videos)
+    except Exception as e:
+        print(f'  ⚠️  動画取得エラー: {e}')
+        return None
+
+@metrics.timed('videos')
+def fetch_video_items(youtube, video_ids):
+    """動画の詳細を 50件ずつ videos().list で取得（IDの順序を保つ）"""
+    items = []
+    for i in range(0, len(video_ids), 50):
+        videos_resp = execute_with_retry(youtube.videos().list(
+            part=VIDEO_PARTS,
+            id=','.join(video_ids[i:i + 50])
+        ))
+        items.extend(videos_resp['items'])
+        print(f'  取得中... {len(items)}本')
+    return items
+
+def is_public(item):
+    return item.get('status', {}).get('privacyStatus', 'public') == 'public'
+
+def build_video_list(youtube, items, channel_name, overrides, cached_videos, short_cache=None):
+    """
+    videos().list の結果をタイプ判定して動画リストにする（Short判定はキャッシュ活用）。
+    short_cache を渡すと新規動画のShort判定を行わずにそれを使う（非同期エンジンで判定済みの場合）
+    """
+    videos = []
+    restore_short_verdicts(channel_name)
+
+    # 新規動画（キャッシュにないもの）のみShort判定
+    new_items = [
+        item for item in items
+        if item['id'] not in cached_videos
+    ]
+    if short_cache is None:
+        short_cache = {}
+        if new_items:
+            print(f'  新規動画 {len(new_items)}本のShort判定を実行')
+            short_cache = classify_shorts(new_items)
+            record_shorts(channel_name, short_cache)
+
+    for video in items:
+        vid = video['id']
+
+        # キャッシュにtypeがある場合は例外設定のみチェックして再利用
+        if vid in cached_videos:
+            cached_type = cached_videos[vid].get('type', 'Movie')
+            # 例外設定は常に最優先
+            if overrides and channel_name in overrides and vid in overrides[channel_name]:
+                vtype = overrides[channel_name][vid]
+                print(f'  ⚙️  例外設定: [{video["snippet"]["title"][:40]}] → {vtype}')
+            else:
+                vtype = cached_type
+        else:
+            vtype = determine_video_type(video, short_cache, overrides, channel_name)
+
+        videos.append({
+            '動画ID': vid,
+            'タイトル': video['snippet']['title'],
+            '公開日': video['snippet']['publishedAt'][:10],
+            '再生数': int(video['statistics'].get('viewCount', 0)),
+            '高評価数': int(video['statistics'].get('likeCount', 0)),
+            'コメント数': int(video['statistics'].get('commentCount', 0)),
+            'type': vtype,
+            'duration': int(isodate.parse_duration(
+                video['contentDetails'].get('duration', 'PT0S')
+            ).total_seconds()),
+        })
+
+    # グリッチ検知: 高評価・コメント数が0だが過去に非0だった動画を再取得
+    # （過去日の履歴に残った異常値は history_anomalies.py が検知・補正する）
+    glitches = [
+        v for v in videos
+        if v['高評価数'] == 0 and v['コメント数'] == 0
+        and (
+            cached_videos.get(v['動画ID'], {}).get('高評価数', 0) > 0
+            or cached_videos.get(v['動画ID'], {}).get('コメント数', 0) > 0
+        )
+    ]
+    if glitches:
+        with metrics.stage('glitch'):
+            print(f'  ⚠️  グリッチ疑い: {len(glitches)}本（高評価・コメント数が0）。5秒後に再取得...')
+            for v in glitches:
+                print(f'    - {v["タイトル"][:50]}')
+            time.sleep(5)
+            retry_resp = execute_with_retry(youtube.videos().list(
+                part='statistics',
+                id=','.join(v['動画ID'] for v in glitches)
             ))
-            if not resp['items']:
-                return videos
-
-            playlist_id = resp['items'][0]['contentDetails']['relatedPlaylists']['uploads']
-            next_page_token = None
-
-            while True:
-                playlist_resp = execute_with_retry(youtube.playlistItems().list(
-                    part='snippet',
-                    playlistId=playlist_id,
-                    maxResults=50,
-                    pageToken=next_page_token
-                ))
-
-                video_ids = [
-                    item['snippet']['resourceId']['videoId']
-                    for item in playlist_resp['items']
-                ]
-
-                videos_resp = execute_with_retry(youtube.videos().list(
-                    part='snippet,statistics,liveStreamingDetails,contentDetails',
-                    id=','.join(video_ids)
-                ))
-
-                print(f'  取得中... {len(videos) + len(videos_resp["items"])}本')
-
-                # 新規動画（キャッシュにないもの）のみShort判定
-                new_video_ids = [
-                    vid for vid in video_ids
-                    if vid not in cached_videos
-                ]
-                if new_video_ids:
-                    print(f'  新規動画 {len(new_video_ids)}本のShort判定を実行')
-                    short_cache = check_shorts_batch(new_video_ids)
-                else:
-                    short_cache = {}
-
-                for video in videos_resp['items']:
-                    vid = video['id']
-
-                    # キャッシュにtypeがある場合は例外設定のみチェックして再利用
-                    if vid in cached_videos:
-                        cached_type = cached_videos[vid].get('type', 'Movie')
-                        # 例外設定は常に最優先
-                        if overrides and channel_name in overrides and vid in overrides[channel_name]:
-                            vtype = overrides[channel_name][vid]
-                            print(f'  ⚙️  例外設定: [{video["snippet"]["title"][:40]}] → {vtype}')
-                        else:
-                            vtype = cached_type
-                    else:
-                        vtype = determine_video_type(video, short_cache, overrides, channel_name)
-
-                    videos.append({
-                        '動画ID': vid,
-                        'タイトル': video['snippet']['title'],
-                        '公開日': video['snippet']['publishedAt'][:10],
-                        '再生数': int(video['statistics'].get('viewCount', 0)),
-                        '高評価数': int(video['statistics'].get('likeCount', 0)),
-                        'コメント数': int(video['statistics'].get('commentCount', 0)),
-                        'type': vtype,
-                        'duration': int(isodate.parse_duration(
-                            video['contentDetails'].get('duration', 'PT0S')
-                        ).total_seconds()),
-                    })
-
-                next_page_token = playlist_resp.get('nextPageToken')
-                if not next_page_token:
-                    break
-
-            # グリッチ検知: 高評価・コメント数が0だが過去に非0だった動画を再取得
-            glitch_ids = [
-                v['動画ID'] for v in videos
-                if v['高評価数'] == 0 and v['コメント数'] == 0
-                and (
-                    cached_videos.get(v['動画ID'], {}).get('高評価数', 0) > 0
-                    or cached_videos.get(v['動画ID'], {}).get('コメント数', 0) > 0
-                )
-            ]
-            if glitch_ids:
-                print(f'  ⚠️  グリッチ疑い: {len(glitch_ids)}本（高評価・コメント数が0）。5秒後に再取得...')
-                for gid in glitch_ids:
-                    title = next((v['タイトル'] for v in videos if v['動画ID'] == gid), gid)
-                    print(f'    - {title[:50]}')
-                time.sleep(5)
-                retry_resp = execute_with_retry(youtube.videos().list(
-                    part='statistics',
-                    id=','.join(glitch_ids)
-                ))
-                retried = {item['id']: item['statistics'] for item in retry_resp.get('items', [])}
-                fixed = 0
-                for v in videos:
-                    if v['動画ID'] in retried:
-                        stats = retried[v['動画ID']]
-                        new_likes = int(stats.get('likeCount', 0))
-                        new_comments = int(stats.get('commentCount', 0))
-                        if new_likes > 0 or new_comments > 0:
-                            print(f'    ✓ 修正: [{v["タイトル"][:40]}] '
-                                  f'高評価 {v["高評価数"]}→{new_likes} / コメント {v["コメント数"]}→{new_comments}')
-                            v['高評価数'] = new_likes
-                            v['コメント数'] = new_comments
-                            fixed += 1
-                print(f'  グリッチ修正: {fixed}/{len(glitch_ids)}本')
-
-            print(f'  ✓ 完了: {len(videos)}本')
-            print(f'    Movie: {sum(1 for v in videos if v["type"] == "Movie")}本 / '
-                  f'Short: {sum(1 for v in videos if v["type"] == "Short")}本 / '
-                  f'LiveArchive: {sum(1 for v in videos if v["type"] == "LiveArchive")}本')
-            return videos
-
-        except HttpError as e:
-            if e.status_code == 404 and attempt < 2:
-                wait = 30
-                print(f'  ⚠️  404 playlistNotFound、{wait}秒後にリトライ ({attempt + 1}/2)')
-                time.sleep(wait)
-                continue
-            print(f'  ⚠️  動画取得エラー: {e}')
-            return []
+            retried = {item['id']: item['statistics'] for item in retry_resp.get('items', [])}
+            fixed = 0
+            for v in glitches:
+                if v['動画ID'] in retried:
+                    stats = retried[v['動画ID']]
+                    new_likes = int(stats.get('likeCount', 0))
+                    new_comments = int(stats.get('commentCount', 0))
+                    if new_likes > 0 or new_comments > 0:
+                        print(f'    ✓ 修正: [{v["タイトル"][:40]}] '
+                              f'高評価 {v["高評価数"]}→{new_likes} / コメント {v["コメント数"]}→{new_comments}')
+                        v['高評価数'] = new_likes
+                        v['コメント数'] = new_comments
+                        fixed += 1
+            print(f'  グリッチ修正: {fixed}/{len(glitches)}本')
+
+    print(f'  ✓ 完了: {len(videos)}本')
+    print(f'    Movie: {sum(1 for v in videos if v["type"] == "Movie")}本 / '
+          f'Short: {sum(1 for v in videos if v["type"] == "Short")}本 / '
+          f'LiveArchive: {sum(1 for v in videos if v["type"] == "LiveArchive")}本')
+    return videos
+
+# ----------------------------------------------------------------
+# 動画詳細の一括取得（全チャンネル横断）
+# ----------------------------------------------------------------
+
+_thread_local = threading.local()
+
+def thread_youtube():
+    """スレッドごとに1つのAPIクライアントを使い回す（googleapiclientはスレッドセーフでない）"""
+    if not hasattr(_thread_local, 'youtube'):
+        _thread_local.youtube = build_youtube()
+    return _thread_local.youtube
+
+@metrics.timed('videos')
+def fetch_video_items_global(id_lists):
+    """
+    {チャンネル名: [動画ID...]} を全チャンネル分まとめて重複排除し、50件単位に詰めて
+    videos().list を発行する。STATS_BATCH_CALLS > 0 なら BatchHttpRequest で
+    N件ずつ1往復にまとめ、0 なら STATS_FETCH_WORKERS 並列で送る。
+    Returns:
+        ({チャンネル名: [item...]}（各チャンネルのID順）, 取得に失敗した動画IDの集合)
+    """
+    unique_ids = list(dict.fromkeys(vid for ids in id_lists.values() for vid in ids))
+    chunks = [unique_ids[i:i + 50] for i in range(0, len(unique_ids), 50)]
+    print(f'\n動画詳細の一括取得: {len(unique_ids)}本 / videos().list {len(chunks)}回')
+    start = time.time()
+
+    if STATS_BATCH_CALLS > 0:
+        fetched, failed_ids = _fetch_chunks_batch(chunks)
+    else:
+        fetched, failed_ids = _fetch_chunks_pool(chunks)
+
+    print(f'  一括取得完了: {time.time() - start:.1f}秒 ({len(fetched)}本取得 / 失敗{len(failed_ids)}本)')
+    items_by_channel = {
+        name: [fetched[vid] for vid in ids if vid in fetched]
+        for name, ids in id_lists.items()
+    }
+    return items_by_channel, failed_ids
+
+def _fetch_chunk(chunk):
+    resp = execute_with_retry(thread_youtube().videos().list(
+        part=VIDEO_PARTS,
+        id=','.join(chunk)
+    ))
+    return resp['items']
+
+def _fetch_chunks_pool(chunks):
+    fetched = {}
+    failed_ids = set()
+    with ThreadPoolExecutor(max_workers=STATS_FETCH_WORKERS) as executor:
+        future_to_chunk = {executor.submit(_fetch_chunk, chunk): chunk for chunk in chunks}
+        for future in as_completed(future_to_chunk):
+            chunk = future_to_chunk[future]
+            try:
+                for item in future.result():
+                    fetched[item['id']] = item
+            except Exception as e:
+                print(f'  ⚠️  動画詳細の取得エラー（{len(chunk)}本）: {e}')
+                failed_ids.update(chunk)
+    return fetched, failed_ids
+
+def _fetch_chunks_batch(chunks):
+    fetched = {}
+    retry_chunks = []
+    youtube = build_youtube()
+
+    def callback(request_id, response, exception):
+        metrics.record_call('videos.list', error=exception is not None)
+        if exception is not None:
+            retry_chunks.append(chunks[int(request_id)])
+            return
+        for item in response['items']:
+            fetched[item['id']] = item
+
+    for b in range(0, len(chunks), STATS_BATCH_CALLS):
+        batch = new_batch_request(youtube, callback)
+        for n, chunk in enumerate(chunks[b:b + STATS_BATCH_CALLS]):
+            batch.add(youtube.videos().list(part=VIDEO_PARTS, id=','.join(chunk)), request_id=str(b + n))
+        try:
+            # バッチ全体はリトライしない（失敗分は下で個別にリトライ）
+            controller.execute('batch', batch.execute, retries=0)
         except Exception as e:
-            print(f'  ⚠️  動画取得エラー: {e}')
-            return []
+            print(f'  ⚠️  バッチリクエストエラー: {e}')
+            retry_chunks.extend(chunks[b:b + STATS_BATCH_CALLS])
 
-    return []
+    # バッチ内で失敗した分は個別にリトライ
+    failed_ids = set()
+    for chunk in retry_chunks:
+        try:
+            for item in _fetch_chunk(chunk):
+                fetched[item['id']] = item
+        except Exception as e:
+            print(f'  ⚠️  動画詳細の取得エラー（{len(chunk)}本）: {e}')
+            failed_ids.update(chunk)
+    return fetched, failed_ids
 
 # ----------------------------------------------------------------
 # データ保存
 # ----------------------------------------------------------------
 
-def update_snapshots(channel_name, channel_id, channel_stats, videos):
-    """all_snapshots.json を更新"""
-    with _snapshot_lock:
-        snapshots = load_json(SNAPSHOTS_FILE, {})
-
-        snapshots[channel_name] = {
-            'channel_id': channel_id,
-            'channel_stats': channel_stats,
-            'videos': {
-                v['動画ID']: {
-                    'タイトル': v['タイトル'],
-                    '再生数': v['再生数'],
-                    '高評価数': v['高評価数'],
-                    'コメント数': v['コメント数'],
-                    'duration': v.get('duration', 0),
-                    'type': v['type']
-                } for v in videos
-            }
+@metrics.timed('save_snapshot')
+def update_snapshots(store, channel_name, channel_id, channel_stats, videos,
+                     uploads_playlist_id=None, last_full_sweep=None):
+    """スナップショットストアを更新（ファイルへの書き出しは store.flush() で一括）"""
+    store.update_channel(channel_name, {
+        'channel_id': channel_id,
+        'uploads_playlist_id': uploads_playlist_id,
+        'last_full_sweep': last_full_sweep,
+        'channel_stats': channel_stats,
+        'videos': {
+            v['動画ID']: {
+                'タイトル': v['タイトル'],
+                '再生数': v['再生数'],
+                '高評価数': v['高評価数'],
+                'コメント数': v['コメント数'],
+                'duration': v.get('duration', 0),
+                'type': v['type']
+            } for v in videos
         }
+    })
 
-        save_json(SNAPSHOTS_FILE, snapshots)
-        print(f'  スナップショット保存: {SNAPSHOTS_FILE}')
-
+@metrics.timed('save_history')
 def update_history(channel_name, videos, today_str, channel_stats=None):
     """history_{channel_name}.json を更新（日次集約: 1日1レコード）"""
-    path = history_file(channel_name)
-    history = load_json(path, {})
-
-    if channel_name not in history:
-        history[channel_name] = {}
-
-    channel_history = history[channel_name]
-
-    # チャンネル統計の日次履歴を保存（_channel_stats キーに蓄積）
-    if channel_stats:
-        if '_channel_stats' not in channel_history:
-            channel_history['_channel_stats'] = {}
-        channel_history['_channel_stats'][today_str] = {
-            '登録者数': channel_stats.get('登録者数', 0),
-            '総再生数': channel_stats.get('総再生数', 0),
-            '動画数':   channel_stats.get('動画数', 0),
-        }
+    # 書き込み前に SQLite 版が正本と一致していれば、今日の分だけ書き足せば一致したままになる
+    db_synced = HISTORY_DB and history_db_synced(channel_name)
 
+    if HISTORY_JOURNAL:
+        append_history_journal(channel_name, videos, today_str, channel_stats)
+    else:
+        path = history_file(channel_name)
+        history = history_store.load_history(channel_name, path)
+
+        # 日次集約: 同日のレコードは上書き（最新値で更新）
+        for video, old_type in history_store.record_day(history, today_str, videos, channel_stats):
+            print(f'  🔄 タイプ更新: [{video["タイトル"][:40]}] {old_type} → {video["type"]}')
+
+        history_store.save_history(history, path)
+        print(f'  履歴保存: {path}')
+
+    if HISTORY_SHARDS:
+        update_history_shard(channel_name, videos, today_str, channel_stats)
+    if db_synced:
+        update_history_db(channel_name, videos, today_str, channel_stats)
+
+_history_db = None
+_history_db_lock = threading.Lock()
+
+def history_database():
+    """history.sqlite3 の接続（全スレッドで1つを共有）"""
+    global _history_db
+    with _history_db_lock:
+        if _history_db is None:
+            _history_db = history_db.HistoryDB()
+        return _history_db
+
+def history_db_synced(channel_name):
+    try:
+        return history_database().is_synced(channel_name)
+    except Exception as e:
+        print(f'  ⚠️  {history_db.HISTORY_DB_FILE} を開けません: {e}')
+        return False
+
+def update_history_db(channel_name, videos, today_str, channel_stats=None):
+    """
+    SQLite 版に今日の分を書き足す。失敗しても本体の履歴は保存済み
+    （一致しなくなったタレントは次回の全件再集計で JSON から取り込み直す）
+    """
+    try:
+        db = history_database()
+        db.record_day(channel_name, today_str, videos, channel_stats)
+        db.mark_synced(channel_name)
+    except Exception as e:
+        print(f'  ⚠️  {history_db.HISTORY_DB_FILE} 更新エラー: {e}')
+
+def update_history_shard(channel_name, videos, today_str, channel_stats=None):
+    """当月のシャード history/{channel_name}/{YYYY-MM}.json と manifest を更新"""
+    try:
+        manifest = history_shards.update_month_shard(channel_name, videos, today_str, channel_stats)
+        print(f'  月別シャード更新: {history_shards.shard_path(channel_name, today_str[:7])}'
+              f'（{len(manifest["shards"])}シャード）')
+    except Exception as e:
+        # シャードはWeb表示用の派生ファイル。失敗しても本体の履歴は保存済み
+        print(f'  ⚠️  月別シャード更新エラー: {e}')
+
+def append_history_journal(channel_name, videos, today_str, channel_stats=None):
+    """
+    当日分の差分だけを history_{channel_name}.journal.jsonl に追記する
+    （本体の読み込み・書き換えなし）。HISTORY_COMPACT_DAYS 日分たまったら本体へ畳み込む。
+    """
+    path = history_store.journal_file(channel_name)
+    entries = history_store.read_journal(channel_name, path)
+    known_meta = history_store.journal_meta(entries)
+
+    records = {}
+    meta = {}
     for video in videos:
         video_id = video['動画ID']
+        records[video_id] = (video['再生数'], video['高評価数'], video['コメント数'])
 
-        if video_id not in channel_history:
-            channel_history[video_id] = {
-                'タイトル': video['タイトル'],
-                '公開日': video['公開日'],
-                'type': video['type'],
-                'duration': video.get('duration', 0),
-                'records': {}
-            }
-        else:
-            old_type = channel_history[video_id].get('type')
-            if old_type != video['type']:
-                print(f'  🔄 タイプ更新: [{video["タイトル"][:40]}] {old_type} → {video["type"]}')
-            channel_history[video_id]['type'] = video['type']
-            channel_history[video_id]['タイトル'] = video['タイトル']
-            channel_history[video_id]['duration'] = video.get('duration', 0)
-
-        # 日次集約: 同日のレコードは上書き（最新値で更新）
-        channel_history[video_id]['records'][today_str] = {
-            '再生数': video['再生数'],
-            '高評価数': video['高評価数'],
-            'コメント数': video['コメント数']
+        m = {
+            'ti': video['タイトル'],
+            'pd': video['公開日'],
+            'ty': video['type'],
+            'du': video.get('duration', 0),
         }
-
-    history[channel_name] = channel_history
-    save_json(path, history)
-    print(f'  履歴保存: {path}')
+        known = known_meta.get(video_id)
+        if known is None:
+            meta[video_id] = m
+            continue
+        if known.get('ty') != m['ty']:
+            print(f'  🔄 タイプ更新: [{video["タイトル"][:40]}] {known.get("ty")} → {m["ty"]}')
+        changed = {k: v for k, v in m.items() if known.get(k) != v}
+        if changed:
+            meta[video_id] = changed
+
+    # 変化分のみ（SPARSE_RECORDS）: 前日から値の変わった動画だけを書く。先頭行は全動画
+    previous = history_store.journal_last_rows(entries, today_str) if history_store.SPARSE_RECORDS else None
+    history_store.append_journal(channel_name, today_str, channel_stats, records, meta, path, previous)
+    days = len(history_store.journal_dates(entries + [{'date': today_str}]))
+    print(f'  履歴ジャーナル追記: {path}（{days}日分）')
+
+    if days >= HISTORY_COMPACT_DAYS:
+        history_store.compact_history(channel_name)
+        print(f'  履歴畳み込み: {history_file(channel_name)}')
 
 # ----------------------------------------------------------------
 # Dashboard用軽量集計ファイル
@@ -460,7 +906,8 @@ def load_talent_names():
     config = load_json(CHANNELS_CONFIG_FILE, [])
     return [c['name'] for c in config if 'name' in c]
 
-def build_dashboard_summary():
+@metrics.timed('summary')
+def build_dashboard_summary(full=False):
     """
     Dashboard（全タレント横断のランキング・統計表示）専用の軽量サマリーを
     history_{talent}.json から再集計して dashboard_summary.json に書き出す。
@@ -469,6 +916,16 @@ def build_dashboard_summary():
     レート制限を引き起こしていた。このサマリーは「全タレントの動画の
     直近2日分スナップショット」と「チャンネル統計の全期間」のみを持ち、
     動画本数の増加分でしか大きくならない。
+    1日より長い期間の伸びは、指標・種別・期間ごとの上位 RANKING_TOP_K 件だけを
+    rankings に持つ（rankings.py。Web は履歴を取得せずに期間別ランキングを表示できる）。
+
+    通常は前回の dashboard_summary.json を土台に、新しい1日分だけを追記する
+    （差分更新。履歴はジャーナルの直近分しか読まない）。差分更新では全件再集計と
+    同じ結果にならないケースや full=True の場合は、全履歴から再集計する。
+
+    ANOMALY_REPAIRS なら、一時的な0・跳ねなどの記録は history_anomalies.py の補正値に置き換えて
+    集計する（履歴ファイルは書き換えない）。全履歴の走査は全件再集計のときだけ行い、差分更新では
+    前回のレポートの補正値を使う（新しい1日分で補正値が変わりうる場合は全件再集計する）。
 
     history_*.json / all_snapshots.json の書き込みには一切関与しない
     （既存の収集フローとは独立した読み取り専用の後処理）。
@@ -478,145 +935,713 @@ def build_dashboard_summary():
         print('  ⚠️  channels_config.json からタレント一覧を取得できませんでした。summary生成をスキップします。')
         return
 
+    summary = None
+    if not full:
+        prev = load_json(SUMMARY_FILE, None)
+        if prev:
+            report = history_anomalies.load_report() if ANOMALY_REPAIRS else None
+            summary = _build_summary_incremental(talents, prev, report)
+
+    if summary is None:
+        summary = _build_summary_full(talents, anomaly_repairs(talents))
+        if summary is None:
+            return
+
+    save_json(SUMMARY_FILE, summary, indent=None)
+    print(f'  Dashboard集計保存: {SUMMARY_FILE}（動画{len(summary["videos"])}件 / '
+          f'タレント{len(summary["channel_stats"])}件 / n_date={summary["n_date"]} p_date={summary["p_date"]}）')
+
+def anomaly_repairs(talents):
+    """
+    全履歴の異常値を走査して history_anomalies.json を書き出し、補正値を返す。
+    NumPy が無い・走査に失敗した場合は前回のレポートの補正値を返す
+    """
+    if not ANOMALY_REPAIRS:
+        return {}
+    try:
+        report = history_anomalies.scan(talents)
+    except Exception as e:
+        print(f'  ⚠️  異常値の走査に失敗しました。前回の {history_anomalies.ANOMALY_REPORT_FILE} の補正値を使います: {e}')
+        return history_anomalies.load_repairs()
+    history_anomalies.save_report(report)
+    counts = ' / '.join(f'{kind} {n}' for kind, n in sorted(report['counts'].items()) if n) or '検知なし'
+    print(f'  異常値検知: {history_anomalies.ANOMALY_REPORT_FILE}（{counts}、{report.get("scan_ms", 0):.0f}ms）')
+    return history_anomalies.report_repairs(report)
+
+def _positive_gains(records):
+    """{日付: 直前の記録からの再生数の増分}（正の分のみ。日別種別内訳の1動画分）"""
+    gains = {}
+    prev_views = None
+    for date, views, _, _ in records:
+        if prev_views is not None:
+            diff = (views or 0) - (prev_views or 0)
+            if diff > 0:
+                gains[date] = diff
+        prev_views = views
+    return gains
+
+def _summary_generated_at():
+    return datetime.now(timezone(timedelta(hours=9))).strftime('%Y-%m-%d %H:%M:%S')
+
+def _build_summary_full(talents, repairs=None):
+    """
+    全タレントの全履歴から再集計する（repairs は anomaly_repairs() の補正値）。
+    HISTORY_DB なら SQLite 版から集計する（正本と食い違うタレントは先に取り込み直す）。
+    それ以外は履歴を1タレントずつ・1動画ずつ読み出して集計に畳み込み、全体をメモリに載せない
+    （ピークメモリは最大のタレント1人分の日付軸・ジャーナルと、出力のサマリー分）。
+    """
+    if HISTORY_DB:
+        try:
+            return _build_summary_db(talents, repairs)
+        except Exception as e:
+            print(f'  ⚠️  {history_db.HISTORY_DB_FILE} からの集計に失敗しました。JSON から再集計します: {e}')
+
+    # ① チャンネル統計（本体の先頭行とジャーナルのみ）から n_date / p_date を決める
     channel_stats_summary = {}
     all_dates = set()
-    talent_videos = {}  # talent -> {vid_id: {タイトル, type, records}}
-
     for talent in talents:
-        history = load_json(history_file(talent), {})
-        channel_history = history.get(talent)
-        if not channel_history:
-            continue
-
-        cs = channel_history.get('_channel_stats', {})
+        cs = history_store.read_channel_stats(talent)
         if cs:
             channel_stats_summary[talent] = cs
             all_dates.update(cs.keys())
 
-        videos = {
-            vid_id: v for vid_id, v in channel_history.items()
-            if vid_id != '_channel_stats' and v.get('records')
-        }
-        if videos:
-            talent_videos[talent] = videos
-
     if not all_dates:
         print('  ⚠️  有効な_channel_statsが見つかりませんでした。summary生成をスキップします。')
-        return
+        return None
 
     sorted_dates = sorted(all_dates)
     n_date = sorted_dates[-1]
-    n_idx = sorted_dates.index(n_date)
-    p_date = sorted_dates[n_idx - 1] if n_idx > 0 else None
+    p_date = sorted_dates[-2] if len(sorted_dates) > 1 else None
 
-    # 動画スナップショット（n_date/p_dateの2日分のみ、記録が無ければnull）
+    # ② タレントごとにスナップショットと日別種別内訳を集計し（SUMMARY_WORKERS > 1 ならプロセス並列）、
+    #    タレント順に連結・合算する（並列でも直列と同じ結果になる）
     video_snapshots = []
-    for talent, videos in talent_videos.items():
-        for vid_id, v in videos.items():
-            records = v.get('records', {})
-            nr = records.get(n_date)
-            pr = records.get(p_date) if p_date else None
-            video_snapshots.append({
-                't': talent,
-                'id': vid_id,
-                'ti': v.get('タイトル', vid_id),
-                'ty': v.get('type', 'Movie'),
-                'vn': nr.get('再生数') if nr else None,
-                'ln': nr.get('高評価数') if nr else None,
-                'cn': nr.get('コメント数') if nr else None,
-                'vp': pr.get('再生数') if pr else None,
-                'lp': pr.get('高評価数') if pr else None,
-                'cp': pr.get('コメント数') if pr else None,
-            })
-
-    # 日別種別内訳（Movie/Short/LiveArchiveの再生数増分、全タレント合計）
     daily_type_totals = {}
-    for talent, videos in talent_videos.items():
-        for vid_id, v in videos.items():
-            records = v.get('records', {})
-            vtype = v.get('type', 'Movie')
-            vdates = sorted(records.keys())
-            for i in range(1, len(vdates)):
-                d, prev = vdates[i], vdates[i - 1]
-                diff = (records[d].get('再生数', 0) or 0) - (records[prev].get('再生数', 0) or 0)
-                if diff <= 0:
-                    continue
-                bucket = daily_type_totals.setdefault(d, {'Movie': 0, 'Short': 0, 'LiveArchive': 0})
-                if vtype in bucket:
-                    bucket[vtype] += diff
+    video_rankings = rankings.VideoRankings(n_date, RANKING_WINDOWS, RANKING_TOP_K)
+    for snapshots, totals, talent_rankings in _map_talents(
+            _summarize_talent, talents, n_date, p_date, RANKING_WINDOWS, RANKING_TOP_K, repairs or {}):
+        video_snapshots.extend(snapshots)
+        video_rankings.merge(talent_rankings)
+        for date, bucket in totals.items():
+            merged = daily_type_totals.setdefault(date, {'Movie': 0, 'Short': 0, 'LiveArchive': 0})
+            for vtype, views in bucket.items():
+                merged[vtype] += views
 
     daily_type_breakdown = [
         {'date': d, **daily_type_totals[d]} for d in sorted(daily_type_totals.keys())
     ]
 
-    summary = {
-        'generated_at': datetime.now(timezone(timedelta(hours=9))).strftime('%Y-%m-%d %H:%M:%S'),
+    return {
+        'generated_at': _summary_generated_at(),
         'n_date': n_date,
         'p_date': p_date,
         'channel_stats': channel_stats_summary,
         'daily_type_breakdown': daily_type_breakdown,
         'videos': video_snapshots,
+        'rankings': rankings.build_rankings(
+            n_date, channel_stats_summary, video_rankings, RANKING_WINDOWS, RANKING_TOP_K),
+        'repair_digest': history_anomalies.repairs_digest(repairs or {}),
     }
 
-    save_json(SUMMARY_FILE, summary, indent=None)
-    print(f'  Dashboard集計保存: {SUMMARY_FILE}（動画{len(video_snapshots)}件 / タレント{len(channel_stats_summary)}件 / n_date={n_date} p_date={p_date}）')
+def _build_summary_db(talents, repairs=None):
+    """
+    _build_summary_full() と同じ内容を history.sqlite3 へのクエリで組み立てる。
+    補正のある動画だけ記録を読み直し、日別種別内訳・スナップショット・ランキングを補正後の値に差し替える
+    """
+    db = history_database()
+    imported = db.sync(talents)
+    if imported:
+        print(f'  {history_db.HISTORY_DB_FILE}: {len(imported)}タレントを history_*.json から取り込み')
+
+    channel_stats_summary = history_queries.channel_stats(db.conn, talents)
+    sorted_dates = sorted({d for cs in channel_stats_summary.values() for d in cs})
+    if not sorted_dates:
+        print('  ⚠️  有効な_channel_statsが見つかりませんでした。summary生成をスキップします。')
+        return None
+    n_date = sorted_dates[-1]
+    p_date = sorted_dates[-2] if len(sorted_dates) > 1 else None
+
+    daily_type_totals = history_queries.daily_type_totals(db.conn, talents)
+    video_snapshots = history_queries.video_snapshots(db.conn, talents, n_date, p_date)
+    repaired = _db_repaired_records(db, talents, repairs or {})
+    snapshot_index = {(v['t'], v['id']): v for v in video_snapshots}
+    for key, (records, fixed) in repaired.items():
+        snapshot = snapshot_index.get(key)
+        if snapshot is None:
+            continue
+        for sign, recs in ((-1, records), (1, fixed)):
+            for date, gain in _positive_gains(recs).items():
+                bucket = daily_type_totals.setdefault(date, {'Movie': 0, 'Short': 0, 'LiveArchive': 0})
+                if snapshot['ty'] in bucket:
+                    bucket[snapshot['ty']] += sign * gain
+        for date, views, likes, comments in fixed:
+            if date == n_date:
+                snapshot.update(vn=views, ln=likes, cn=comments)
+            elif date == p_date:
+                snapshot.update(vp=views, lp=likes, cp=comments)
+
+    return {
+        'generated_at': _summary_generated_at(),
+        'n_date': n_date,
+        'p_date': p_date,
+        'channel_stats': channel_stats_summary,
+        'daily_type_breakdown': [{'date': d, **daily_type_totals[d]} for d in sorted(daily_type_totals)],
+        'videos': video_snapshots,
+        'rankings': rankings.build_rankings(
+            n_date, channel_stats_summary, _db_video_rankings(db, talents, n_date, repaired),
+            RANKING_WINDOWS, RANKING_TOP_K),
+        'repair_digest': history_anomalies.repairs_digest(repairs or {}),
+    }
+
+def _db_repaired_records(db, talents, repairs):
+    """{(タレント, 動画ID): (SQLite 版の記録, 補正後の記録)}（補正のある動画のみ）"""
+    result = {}
+    for talent in talents:
+        video_repairs = repairs.get(talent)
+        if not video_repairs:
+            continue
+        for vid_id, records in history_queries.video_records(db.conn, talent, list(video_repairs)).items():
+            result[(talent, vid_id)] = (records, history_anomalies.repair_records(records, video_repairs[vid_id]))
+    return result
+
+def _db_video_rankings(db, talents, n_date, repaired):
+    video_rankings = rankings.VideoRankings(n_date, RANKING_WINDOWS, RANKING_TOP_K)
+    for row in history_queries.video_window_values(db.conn, talents, n_date, video_rankings.bases):
+        key = (row[0], row[1])
+        if key in repaired:
+            meta = {'ti': row[2], 'ty': row[3], 'pd': row[4]}
+            video_rankings.add_records(row[0], row[1], meta, repaired[key][1])
+        else:
+            video_rankings.add(*row)
+    return video_rankings
+
+def _summary_rankings(talents, n_date, channel_stats, repairs):
+    """
+    差分更新用の rankings。基準日の値は前回サマリーに無いので、
+    HISTORY_DB なら SQLite 版から、それ以外は月別シャードのうち基準日〜n_date の月だけ
+    （シャードが使えないタレントは履歴全体）を1タレントずつ読み出して選ぶ
+    """
+    video_rankings = None
+    if HISTORY_DB:
+        try:
+            db = history_database()
+            db.sync(talents)
+            video_rankings = _db_video_rankings(db, talents, n_date, _db_repaired_records(db, talents, repairs))
+        except Exception as e:
+            print(f'  ⚠️  {history_db.HISTORY_DB_FILE} からのランキング集計に失敗しました。JSON から集計します: {e}')
+    if video_rankings is None:
+        video_rankings = rankings.VideoRankings(n_date, RANKING_WINDOWS, RANKING_TOP_K)
+        for talent_rankings in _map_talents(_rank_talent, talents, n_date, RANKING_WINDOWS, RANKING_TOP_K, repairs, HISTORY_SHARDS):
+            video_rankings.merge(talent_rankings)
+    return rankings.build_rankings(n_date, channel_stats, video_rankings, RANKING_WINDOWS, RANKING_TOP_K)
+
+def _summarize_talent(talent, n_date, p_date, windows, k, repairs):
+    """
+    1タレント分の (動画スナップショット, {日付: 種別ごとの再生数増分}, rankings.VideoRankings) を返す。
+    動画は1本ずつ読み出して（補正値があれば置き換えて）畳み込む
+    （ワーカープロセスでも実行されるのでモジュールレベルに置く）。
+    """
+    video_snapshots = []
+    daily_type_totals = {}
+    video_rankings = rankings.VideoRankings(n_date, windows, k)
+    talent_repairs = repairs.get(talent, {})
+    for vid_id, meta, records in history_store.iter_video_records(talent):
+        if not records:
+            continue
+        records = history_anomalies.repair_records(records, talent_repairs.get(vid_id))
+        video_rankings.add_records(talent, vid_id, meta, records)
+        nr = pr = None
+        vtype = meta['ty']
+        for date, views, likes, comments in records:
+            if date == n_date:
+                nr = (views, likes, comments)
+            elif date == p_date:
+                pr = (views, likes, comments)
+        for date, gain in _positive_gains(records).items():
+            bucket = daily_type_totals.setdefault(date, {'Movie': 0, 'Short': 0, 'LiveArchive': 0})
+            if vtype in bucket:
+                bucket[vtype] += gain
+
+        video_snapshots.append({
+            't': talent,
+            'id': vid_id,
+            'ti': meta['ti'],
+            'ty': vtype,
+            'vn': nr[0] if nr else None,
+            'ln': nr[1] if nr else None,
+            'cn': nr[2] if nr else None,
+            'vp': pr[0] if pr else None,
+            'lp': pr[1] if pr else None,
+            'cp': pr[2] if pr else None,
+        })
+    return video_snapshots, daily_type_totals, video_rankings
+
+def _rank_talent(talent, n_date, windows, k, repairs, shards=False):
+    """
+    1タレント分の rankings.VideoRankings（_summarize_talent() のランキング部分だけ）。
+    shards=True なら先に月別シャードから選ぶ（_rank_talent_shards()）
+    """
+    if shards:
+        video_rankings = _rank_talent_shards(talent, n_date, windows, k, repairs)
+        if video_rankings is not None:
+            return video_rankings
+    video_rankings = rankings.VideoRankings(n_date, windows, k)
+    talent_repairs = repairs.get(talent, {})
+    for vid_id, meta, records in history_store.iter_video_records(talent):
+        records = history_anomalies.repair_records(records, talent_repairs.get(vid_id))
+        video_rankings.add_records(talent, vid_id, meta, records)
+    return video_rankings
+
+def _rank_talent_shards(talent, n_date, windows, k, repairs):
+    """
+    最も古い基準日の月〜n_date の月のシャードだけを読んで 1タレント分の rankings.VideoRankings を返す。
+    シャードが n_date まで更新されていない場合や、読んだ月より前に基準日の値があるかもしれない
+    動画がある場合は None（履歴全体から選び直す）
+    """
+    manifest = history_shards.load_manifest(talent)
+    if manifest is None:
+        return None
+    months = {s['month']: s for s in manifest['shards']}
+    if months.get(n_date[:7], {}).get('last') != n_date:
+        return None
+
+    video_rankings = rankings.VideoRankings(n_date, windows, k)
+    earliest = min(video_rankings.bases.values())
+    loaded = sorted(m for m in months if earliest[:7] <= m <= n_date[:7])
+    # 読む月が最初のシャードからなら、それより前の記録は無い
+    complete = loaded[0] == min(months)
+
+    records, metas = {}, {}
+    for month in loaded:
+        shard = history_store.load_history(talent, history_shards.shard_path(talent, month), with_journal=False)
+        for vid_id, entry in shard['videos'].items():
+            records.setdefault(vid_id, []).extend(history_store.iter_records(shard, entry))
+            metas[vid_id] = {key: entry[key] for key in history_store.META_FIELDS}
+
+    talent_repairs = repairs.get(talent, {})
+    for vid_id, video_records in records.items():
+        if video_records[-1][0] != n_date:
+            continue
+        first, published = video_records[0][0], (metas[vid_id].get('pd') or '')[:10]
+        if not complete and any(first > base and published <= base for base in video_rankings.bases.values()):
+            return None
+        video_records = history_anomalies.repair_records(video_records, talent_repairs.get(vid_id))
+        video_rankings.add_records(talent, vid_id, metas[vid_id], video_records)
+    return video_rankings
+
+def _map_talents(fn, talents, *args):
+    """
+    fn(talent, *args) を talents の順に結果を返す形で実行する。
+    SUMMARY_WORKERS > 1 かつ複数タレントならプロセス並列（結果の順序は talents のまま）。
+    """
+    if SUMMARY_WORKERS <= 1 or len(talents) <= 1:
+        return [fn(talent, *args) for talent in talents]
+    with ProcessPoolExecutor(max_workers=min(SUMMARY_WORKERS, len(talents))) as executor:
+        return list(executor.map(fn, talents, *([arg] * len(talents) for arg in args)))
+
+def _build_summary_incremental(talents, prev, report=None):
+    """
+    前回サマリーに新しい1日分（または同日の再取得分）だけを反映する。
+    補正値は異常値レポート（report。history_anomalies.json）のものを使う。
+    全件再集計と結果が一致しないケースでは None を返す（呼び出し側で全件再集計）:
+      - 補正値が前回サマリーの集計時と変わった（過去日の値が変わる）
+      - 新しい1日分で補正値が変わりうる（history_anomalies.day_suspects()。全件再集計で走査し直す）
+      - 前回以降に2日以上の新しい日付がある
+      - 前回サマリーに無いタレントが増えた
+      - 既存動画のタイプが変わった（過去日の内訳も付け替えが必要）
+      - 前回時点で記録の無かった既存動画に記録が付いた（直前レコードが更に過去）
+    """
+    n0, p0 = prev.get('n_date'), prev.get('p_date')
+    if not n0 or not p0:
+        return None
+    if any(t not in prev['channel_stats'] for t in talents if history_store.history_exists(t)):
+        print('  差分更新不可（新規タレント）: 全件再集計します')
+        return None
+    repairs = history_anomalies.report_repairs(report) if report else {}
+    digest = history_anomalies.repairs_digest(repairs)
+    if prev.get('repair_digest') != digest:
+        print('  差分更新不可（異常値の補正が変更）: 全件再集計します')
+        return None
+
+    # 通常は n0 の翌日分、同日の再実行なら n0 分を取り直す
+    recents = {t: history_store.load_recent(t, n0) for t in talents}
+    new_dates = sorted({d for r in recents.values() for d in r['cs']})
+    if not new_dates:
+        recents = {t: history_store.load_recent(t, p0) for t in talents}
+        new_dates = sorted({d for r in recents.values() for d in r['cs']})
+        if new_dates != [n0]:
+            return None
+    if len(new_dates) > 1:
+        print(f'  差分更新不可（新しい日付が{len(new_dates)}日分）: 全件再集計します')
+        return None
+
+    n_date = new_dates[0]
+    rerun = n_date == n0
+    p_date = p0 if rerun else n0
+
+    channel_stats_summary = {}
+    for talent in talents:
+        cs = dict(prev['channel_stats'].get(talent, {}))
+        cs.update(recents[talent]['cs'])
+        if cs:
+            channel_stats_summary[talent] = cs
+
+    prev_by_talent = {}
+    for v in prev['videos']:
+        prev_by_talent.setdefault(v['t'], []).append(v)
+
+    video_snapshots = []
+    checks = {}   # 異常値の疑いの判定用 {(タレント, 動画ID): (n_date の値, [直前の記録の値...])}
+    bucket = None
+    for talent in talents:
+        recent = recents[talent]
+        meta = recent['meta']
+        day = recent['records'].get(n_date, {})
+        day_repairs = {vid: r[n_date] for vid, r in repairs.get(talent, {}).items() if n_date in r and vid in day}
+        if day_repairs:
+            day = {**day, **day_repairs}
+        known = set()
+        rows = []
+        for v in prev_by_talent.get(talent, []):
+            vid_id = v['id']
+            known.add(vid_id)
+            ty = meta.get(vid_id, {}).get('ty', v['ty'])
+            if ty != v['ty']:
+                print(f'  差分更新不可（タイプ変更: {vid_id}）: 全件再集計します')
+                return None
+            p_values = (v['vp'], v['lp'], v['cp']) if rerun else (v['vn'], v['ln'], v['cn'])
+            if vid_id in day:
+                checks[(talent, vid_id)] = (day[vid_id], [p_values] if rerun else [p_values, (v['vp'], v['lp'], v['cp'])])
+            rows.append((vid_id, meta.get(vid_id, {}).get('ti', v['ti']), ty, day.get(vid_id), p_values))
+        new_ids = [vid for vid in meta if vid not in known and vid in day]
+        new_ids += [vid for vid in day if vid not in known and vid not in meta]
+        for vid_id in new_ids:
+            m = meta.get(vid_id, {})
+            rows.append((vid_id, m.get('ti', vid_id), m.get('ty', 'Movie'), day[vid_id], (None, None, None)))
+
+        for vid_id, title, ty, nr, pr in rows:
+            if nr is not None and pr[0] is None and vid_id in known:
+                print(f'  差分更新不可（記録の欠けた動画: {vid_id}）: 全件再集計します')
+                return None
+            video_snapshots.append({
+                't': talent,
+                'id': vid_id,
+                'ti': title,
+                'ty': ty,
+                'vn': nr[0] if nr else None,
+                'ln': nr[1] if nr else None,
+                'cn': nr[2] if nr else None,
+                'vp': pr[0],
+                'lp': pr[1],
+                'cp': pr[2],
+            })
+            if nr is not None and pr[0] is not None:
+                diff = (nr[0] or 0) - (pr[0] or 0)
+                if diff > 0:
+                    if bucket is None:
+                        bucket = {'Movie': 0, 'Short': 0, 'LiveArchive': 0}
+                    if ty in bucket:
+                        bucket[ty] += diff
+
+    if report is not None and history_anomalies.np is not None:
+        suspects = history_anomalies.day_suspects(report, n_date, checks)
+        if suspects:
+            print(f'  差分更新不可（異常値の疑い: {len(suspects)}本）: 全件再集計します')
+            return None
+
+    daily_type_breakdown = [e for e in prev['daily_type_breakdown'] if e['date'] != n_date]
+    if bucket is not None:
+        daily_type_breakdown.append({'date': n_date, **bucket})
+
+    print(f'  Dashboard集計: 差分更新（{n_date}）')
+    return {
+        'generated_at': _summary_generated_at(),
+        'n_date': n_date,
+        'p_date': p_date,
+        'channel_stats': channel_stats_summary,
+        'daily_type_breakdown': daily_type_breakdown,
+        'videos': video_snapshots,
+        'rankings': _summary_rankings(talents, n_date, channel_stats_summary, repairs),
+        'repair_digest': digest,
+    }
 
 # ----------------------------------------------------------------
 # チャンネル処理
 # ----------------------------------------------------------------
 
-def process_channel(channel_config, overrides, today_str):
-    """1チャンネルの処理（スレッドセーフ：APIクライアントを個別生成）"""
+def needs_full_sweep(last_full_sweep, today_str):
+    if not last_full_sweep or DISCOVERY_FULL_SWEEP_DAYS <= 0:
+        return True
+    elapsed = (datetime.strptime(today_str, '%Y-%m-%d') - datetime.strptime(last_full_sweep, '%Y-%m-%d')).days
+    return elapsed >= DISCOVERY_FULL_SWEEP_DAYS
+
+def prepare_channel(channel_config, today_str, store, youtube):
+    """
+    チャンネルID・統計・動画ID一覧まで取得する（動画詳細の取得前の段階）。
+    失敗時は None、成功時は後続の finish_channel() に渡すコンテキストを返す。
+    run journal に記録済みの段階は取得し直さない。
+    """
     channel_name = channel_config['name']
-    channel_url = channel_config['url']
+    print_channel_header(channel_name)
+
+    ctx = journal_context(channel_name, today_str, store)
+    if ctx is not None:
+        return ctx
 
+    recorded = journal_stats(channel_name)
+    if recorded:
+        channel_id, channel_stats, playlist_id = recorded
+    else:
+        channel_id = resolve_channel_id(youtube, channel_config, store)
+        if not channel_id:
+            return None
+
+        # チャンネル統計
+        channel_stats = get_channel_stats(youtube, channel_id)
+        if not channel_stats:
+            print(f'  ❌ チャンネル統計を取得できませんでした')
+            return None
+
+        playlist_id = resolve_uploads_playlist_id(youtube, channel_name, channel_id, store)
+        if not playlist_id:
+            return None
+        record_stats(channel_name, channel_id, channel_stats, playlist_id)
+
+    # 動画ID一覧（DISCOVERY_FULL_SWEEP_DAYS 日ごとに全件、それ以外は差分取得）
+    cached_videos, last_full_sweep, full_sweep = discovery_plan(channel_name, today_str, store)
+    video_ids = list_channel_video_ids(youtube, playlist_id, cached_videos, full_sweep)
+    if not video_ids:
+        print(f'  ❌ 動画を取得できませんでした')
+        return None
+    record_video_list(channel_name, video_ids, full_sweep, last_full_sweep)
+
+    return channel_context(channel_name, channel_id, channel_stats, playlist_id,
+                           cached_videos, last_full_sweep, full_sweep, video_ids, today_str)
+
+def channel_context(channel_name, channel_id, channel_stats, playlist_id,
+                    cached_videos, last_full_sweep, full_sweep, video_ids, today_str):
+    return {
+        'name': channel_name,
+        'channel_id': channel_id,
+        'channel_stats': channel_stats,
+        'playlist_id': playlist_id,
+        'full_sweep': full_sweep,
+        'last_full_sweep': today_str if full_sweep else last_full_sweep,
+        'cached_videos': cached_videos,
+        'video_ids': video_ids,
+    }
+
+def print_channel_header(channel_name):
     print(f'\n{"=" * 50}')
     print(f'処理中: {channel_name}')
     print(f'{"=" * 50}')
 
-    # スレッドごとに独自のAPIクライアントを生成
-    youtube = build('youtube', 'v3', developerKey=API_KEY)
-
-    # チャンネルIDをキャッシュから取得、なければAPIで取得
-    snapshots = load_json(SNAPSHOTS_FILE, {})
-    channel_id = snapshots.get(channel_name, {}).get('channel_id')
+def resolve_channel_id(youtube, channel_config, store):
+    """チャンネルIDをキャッシュから取得、なければAPIで取得。見つからなければ None"""
+    channel_id = store.get_channel_id(channel_config['name'])
+    if channel_id:
+        print(f'  チャンネルID（キャッシュ）: {channel_id}')
+        return channel_id
 
+    print(f'  チャンネルIDを取得中...')
+    channel_id = get_channel_id(youtube, channel_config['url'])
     if not channel_id:
-        print(f'  チャンネルIDを取得中...')
-        channel_id = get_channel_id(youtube, channel_url)
-        if not channel_id:
-            print(f'  ❌ チャンネルが見つかりませんでした: {channel_name}')
-            return False
-        print(f'  チャンネルID: {channel_id}')
-    else:
-        print(f'  チャンネルID（キャッシュ）: {channel_id}')
+        print(f'  ❌ チャンネルが見つかりませんでした: {channel_config["name"]}')
+        return None
+    print(f'  チャンネルID: {channel_id}')
+    return channel_id
+
+def resolve_uploads_playlist_id(youtube, channel_name, channel_id, store):
+    """アップロード再生リストIDをキャッシュから取得、なければAPIで取得。見つからなければ None"""
+    playlist_id = store.get_channel(channel_name).get('uploads_playlist_id')
+    if playlist_id:
+        return playlist_id
+    try:
+        playlist_id = get_uploads_playlist_id(youtube, channel_id)
+    except Exception as e:
+        print(f'  ⚠️  アップロード再生リスト取得エラー: {e}')
+    if not playlist_id:
+        print(f'  ❌ アップロード再生リストが見つかりませんでした')
+        return None
+    return playlist_id
+
+def discovery_plan(channel_name, today_str, store):
+    """(キャッシュ済み動画, 前回の全件取得日, 今回全件取得するか) を返す"""
+    cached_videos = store.get_videos(channel_name)
+    last_full_sweep = store.get_channel(channel_name).get('last_full_sweep')
+    full_sweep = needs_full_sweep(last_full_sweep, today_str) or not cached_videos
+    return cached_videos, last_full_sweep, full_sweep
 
-    # チャンネル統計
-    channel_stats = get_channel_stats(youtube, channel_id)
-    if not channel_stats:
-        print(f'  ❌ チャンネル統計を取得できませんでした')
-        return False
+# ----------------------------------------------------------------
+# 途中再開（run journal）
+# ----------------------------------------------------------------
 
-    # 全動画取得
-    videos = get_all_videos(youtube, channel_id, channel_name, overrides)
+def record_stats(channel_name, channel_id, channel_stats, playlist_id):
+    journal.record(channel_name, 'stats', {
+        'channel_id': channel_id,
+        'channel_stats': channel_stats,
+        'playlist_id': playlist_id,
+    })
+
+def record_video_list(channel_name, video_ids, full_sweep, last_full_sweep):
+    journal.record(channel_name, 'video_list', {
+        'video_ids': video_ids,
+        'full_sweep': full_sweep,
+        'last_full_sweep': last_full_sweep,
+    })
+
+def journal_stats(channel_name):
+    """run journal に統計まで記録済みなら (チャンネルID, 統計, 再生リストID)、なければ None"""
+    stats = journal.get(channel_name, 'stats')
+    if not stats:
+        return None
+    print(f'  ↩️  途中再開: チャンネル統計（記録済み）')
+    return stats['channel_id'], dict(stats['channel_stats']), stats['playlist_id']
+
+def journal_context(channel_name, today_str, store):
+    """run journal に動画ID一覧まで記録済みなら、そのコンテキスト（API呼び出しなし）。なければ None"""
+    stats = journal.get(channel_name, 'stats')
+    listing = journal.get(channel_name, 'video_list')
+    if not stats or not listing:
+        return None
+    print(f'  ↩️  途中再開: チャンネル統計・動画ID一覧 {len(listing["video_ids"])}本（記録済み）')
+    return channel_context(channel_name, stats['channel_id'], dict(stats['channel_stats']),
+                           stats['playlist_id'], store.get_videos(channel_name),
+                           listing['last_full_sweep'], listing['full_sweep'], listing['video_ids'], today_str)
+
+def record_shorts(channel_name, results):
+    """Short判定キャッシュに入った分（HEAD・キャッシュで判定したもの。長尺で除外した分は除く）を記録する"""
+    journal.record(channel_name, 'shorts', {
+        vid: verdict for vid, verdict in results.items() if short_verdicts.get(vid) is not None
+    })
+
+def restore_short_verdicts(channel_name):
+    """前回の実行で判定済みの Short 判定（shorts_cache.json は実行終了時にしか書かれない）を戻す"""
+    recorded = journal.get(channel_name, 'shorts')
+    if recorded:
+        short_verdicts.update(recorded)
+
+def record_videos(channel_name, videos):
+    """動画リストの完了を記録する（内容は履歴に書くので、記録するのは動画IDだけ）"""
+    journal.record(channel_name, 'videos', {'video_ids': [v['動画ID'] for v in videos]})
+
+def journal_videos(channel_name, today_str):
+    """
+    run journal で履歴の書き込みまで記録済みなら、今日の動画リストを履歴から組み立て直す。
+    未完了、または履歴に今日の記録が無い動画がある場合は None
+    """
+    recorded = journal.get(channel_name, 'videos')
+    if not isinstance(recorded, dict) or not journal.done(channel_name, 'history'):
+        return None
+    history = history_store.load_history(channel_name)
+    i = history_store.date_index(history, today_str)
+    videos = []
+    for vid in recorded['video_ids']:
+        entry = history['videos'].get(vid)
+        record = history_store.get_record(entry, i) if entry else None
+        if record is None:
+            print(f'  ⚠️  {channel_name}: 履歴に今日の記録が無い動画があります（{vid}）。取得し直します')
+            return None
+        videos.append({
+            '動画ID': vid,
+            'タイトル': entry['ti'],
+            '公開日': entry['pd'],
+            '再生数': record[0],
+            '高評価数': record[1],
+            'コメント数': record[2],
+            'type': entry['ty'],
+            'duration': entry['du'],
+        })
+    return videos
+
+def resume_channels(channels, today_str, store):
+    """
+    run journal で履歴の書き込みまで記録済みのチャンネルは、API を呼ばずにスナップショットだけ戻す
+    （動画リストは履歴の今日の分から組み立てる）。(完了数, 残りのチャンネル) を返す。
+    動画リストの段階で止まったチャンネルは、記録済みの動画ID一覧・Short判定を使って動画詳細から取得し直す
+    """
+    resumed = 0
+    remaining = []
+    for ch in channels:
+        channel_name = ch['name']
+        videos = journal_videos(channel_name, today_str)
+        ctx = journal_context(channel_name, today_str, store) if videos else None
+        if ctx is None:
+            remaining.append(ch)
+            continue
+        restore_short_verdicts(channel_name)
+        ctx['channel_stats']['総再生数'] = sum(v['再生数'] for v in videos)
+        update_snapshots(store, channel_name, ctx['channel_id'], ctx['channel_stats'], videos,
+                         uploads_playlist_id=ctx['playlist_id'], last_full_sweep=ctx['last_full_sweep'])
+        print(f'  ↩️  {channel_name}: 今日の処理は完了済み（スナップショットのみ復元）')
+        resumed += 1
+    return resumed, remaining
+
+def finish_channel(ctx, items, overrides, today_str, store, youtube, short_cache=None):
+    """取得済みの動画詳細からタイプ判定・グリッチ修正を行い、スナップショットと履歴を保存する"""
+    channel_name = ctx['name']
+
+    items = visible_items(ctx, items)
+
+    try:
+        videos = build_video_list(youtube, items, channel_name, overrides, ctx['cached_videos'], short_cache)
+    except Exception as e:
+        print(f'  ⚠️  動画取得エラー: {e}')
+        videos = []
     if not videos:
-        print(f'  ❌ 動画を取得できませんでした')
+        print(f'  ❌ {channel_name}: 動画を取得できませんでした')
         return False
+    record_videos(channel_name, videos)
+
+    return save_channel(ctx, videos, today_str, store)
+
+def save_channel(ctx, videos, today_str, store):
+    """動画リストをスナップショットと履歴に保存する"""
+    channel_name = ctx['name']
+    channel_stats = ctx['channel_stats']
 
     # 総再生数 = 全動画（Movie/Short/LiveArchive）の再生数の総和（JST 00:00時点）
     channel_stats['総再生数'] = sum(v['再生数'] for v in videos)
 
-    print(f'  登録者数: {channel_stats["登録者数"]:,}人 / '
+    print(f'  {channel_name}: 登録者数: {channel_stats["登録者数"]:,}人 / '
           f'総再生数: {channel_stats["総再生数"]:,}回 / '
           f'動画数: {channel_stats["動画数"]:,}本')
 
     # 保存
-    update_snapshots(channel_name, channel_id, channel_stats, videos)
+    update_snapshots(store, channel_name, ctx['channel_id'], channel_stats, videos,
+                     uploads_playlist_id=ctx['playlist_id'],
+                     last_full_sweep=ctx['last_full_sweep'])
     update_history(channel_name, videos, today_str, channel_stats=channel_stats)
+    journal.record(channel_name, 'history')
 
     print(f'  ✓ {channel_name} 完了')
     return True
 
+def visible_items(ctx, items):
+    """差分取得では非公開・限定公開になった動画を除外（全件取得では再生リストに出ない）"""
+    if ctx['full_sweep']:
+        return items
+    return [item for item in items if is_public(item)]
+
+def process_channel(channel_config, overrides, today_str, store):
+    """1チャンネルの処理（スレッドセーフ：APIクライアントを個別生成）"""
+    # スレッドごとに独自のAPIクライアントを生成
+    youtube = build_youtube()
+
+    with metrics.channel(channel_config['name']):
+        ctx = prepare_channel(channel_config, today_str, store, youtube)
+        if ctx is None:
+            return False
+
+        try:
+            items = fetch_video_items(youtube, ctx['video_ids'])
+        except Exception as e:
+            print(f'  ⚠️  動画取得エラー: {e}')
+            print(f'  ❌ 動画を取得できませんでした')
+            return False
+
+        return finish_channel(ctx, items, overrides, today_str, store, youtube)
+
 # ----------------------------------------------------------------
 # メイン
 # ----------------------------------------------------------------
@@ -642,53 +1667,29 @@ def main():
     for ch in CHANNELS:
         print(f'  - {ch["name"]}')
 
+    metrics.reset()
+    controller.start(RUN_DEADLINE_SEC)
     overrides = load_overrides()
+    store = SnapshotStore()
+    if RUN_JOURNAL:
+        journal.open(today_str, fresh=FRESH_RUN)
+        if journal.channels():
+            print(f'\n↩️  {run_journal.RUN_JOURNAL_FILE}: 今日の途中経過あり（{len(journal.channels())}チャンネル）。続きから処理します')
 
-    # チャンネル処理を並列実行（3チャンネル同時）
-    success = 0
-    failed_channels = []
-    with ThreadPoolExecutor(max_workers=CHANNEL_WORKERS) as executor:
-        futures = {
-            executor.submit(
-                process_channel, ch, overrides, today_str
-            ): ch
-            for ch in CHANNELS
-        }
-        for future in as_completed(futures):
-            ch = futures[future]
-            try:
-                if future.result():
-                    success += 1
-                else:
-                    failed_channels.append(ch)
-            except Exception as e:
-                print(f'  ❌ {ch["name"]} で予期しないエラー: {e}')
-                failed_channels.append(ch)
-
-    # 失敗チャンネルのリトライ
-    still_failed = []
-    if failed_channels:
-        print(f'\n⚠️  {len(failed_channels)}チャンネルが失敗。30秒後にリトライします...')
-        for ch in failed_channels:
-            print(f'  - {ch["name"]}')
-        time.sleep(30)
-        with ThreadPoolExecutor(max_workers=CHANNEL_WORKERS) as executor:
-            futures = {
-                executor.submit(
-                    process_channel, ch, overrides, today_str
-                ): ch
-                for ch in failed_channels
-            }
-            for future in as_completed(futures):
-                ch = futures[future]
-                try:
-                    if future.result():
-                        success += 1
-                    else:
-                        still_failed.append(ch['name'])
-                except Exception as e:
-                    print(f'  ❌ {ch["name"]} で予期しないエラー: {e}')
-                    still_failed.append(ch['name'])
+    try:
+        success, still_failed = run_channels(CHANNELS, overrides, today_str, store)
+    finally:
+        # 失敗・例外時も、完了したチャンネル分は保存する
+        with metrics.stage('save_snapshot'):
+            store.flush()
+        short_verdicts.flush()
+
+    # 全チャンネル完了なら途中経過は不要（失敗が残った場合は次回の再実行で続きから）
+    if RUN_JOURNAL and not still_failed:
+        journal.clear()
+    if controller.stop_reason and still_failed:
+        reason = 'APIクォータ切れ' if controller.stop_reason == 'quota' else '実行期限切れ'
+        print(f'\n⚠️  {reason}のため {len(still_failed)}チャンネルを処理できませんでした（次回の実行で続きから処理）')
 
     print(f'\n{"=" * 50}')
     print(f'✓ 全処理完了: {success}/{len(CHANNELS)} チャンネル成功')
@@ -699,18 +1700,331 @@ def main():
     except Exception as e:
         print(f'⚠️  dashboard_summary.json 生成に失敗しました（本処理には影響しません）: {e}')
 
+    if SERIES_FILES:
+        build_series_files([ch['name'] for ch in CHANNELS if ch['name'] not in still_failed])
+
+    if ANALYTICS_FILES:
+        build_analytics_files([ch['name'] for ch in CHANNELS if ch['name'] not in still_failed])
+
+    if PUBLISH_DATA:
+        publish_web_data()
+
+    save_run_metrics(success, still_failed)
+
     if still_failed:
         print(f'❌ リトライ後も失敗: {", ".join(still_failed)}')
         sys.exit(1)
 
+@metrics.timed('series')
+def build_series_files(channel_names):
+    """
+    各タレントの series_{talent}.json（グラフ用に間引いた動画別の再生数推移）を
+    履歴から作り直す（SUMMARY_WORKERS > 1 ならプロセス並列）。失敗しても本処理には影響しない。
+    """
+    for channel_name, (videos, error) in zip(channel_names, _map_talents(_write_series_file, channel_names)):
+        path = history_series.series_file(channel_name)
+        if error:
+            print(f'  ⚠️  {path} 生成に失敗しました: {error}')
+        else:
+            print(f'  グラフ用系列保存: {path}（動画{videos}本）')
+
+def _write_series_file(channel_name):
+    """(動画数, エラー) を返す（ワーカープロセスで実行されるので例外は文字列にして返す）"""
+    try:
+        return len(history_series.write_series(channel_name)['videos']), None
+    except Exception as e:
+        return None, str(e)
+
+@metrics.timed('analytics')
+def build_analytics_files(channel_names):
+    """
+    各タレントの analytics_{talent}.json（動画別の移動平均・伸び率・予測）を履歴から作り直す
+    （ANOMALY_REPAIRS なら history_anomalies.json の補正値で計算。SUMMARY_WORKERS > 1 ならプロセス並列）。
+    失敗しても本処理には影響しない。
+    """
+    if history_analytics.np is None:
+        print('  ⚠️  NumPy が無いため analytics_*.json の生成をスキップします（pip install numpy）')
+        return
+    repairs = history_anomalies.load_repairs() if ANOMALY_REPAIRS else {}
+    for channel_name, (videos, error) in zip(
+            channel_names, _map_talents(_write_analytics_file, channel_names, repairs)):
+        path = history_analytics.analytics_file(channel_name)
+        if error:
+            print(f'  ⚠️  {path} 生成に失敗しました: {error}')
+        else:
+            print(f'  伸びの指標保存: {path}（動画{videos}本）')
+
+def _write_analytics_file(channel_name, repairs):
+    """(動画数, エラー) を返す（ワーカープロセスで実行されるので例外は文字列にして返す）"""
+    try:
+        analytics = history_analytics.write_analytics(channel_name, video_repairs=repairs.get(channel_name))
+        return len(analytics['videos']), None
+    except Exception as e:
+        return None, str(e)
+
+@metrics.timed('publish')
+def publish_web_data():
+    """Web公開用ファイルを data/ に書き出して data_manifest.json を更新（失敗しても本処理には影響しない）"""
+    try:
+        manifest, changed = publish_data.publish()
+    except Exception as e:
+        print(f'⚠️  {publish_data.DATA_MANIFEST_FILE} の更新に失敗しました（本処理には影響しません）: {e}')
+        return
+    print(f'  Web公開データ: {publish_data.DATA_MANIFEST_FILE}（{len(manifest["files"])}ファイル / 更新 {changed}）')
+
+def save_run_metrics(success, failed):
+    """今回の実行のメトリクスを METRICS_FILE のローリング履歴に追記して要約を表示"""
+    try:
+        run = metrics.save(METRICS_FILE, engine=ENGINE, success=success, failed=failed,
+                           requests=controller.report())
+    except Exception as e:
+        print(f'⚠️  {METRICS_FILE} の保存に失敗しました（本処理には影響しません）: {e}')
+        return
+    print(f'\n実行メトリクス（{METRICS_FILE}）: {run["duration_sec"]:.0f}秒')
+    print_run(run)
+
+def run_channels(channels, overrides, today_str, store):
+    """全チャンネルを処理し、失敗分は1回リトライする。(成功数, 失敗チャンネル名) を返す"""
+    if ENGINE == 'async':
+        run_pass = run_pass_async
+    elif STATS_FETCH == 'global':
+        run_pass = run_pass_global
+    else:
+        run_pass = run_pass_per_channel
+    # 今日の途中経過で動画リストまで済んでいるチャンネルは保存だけ行う
+    resumed, channels = resume_channels(channels, today_str, store)
+    success, failed_channels = run_pass(channels, overrides, today_str, store)
+    success += resumed
+
+    # 失敗チャンネルのリトライ（run journal により完了済みの段階は飛ばす）。
+    # クォータ切れ・期限切れで止まっている場合はリトライしない
+    still_failed = []
+    if failed_channels and controller.stopped:
+        still_failed = [ch['name'] for ch in failed_channels]
+    elif failed_channels:
+        print(f'\n⚠️  {len(failed_channels)}チャンネルが失敗。{RETRY_PASS_WAIT}秒後にリトライします...')
+        for ch in failed_channels:
+            print(f'  - {ch["name"]}')
+        controller.sleep(RETRY_PASS_WAIT)
+        retried, still = run_pass(failed_channels, overrides, today_str, store)
+        success += retried
+        still_failed = [ch['name'] for ch in still]
+
+    return success, still_failed
+
+def _run_parallel(fn, channels):
+    """fn(ch) をチャンネル並列で実行し {チャンネル名: 結果} を返す（例外は結果 None）"""
+    results = {}
+    with ThreadPoolExecutor(max_workers=CHANNEL_WORKERS) as executor:
+        futures = {executor.submit(fn, ch): ch for ch in channels}
+        for future in as_completed(futures):
+            ch = futures[future]
+            try:
+                results[ch['name']] = future.result()
+            except Exception as e:
+                print(f'  ❌ {ch["name"]} で予期しないエラー: {e}')
+                results[ch['name']] = None
+    return results
+
+def run_pass_per_channel(channels, overrides, today_str, store):
+    """チャンネルごとに全段階を処理（3チャンネル同時）。(成功数, 失敗チャンネル) を返す"""
+    results = _run_parallel(
+        lambda ch: process_channel(ch, overrides, today_str, store), channels
+    )
+    failed = [ch for ch in channels if not results[ch['name']]]
+    return len(channels) - len(failed), failed
+
+def run_pass_global(channels, overrides, today_str, store):
+    """
+    ① 各チャンネルの統計・動画ID一覧を並列取得
+    ② 全チャンネルの動画IDを50件単位に詰めて動画詳細を一括取得
+    ③ チャンネルごとにタイプ判定・保存
+    (成功数, 失敗チャンネル) を返す
+    """
+    def prepare(ch):
+        with metrics.channel(ch['name']):
+            return prepare_channel(ch, today_str, store, thread_youtube())
+
+    contexts = _run_parallel(prepare, channels)
+    ready = [ch for ch in channels if contexts[ch['name']]]
+
+    items_by_channel, failed_ids = fetch_video_items_global(
+        {ch['name']: contexts[ch['name']]['video_ids'] for ch in ready}
+    )
+
+    def finish(ch):
+        ctx = contexts[ch['name']]
+        if failed_ids.intersection(ctx['video_ids']):
+            print(f'  ❌ {ch["name"]}: 動画詳細の一括取得に失敗した動画があります')
+            return False
+        with metrics.channel(ch['name']):
+            return finish_channel(ctx, items_by_channel[ch['name']], overrides, today_str, store, thread_youtube())
+
+    results = _run_parallel(finish, ready)
+    failed = [ch for ch in channels if not results.get(ch['name'])]
+    return len(channels) - len(failed), failed
+
+# ----------------------------------------------------------------
+# 非同期エンジン（--engine async）
+# ----------------------------------------------------------------
+# チャンネルごとの処理（統計 → 動画一覧 → 動画詳細 → Short判定 → 保存）をコルーチンにして
+# 全チャンネル分を同時に進める。googleapiclient / requests は同期APIなので、各呼び出しは
+# エンドポイントのセマフォを取ってからワーカースレッドで実行する。
+
+class AsyncApi:
+    """エンドポイントごとのセマフォで同時実行数を抑えながら、同期の呼び出しをワーカースレッドで実行する"""
+
+    def __init__(self, limits):
+        self.semaphores = {endpoint: asyncio.Semaphore(n) for endpoint, n in limits.items()}
+
+    async def call(self, endpoint, fn):
+        async with self.semaphores[endpoint]:
+            return await asyncio.to_thread(fn)
+
+def run_pass_async(channels, overrides, today_str, store):
+    """非同期エンジンで全チャンネルを処理。(成功数, 失敗チャンネル) を返す"""
+    results = asyncio.run(_run_channels_async(channels, overrides, today_str, store))
+    failed = [ch for ch, ok in zip(channels, results) if not ok]
+    return len(channels) - len(failed), failed
+
+async def _run_channels_async(channels, overrides, today_str, store):
+    # スレッド数はセマフォの合計で足りる（それ以上は同時に動かない）
+    asyncio.get_running_loop().set_default_executor(
+        ThreadPoolExecutor(max_workers=sum(ASYNC_LIMITS.values()))
+    )
+    api = AsyncApi(ASYNC_LIMITS)
+    return await asyncio.gather(*(
+        process_channel_async(api, ch, overrides, today_str, store) for ch in channels
+    ))
+
+async def process_channel_async(api, channel_config, overrides, today_str, store):
+    """process_channel() と同じ処理。失敗時は False"""
+    with metrics.channel(channel_config['name']):
+        return await _process_channel_async(api, channel_config, overrides, today_str, store)
+
+async def _process_channel_async(api, channel_config, overrides, today_str, store):
+    try:
+        ctx = await prepare_channel_async(api, channel_config, today_str, store)
+        if ctx is None:
+            return False
+
+        try:
+            items = await fetch_video_items_async(api, ctx['video_ids'])
+        except Exception as e:
+            print(f'  ⚠️  動画取得エラー: {e}')
+            print(f'  ❌ {ctx["name"]}: 動画を取得できませんでした')
+            return False
+
+        new_items = [
+            item for item in visible_items(ctx, items)
+            if item['id'] not in ctx['cached_videos']
+        ]
+        short_cache = {}
+        if new_items:
+            restore_short_verdicts(ctx['name'])
+            short_cache = await classify_shorts_async(api, new_items)
+            record_shorts(ctx['name'], short_cache)
+
+        return await api.call('local', lambda: finish_channel(
+            ctx, items, overrides, today_str, store, thread_youtube(), short_cache
+        ))
+    except Exception as e:
+        print(f'  ❌ {channel_config["name"]} で予期しないエラー: {e}')
+        return False
+
+async def prepare_channel_async(api, channel_config, today_str, store):
+    """prepare_channel() と同じ手順を、API呼び出しごとにセマフォを通して行う"""
+    channel_name = channel_config['name']
+    print_channel_header(channel_name)
+
+    ctx = journal_context(channel_name, today_str, store)
+    if ctx is not None:
+        return ctx
+
+    recorded = journal_stats(channel_name)
+    if recorded:
+        channel_id, channel_stats, playlist_id = recorded
+    else:
+        channel_id = await api.call('channels', lambda: resolve_channel_id(thread_youtube(), channel_config, store))
+        if not channel_id:
+            return None
+
+        channel_stats = await api.call('channels', lambda: get_channel_stats(thread_youtube(), channel_id))
+        if not channel_stats:
+            print(f'  ❌ {channel_name}: チャンネル統計を取得できませんでした')
+            return None
+
+        playlist_id = await api.call('channels', lambda: resolve_uploads_playlist_id(
+            thread_youtube(), channel_name, channel_id, store
+        ))
+        if not playlist_id:
+            return None
+        record_stats(channel_name, channel_id, channel_stats, playlist_id)
+
+    # 再生リストのページングは前ページの結果に依存するため、チャンネル内では順番に行う
+    cached_videos, last_full_sweep, full_sweep = discovery_plan(channel_name, today_str, store)
+    video_ids = await api.call('playlistItems', lambda: list_channel_video_ids(
+        thread_youtube(), playlist_id, cached_videos, full_sweep
+    ))
+    if not video_ids:
+        print(f'  ❌ {channel_name}: 動画を取得できませんでした')
+        return None
+    record_video_list(channel_name, video_ids, full_sweep, last_full_sweep)
+
+    return channel_context(channel_name, channel_id, channel_stats, playlist_id,
+                           cached_videos, last_full_sweep, full_sweep, video_ids, today_str)
+
+@metrics.timed('videos')
+async def fetch_video_items_async(api, video_ids):
+    """fetch_video_items() と同じ結果（IDの順序を保つ）。50件ごとの呼び出しは同時に発行"""
+    chunks = [video_ids[i:i + 50] for i in range(0, len(video_ids), 50)]
+    results = await asyncio.gather(*(
+        api.call('videos', lambda chunk=chunk: _fetch_chunk(chunk)) for chunk in chunks
+    ))
+    items = [item for chunk_items in results for item in chunk_items]
+    print(f'  取得中... {len(items)}本')
+    return items
+
+@metrics.timed('shorts')
+async def classify_shorts_async(api, items):
+    """classify_shorts() と同じ判定。HEADは全チャンネル合わせて ASYNC_LIMITS['shorts'] 並列"""
+    results, probe_ids = short_candidates(items)
+    verdicts = await asyncio.gather(*(
+        api.call('shorts', lambda vid=vid: is_short_video(vid)) for vid in probe_ids
+    ))
+    record_short_verdicts(results, dict(zip(probe_ids, verdicts)))
+    return results
+
 if __name__ == '__main__':
     import argparse
     parser = argparse.ArgumentParser()
     parser.add_argument('--summary-only', action='store_true',
                          help='既存のhistory_*.jsonからdashboard_summary.jsonのみ再生成（YouTube API呼び出しなし）')
+    parser.add_argument('--full', action='store_true',
+                         help='--summary-only と併用: 前回サマリーを使わず全履歴から再集計')
+    parser.add_argument('--full-sweep', action='store_true',
+                         help='全チャンネルの動画一覧を差分取得せず全件取得する')
+    parser.add_argument('--engine', choices=['thread', 'async'], default=ENGINE,
+                         help='収集エンジン（async: 全チャンネルのAPI呼び出しをコルーチンで並行実行）')
+    parser.add_argument('--summary-workers', type=int, default=SUMMARY_WORKERS,
+                         help='全件再集計・series生成のプロセス数（1 = 直列）')
+    parser.add_argument('--deadline', type=int, default=RUN_DEADLINE_SEC,
+                         help='実行開始からこの秒数を過ぎたら新しいAPI呼び出しをしない（0 = 無制限）')
+    parser.add_argument('--fresh', action='store_true',
+                         help=f'{run_journal.RUN_JOURNAL_FILE} の今日の途中経過を使わず最初から処理する')
+    parser.add_argument('--history-db', action='store_true', default=HISTORY_DB,
+                         help=f'履歴を {history_db.HISTORY_DB_FILE} にも書き込み、全件再集計を SQLite で行う')
     args = parser.parse_args()
 
+    if args.full_sweep:
+        DISCOVERY_FULL_SWEEP_DAYS = 0
+    ENGINE = args.engine
+    SUMMARY_WORKERS = args.summary_workers
+    FRESH_RUN = args.fresh
+    RUN_DEADLINE_SEC = args.deadline
+    HISTORY_DB = args.history_db
+
     if args.summary_only:
-        build_dashboard_summary()
+        build_dashboard_summary(full=args.full)
     else:
         main()
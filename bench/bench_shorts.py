@@ -0,0 +1,145 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Short判定のベンチマーク（新規タレントの初回バックフィル）
+
+bench/fake_youtube.py のローカルサーバーに対して、スナップショットが空の
+チャンネルを run_channels() で処理し、Short判定にかかる時間とアクセス数を比較する。
+
+    legacy  : 全動画に毎回新しい接続で HEAD（リダイレクト追従）、チャンネルごとのプール
+    probe   : 共有セッション・共有プールで全動画を HEAD（再生時間による除外なし）
+    default : 再生時間による除外＋共有セッション（判定キャッシュは空）
+    cached  : default の2回目（判定キャッシュあり・スナップショットは空のまま）
+    async   : default を非同期エンジン（--engine async）で実行
+
+結果のタイプ判定が全方式で一致することも確認する。
+
+    python bench/bench_shorts.py --channels 3 --videos 400 --latency 0.1
+"""
+
+import os
+import io
+import sys
+import json
+import time
+import shutil
+import tempfile
+import argparse
+import contextlib
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fake_youtube import FakeYouTube, make_dataset, serve, channels_config
+
+def legacy_check_shorts_batch(ac):
+    """変更前の Short判定（比較用）"""
+    def is_short_video(video_id):
+        url = f'{ac.WEB_ENDPOINT}/shorts/{video_id}'
+        try:
+            response = requests.head(url, allow_redirects=True, timeout=5)
+            return 'shorts' in response.url.lower()
+        except Exception:
+            return False
+
+    def check_shorts_batch(video_ids):
+        results = {}
+        with ThreadPoolExecutor(max_workers=ac.MAX_WORKERS) as executor:
+            future_to_id = {executor.submit(is_short_video, vid): vid for vid in video_ids}
+            for future in as_completed(future_to_id):
+                results[future_to_id[future]] = future.result()
+        return results
+
+    return lambda items: check_shorts_batch([item['id'] for item in items])
+
+def run_mode(ac, fake, channels, today_str, workdir, keep_cache, verbose):
+    """1方式を実行し (秒, アクセス数, {動画ID: type}) を返す"""
+    cache = os.path.join(workdir, ac.SHORTS_CACHE_FILE)
+    kept = open(cache).read() if keep_cache and os.path.exists(cache) else None
+    shutil.rmtree(workdir, ignore_errors=True)
+    os.makedirs(workdir)
+    os.chdir(workdir)
+    if kept is not None:
+        with open(cache, 'w') as f:
+            f.write(kept)
+    ac.short_verdicts = ac.ShortVerdictCache()
+    fake.calls.clear()
+
+    out = sys.stdout if verbose else io.StringIO()
+    with contextlib.redirect_stdout(out):
+        store = ac.SnapshotStore()
+        start = time.perf_counter()
+        ac.run_channels(channels, {}, today_str, store)
+        elapsed = time.perf_counter() - start
+        store.flush()
+        ac.short_verdicts.flush()
+
+    types = {
+        vid: v['type']
+        for entry in ac.load_json(ac.SNAPSHOTS_FILE, {}).values()
+        for vid, v in entry['videos'].items()
+    }
+    probes = fake.calls['shorts'] + fake.calls['watch']
+    return elapsed, probes, types
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--channels', type=int, default=3)
+    parser.add_argument('--videos', type=int, default=400, help='1チャンネルあたりの動画数')
+    parser.add_argument('--latency', type=float, default=0.1, help='1リクエストあたりの遅延（秒）')
+    parser.add_argument('--verbose', action='store_true', help='auto_check.py のログを表示')
+    args = parser.parse_args()
+
+    dataset = make_dataset(args.channels, args.videos)
+    fake = FakeYouTube(dataset, latency=args.latency)
+    server, url = serve(fake)
+
+    # auto_check はインポート時に環境変数を読むので、先に設定する
+    os.environ['YOUTUBE_API_ENDPOINT'] = url
+    os.environ['YOUTUBE_WEB_ENDPOINT'] = url.rstrip('/')
+    os.environ.setdefault('YOUTUBE_API_KEY', 'bench')
+    import auto_check as ac
+
+    today_str = datetime.now().strftime('%Y-%m-%d')
+    channels = channels_config(dataset)
+    tmp = tempfile.mkdtemp(prefix='bench_shorts_')
+    cwd = os.getcwd()
+    classify_shorts = ac.classify_shorts
+    short_max = ac.SHORT_MAX_SECONDS
+
+    default = {'ENGINE': 'thread', 'classify_shorts': classify_shorts, 'SHORT_MAX_SECONDS': short_max}
+    modes = [
+        ('legacy', {**default, 'classify_shorts': legacy_check_shorts_batch(ac)}, False),
+        ('probe', {**default, 'SHORT_MAX_SECONDS': float('inf')}, False),
+        ('default', default, False),
+        ('cached', default, True),
+        ('async', {**default, 'ENGINE': 'async'}, False),
+    ]
+
+    print(f'{args.channels}チャンネル × {args.videos}本（初回バックフィル）/ レイテンシ {args.latency * 1000:.0f}ms')
+    print(f'{"方式":<10}{"秒":>8}{"アクセス数":>10}')
+    results = {}
+    try:
+        for mode, settings, keep_cache in modes:
+            for key, value in settings.items():
+                setattr(ac, key, value)
+            elapsed, probes, results[mode] = run_mode(
+                ac, fake, channels, today_str, os.path.join(tmp, 'run'), keep_cache, args.verbose
+            )
+            print(f'{mode:<10}{elapsed:>8.2f}{probes:>10}')
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(tmp, ignore_errors=True)
+        server.shutdown()
+
+    baseline = results['legacy']
+    same = all(json.dumps(r, sort_keys=True) == json.dumps(baseline, sort_keys=True) for r in results.values())
+    print('✓ 全方式でタイプ判定が一致' if same else '❌ 方式によってタイプ判定が異なります')
+    return 0 if same else 1
+
+if __name__ == '__main__':
+    sys.exit(main())
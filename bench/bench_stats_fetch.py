@@ -0,0 +1,145 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+動画詳細取得（videos().list）の方式比較ベンチマーク
+
+bench/fake_youtube.py のローカルサーバーに対して run_channels() を実行し、
+STATS_FETCH の各方式の所要時間と API 呼び出し回数を比較する。
+
+    channel : チャンネルごとに videos().list（従来方式）
+    global  : 全チャンネルの動画IDを50件単位に詰めて並列取得
+    batch   : global + BatchHttpRequest で STATS_BATCH_CALLS 回分を1往復に
+    async   : 非同期エンジン（--engine async）
+
+全動画がキャッシュ済みのスナップショットを用意して実行するため、Short判定
+（youtube.com へのアクセス）は発生しない。結果のスナップショット・履歴ファイルが
+全方式で一致することも確認する。
+
+    python bench/bench_stats_fetch.py --channels 23 --videos 400 --latency 0.05
+"""
+
+import os
+import io
+import sys
+import json
+import time
+import shutil
+import tempfile
+import argparse
+import contextlib
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fake_youtube import FakeYouTube, make_dataset, serve, channels_config, is_short_item
+
+MODES = {
+    'channel': {'ENGINE': 'thread', 'STATS_FETCH': 'channel', 'STATS_BATCH_CALLS': 0},
+    'global':  {'ENGINE': 'thread', 'STATS_FETCH': 'global', 'STATS_BATCH_CALLS': 0},
+    'batch':   {'ENGINE': 'thread', 'STATS_FETCH': 'global', 'STATS_BATCH_CALLS': 10},
+    'async':   {'ENGINE': 'async', 'STATS_FETCH': 'global', 'STATS_BATCH_CALLS': 0},
+}
+
+def build_snapshots(dataset, today_str):
+    """全動画がキャッシュ済み・差分取得対象のスナップショット"""
+    snapshots = {}
+    for cid, ch in dataset.items():
+        snapshots[ch['name']] = {
+            'channel_id': cid,
+            'uploads_playlist_id': 'UU' + cid[2:],
+            'last_full_sweep': today_str,
+            'channel_stats': {},
+            'videos': {
+                v['id']: {
+                    'タイトル': v['snippet']['title'],
+                    '再生数': int(v['statistics']['viewCount']),
+                    '高評価数': int(v['statistics']['likeCount']),
+                    'コメント数': int(v['statistics']['commentCount']),
+                    'duration': 0,
+                    'type': 'Short' if is_short_item(v) else 'Movie',
+                }
+                for v in ch['videos']
+            },
+        }
+    return snapshots
+
+def run_mode(ac, fake, channels, snapshots, today_str, workdir, settings, verbose):
+    """1方式を実行し (秒, API呼び出し回数, 保存されたスナップショット・履歴) を返す"""
+    shutil.rmtree(workdir, ignore_errors=True)
+    os.makedirs(workdir)
+    os.chdir(workdir)
+    ac.save_json(ac.SNAPSHOTS_FILE, snapshots)
+    for key, value in settings.items():
+        setattr(ac, key, value)
+    ac._thread_local.__dict__.clear()  # 前の方式のクライアントを持ち越さない
+    fake.calls.clear()
+
+    out = sys.stdout if verbose else io.StringIO()
+    with contextlib.redirect_stdout(out):
+        store = ac.SnapshotStore()
+        start = time.perf_counter()
+        success, still_failed = ac.run_channels(channels, {}, today_str, store)
+        elapsed = time.perf_counter() - start
+        store.flush()
+
+    if still_failed:
+        print(f'⚠️  失敗チャンネル: {", ".join(still_failed)}')
+    snapshot = ac.load_json(ac.SNAPSHOTS_FILE, {})
+    for entry in snapshot.values():
+        entry['channel_stats'].pop('取得日時', None)
+    history = {}
+    for name in sorted(os.listdir(workdir)):
+        if name.startswith('history_'):
+            with open(name, encoding='utf-8') as f:
+                history[name] = f.read()
+    return elapsed, dict(fake.calls), {'snapshot': snapshot, 'history': history}
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--channels', type=int, default=23)
+    parser.add_argument('--videos', type=int, default=400, help='1チャンネルあたりの動画数')
+    parser.add_argument('--latency', type=float, default=0.05, help='1リクエストあたりの遅延（秒）')
+    parser.add_argument('--modes', default=','.join(MODES), help='比較する方式（カンマ区切り）')
+    parser.add_argument('--verbose', action='store_true', help='auto_check.py のログを表示')
+    args = parser.parse_args()
+
+    dataset = make_dataset(args.channels, args.videos)
+    fake = FakeYouTube(dataset, latency=args.latency)
+    server, url = serve(fake)
+
+    # auto_check はインポート時に環境変数を読むので、先に設定する
+    os.environ['YOUTUBE_API_ENDPOINT'] = url
+    os.environ['YOUTUBE_WEB_ENDPOINT'] = url.rstrip('/')
+    os.environ.setdefault('YOUTUBE_API_KEY', 'bench')
+    import auto_check as ac
+
+    today_str = datetime.now().strftime('%Y-%m-%d')
+    channels = channels_config(dataset)
+    snapshots = build_snapshots(dataset, today_str)
+    tmp = tempfile.mkdtemp(prefix='bench_stats_fetch_')
+    cwd = os.getcwd()
+
+    print(f'{args.channels}チャンネル × {args.videos}本 / レイテンシ {args.latency * 1000:.0f}ms')
+    print(f'{"方式":<10}{"秒":>8}  API呼び出し')
+    results = {}
+    try:
+        for mode in args.modes.split(','):
+            elapsed, calls, results[mode] = run_mode(
+                ac, fake, channels, snapshots, today_str,
+                os.path.join(tmp, mode), MODES[mode], args.verbose
+            )
+            detail = ', '.join(f'{k}={v}' for k, v in sorted(calls.items()))
+            print(f'{mode:<10}{elapsed:>8.2f}  {detail}')
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(tmp, ignore_errors=True)
+        server.shutdown()
+
+    baseline = next(iter(results.values()))
+    same = all(json.dumps(r, sort_keys=True) == json.dumps(baseline, sort_keys=True) for r in results.values())
+    print('✓ 全方式でスナップショット・履歴が一致' if same else '❌ 方式によってスナップショット・履歴が異なります')
+    return 0 if same else 1
+
+if __name__ == '__main__':
+    sys.exit(main())
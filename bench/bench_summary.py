@@ -0,0 +1,93 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+全件再集計（build_dashboard_summary(full=True)）と series 生成のプロセス並列ベンチマーク
+
+bench/synthetic.py の合成データセットに対して SUMMARY_WORKERS を変えて実行し、
+所要時間・直列比の速度・出力の一致を比較する。dashboard_summary.json は
+generated_at 以外がバイト単位で一致すること、series_*.json は全ファイルが
+一致することを確認する。
+
+    python bench/bench_summary.py --talents 100 --videos 300 --days 365 --workers 1,2,4
+"""
+
+import os
+import io
+import re
+import sys
+import time
+import shutil
+import tempfile
+import argparse
+import contextlib
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BENCH_DIR)
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+import synthetic
+
+def read_outputs(ac, talents):
+    """(generated_at を除いたサマリーのバイト列, {series ファイル名: バイト列})"""
+    with open(ac.SUMMARY_FILE, 'rb') as f:
+        summary = re.sub(rb'"generated_at": *"[^"]*"', b'"generated_at":""', f.read())
+    series = {}
+    for talent in talents:
+        path = ac.history_series.series_file(talent)
+        with open(path, 'rb') as f:
+            series[path] = f.read()
+    return summary, series
+
+def run_workers(ac, talents, workers, verbose):
+    """SUMMARY_WORKERS = workers で1回実行し (サマリー秒, series秒, 出力) を返す"""
+    ac.SUMMARY_WORKERS = workers
+    out = sys.stdout if verbose else io.StringIO()
+    with contextlib.redirect_stdout(out):
+        start = time.perf_counter()
+        ac.build_dashboard_summary(full=True)
+        summary_sec = time.perf_counter() - start
+
+        start = time.perf_counter()
+        ac.build_series_files(talents)
+        series_sec = time.perf_counter() - start
+    return summary_sec, series_sec, read_outputs(ac, talents)
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--talents', type=int, default=50)
+    parser.add_argument('--videos', type=int, default=300, help='1タレントあたりの動画数')
+    parser.add_argument('--days', type=int, default=365, help='履歴の日数')
+    parser.add_argument('--workers', default=f'1,2,{os.cpu_count() or 1}', help='比較するプロセス数（カンマ区切り）')
+    parser.add_argument('--verbose', action='store_true', help='auto_check.py のログを表示')
+    args = parser.parse_args()
+
+    os.environ.setdefault('YOUTUBE_API_KEY', 'bench')
+    import auto_check as ac
+
+    workers_list = sorted({int(w) for w in args.workers.split(',')})
+    tmp = tempfile.mkdtemp(prefix='bench_summary_')
+    cwd = os.getcwd()
+    print(f'合成データ: {args.talents}タレント × {args.videos}本 × {args.days}日 / CPU {os.cpu_count()}コア')
+    print(f'{"プロセス数":<10}{"サマリー秒":>10}{"速度比":>8}{"series秒":>10}{"速度比":>8}')
+
+    results = {}
+    try:
+        talents = synthetic.generate(tmp, args.talents, args.videos, args.days)
+        os.chdir(tmp)
+        base = None
+        for workers in workers_list:
+            summary_sec, series_sec, results[workers] = run_workers(ac, talents, workers, args.verbose)
+            base = base or (summary_sec, series_sec)
+            print(f'{workers:<10}{summary_sec:>10.2f}{base[0] / summary_sec:>7.2f}x'
+                  f'{series_sec:>10.2f}{base[1] / series_sec:>7.2f}x')
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(tmp, ignore_errors=True)
+
+    baseline = results[workers_list[0]]
+    same = all(r == baseline for r in results.values())
+    print('✓ 全プロセス数で出力が一致' if same else '❌ プロセス数によって出力が異なります')
+    return 0 if same else 1
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,212 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+最適化前後で結果が変わらないことの回帰チェック（assert ベース）
+
+ベンチマークが速度比と一緒に表示している「出力が一致」を、小さいデータで
+まとめて確認する。どれか1つでも一致しなければ終了コード 1。
+
+    async   : 非同期エンジンとスレッド版（channel / global / batch）で
+              スナップショット・履歴が一致する
+    parallel: 全件再集計・series 生成のプロセス並列（SUMMARY_WORKERS）と直列で
+              dashboard_summary.json（generated_at 以外）・series_*.json がバイト単位で一致する
+    sparse  : 変化分のみの形式（SPARSE_RECORDS。本体 version 3・ジャーナルの "ff" 行）と
+              全値の形式で、読み込んだ履歴が一致する（畳み込み後も含む）
+    sqlite  : history.sqlite3（HISTORY_DB）に取り込み・日次書き込みした後の書き出しが
+              history_{talent}.json と一致し、全件再集計の結果も JSON から集計した場合と一致する
+
+    python bench/check_equivalence.py
+    python bench/check_equivalence.py --only async --verbose
+
+bench/run_bench.py も計測の前にこれを実行する（--skip-checks で省略）。
+"""
+
+import os
+import io
+import sys
+import json
+import re
+import copy
+import shutil
+import tempfile
+import argparse
+import traceback
+import contextlib
+from datetime import datetime
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BENCH_DIR)
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+import synthetic
+import history_store
+from fake_youtube import FakeYouTube, make_dataset, serve, channels_config
+
+API_CHANNELS = 3
+API_VIDEOS = 60
+SYNTHETIC = {'talents': 4, 'videos': 40, 'days': 60}
+
+def check_async(ac, root, verbose):
+    """非同期エンジンとスレッド版で保存結果が一致する"""
+    import bench_stats_fetch
+
+    dataset = make_dataset(API_CHANNELS, API_VIDEOS)
+    fake = FakeYouTube(dataset)
+    server, url = serve(fake)
+    ac.API_ENDPOINT = url
+    ac.WEB_ENDPOINT = url.rstrip('/')
+    today_str = datetime.now().strftime('%Y-%m-%d')
+    snapshots = bench_stats_fetch.build_snapshots(dataset, today_str)
+    results = {}
+    try:
+        for mode, settings in bench_stats_fetch.MODES.items():
+            _, _, results[mode] = bench_stats_fetch.run_mode(
+                ac, fake, channels_config(dataset), snapshots, today_str,
+                os.path.join(root, mode), settings, verbose
+            )
+    finally:
+        server.shutdown()
+
+    baseline = json.dumps(results['channel'], sort_keys=True)
+    assert results['channel']['history'], '履歴が書き出されていません'
+    for mode, result in results.items():
+        assert json.dumps(result, sort_keys=True) == baseline, f'{mode} の結果が channel と異なります'
+
+def check_parallel(ac, root, verbose):
+    """プロセス並列と直列でサマリー・series がバイト単位で一致する"""
+    import bench_summary
+
+    talents = synthetic.generate(root, SYNTHETIC['talents'], SYNTHETIC['videos'], SYNTHETIC['days'])
+    os.chdir(root)
+    _, _, serial = bench_summary.run_workers(ac, talents, 1, verbose)
+    _, _, parallel = bench_summary.run_workers(ac, talents, 2, verbose)
+    assert serial[0] == parallel[0], 'dashboard_summary.json が直列と異なります'
+    assert serial[1] == parallel[1], 'series_*.json が直列と異なります'
+
+def synthetic_days(history, days=4):
+    """history の最終日から days 日分の (日付, 動画リスト, チャンネル統計)。値の変わらない動画・記録の無い日を含む"""
+    history = copy.deepcopy(history)
+    videos = synthetic.latest_videos(history)
+    result = []
+    for n in range(days):
+        date, moved, channel_stats = synthetic.next_day(history, videos)
+        moved = [prev if i % 3 == 0 else v for i, (prev, v) in enumerate(zip(videos, moved))]
+        if n == 1:
+            moved = moved[2:]  # 記録の無い日
+        history_store.record_day(history, date, moved, channel_stats)
+        result.append((date, moved, channel_stats))
+        videos = moved if n != 1 else videos
+    return result
+
+def load_all(talents):
+    return {talent: history_store.load_history(talent) for talent in talents}
+
+def check_sparse(ac, root, verbose):
+    """変化分のみの形式と全値の形式で、本体・ジャーナルとも読み込み結果が一致する"""
+    talents = synthetic.generate(os.path.join(root, 'base'), SYNTHETIC['talents'], SYNTHETIC['videos'], SYNTHETIC['days'])
+    os.chdir(os.path.join(root, 'base'))
+    days = {talent: synthetic_days(history_store.load_history(talent)) for talent in talents}
+
+    loaded = {}
+    for sparse in (True, False):
+        workdir = os.path.join(root, f'sparse_{sparse}')
+        shutil.copytree(os.path.join(root, 'base'), workdir)
+        os.chdir(workdir)
+        history_store.SPARSE_RECORDS = sparse
+        try:
+            for talent in talents:
+                history_store.save_history(history_store.load_history(talent))
+            for talent in talents:
+                for date, videos, channel_stats in days[talent]:
+                    ac.update_history(talent, videos, date, channel_stats)
+            journaled = load_all(talents)
+            streamed = {t: list(history_store.iter_video_records(t)) for t in talents}
+            for talent in talents:
+                history_store.compact_history(talent)
+            loaded[sparse] = journaled, streamed, load_all(talents)
+        finally:
+            history_store.SPARSE_RECORDS = True
+
+    journaled, streamed, compacted = loaded[True]
+    assert journaled == loaded[False][0], 'ジャーナル反映後の履歴が全値の形式と異なります'
+    assert streamed == loaded[False][1], 'iter_video_records() の結果が全値の形式と異なります'
+    assert compacted == loaded[False][2], '畳み込み後の履歴が全値の形式と異なります'
+    assert compacted == journaled, '畳み込みの前後で履歴が異なります'
+    for values in ([], [None], [0, 0, 0], [1, None, 1, 1], [None, None, 3, 3, 3, None, 3, 4]):
+        assert history_store.decode_runs(history_store.encode_runs(values)) == values, values
+
+def read_summary(ac):
+    with open(ac.SUMMARY_FILE, 'rb') as f:
+        return re.sub(rb'"generated_at": *"[^"]*"', b'"generated_at":""', f.read())
+
+def check_sqlite(ac, root, verbose):
+    """SQLite 版の書き出しが正本と一致し、SQLite から集計したサマリーも一致する"""
+    talents = synthetic.generate(root, SYNTHETIC['talents'], SYNTHETIC['videos'], SYNTHETIC['days'])
+    os.chdir(root)
+    ac.HISTORY_DB = True
+    db = ac.history_database()
+    try:
+        db.sync(talents)
+        for talent in talents:
+            for n, (date, videos, channel_stats) in enumerate(synthetic_days(history_store.load_history(talent))):
+                if n == 2:
+                    videos[-1] = {**videos[-1], 'type': 'Short' if videos[-1]['type'] != 'Short' else 'Movie'}
+                ac.update_history(talent, videos, date, channel_stats)
+            # 同日の再実行（上書き）
+            ac.update_history(talent, videos, date, channel_stats)
+        assert not db.sync(talents), '日次書き込み後に SQLite 版が正本と食い違っています'
+        for talent in talents:
+            assert db.export_history(talent) == history_store.load_history(talent), f'{talent} の書き出しが正本と異なります'
+
+        ac.build_dashboard_summary(full=True)
+        from_db = read_summary(ac)
+        ac.HISTORY_DB = False
+        ac.build_dashboard_summary(full=True)
+        assert from_db == read_summary(ac), 'SQLite から集計したサマリーが JSON からの集計と異なります'
+    finally:
+        db.close()
+        ac._history_db = None
+
+CHECKS = {
+    'async': check_async,
+    'parallel': check_parallel,
+    'sparse': check_sparse,
+    'sqlite': check_sqlite,
+}
+
+def run_checks(ac, names=None, verbose=False):
+    """チェックを順に実行し、一致しなかったチェック名のリストを返す"""
+    cwd = os.getcwd()
+    failed = []
+    for name in names or CHECKS:
+        root = tempfile.mkdtemp(prefix=f'check_{name}_')
+        settings = {key: value for key, value in vars(ac).items() if key.isupper()}
+        out = sys.stdout if verbose else io.StringIO()
+        try:
+            with contextlib.redirect_stdout(out):
+                CHECKS[name](ac, root, verbose)
+            print(f'✓ {name}')
+        except Exception:
+            failed.append(name)
+            print(f'❌ {name}')
+            traceback.print_exc()
+        finally:
+            os.chdir(cwd)
+            shutil.rmtree(root, ignore_errors=True)
+            vars(ac).update(settings)  # チェックごとに変えた設定を戻す
+    return failed
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--only', help='実行するチェック（カンマ区切り）')
+    parser.add_argument('--verbose', action='store_true', help='auto_check.py のログを表示')
+    args = parser.parse_args()
+
+    os.environ.setdefault('YOUTUBE_API_KEY', 'bench')
+    import auto_check as ac
+
+    failed = run_checks(ac, args.only.split(',') if args.only else None, args.verbose)
+    return 1 if failed else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
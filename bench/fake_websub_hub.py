@@ -0,0 +1,153 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+WebSub（PubSubHubbub）ハブのローカル代替（live_alert/live_monitor.py の動作確認用）
+
+YouTube が使う https://pubsubhubbub.appspot.com/ の最小限の実装。
+購読の申し込み（POST /subscribe）を 202 で受け付け、コールバックへ確認の GET
+（hub.challenge）を送って、応答が一致したものを購読として登録する。
+publish() でチャンネルのアップロードフィード（Atom）を購読者へ POST する
+（hub.secret があれば X-Hub-Signature: sha1=... を付ける）。
+
+単体起動（標準入力に「チャンネルID 動画ID [タイトル]」を1行ずつ入れると通知する）:
+    python bench/fake_websub_hub.py --port 8766
+    live_alert/config.json: "websub_hub_url": "http://127.0.0.1:8766/subscribe"
+"""
+
+import sys
+import hmac
+import time
+import secrets
+import hashlib
+import threading
+import urllib.parse
+import urllib.request
+from xml.sax.saxutils import escape
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+FEED_TOPIC = 'https://www.youtube.com/xml/feeds/videos.xml?channel_id={}'
+
+def atom_feed(channel_id, video_id, title):
+    """YouTube の通知と同じ形の Atom フィード"""
+    now = time.strftime('%Y-%m-%dT%H:%M:%S+00:00', time.gmtime())
+    return f'''<?xml version='1.0' encoding='UTF-8'?>
+<feed xmlns:yt="http://www.youtube.com/xml/schemas/2015" xmlns="http://www.w3.org/2005/Atom">
+ <link rel="hub" href="https://pubsubhubbub.appspot.com"/>
+ <link rel="self" href="{escape(FEED_TOPIC.format(channel_id))}"/>
+ <title>YouTube video feed</title>
+ <updated>{now}</updated>
+ <entry>
+  <id>yt:video:{video_id}</id>
+  <yt:videoId>{video_id}</yt:videoId>
+  <yt:channelId>{channel_id}</yt:channelId>
+  <title>{escape(title)}</title>
+  <link rel="alternate" href="https://www.youtube.com/watch?v={video_id}"/>
+  <published>{now}</published>
+  <updated>{now}</updated>
+ </entry>
+</feed>
+'''.encode('utf-8')
+
+class FakeHub:
+    """購読の確認と通知の配信。verified / rejected に確認の結果を数える"""
+
+    def __init__(self, max_lease=10 * 24 * 3600):
+        self.max_lease = max_lease
+        self.subscriptions = {}   # (トピック, コールバック) → {'secret', 'expires'}
+        self.verified = 0
+        self.rejected = 0
+        self._lock = threading.Lock()
+
+    def request(self, form):
+        """購読の申し込み。確認は別スレッドで行う（hub.verify=async 相当）"""
+        if form.get('hub.mode') not in ('subscribe', 'unsubscribe') or not form.get('hub.callback'):
+            return 400
+        threading.Thread(target=self.verify, args=(form,), daemon=True).start()
+        return 202
+
+    def verify(self, form):
+        lease = min(int(form.get('hub.lease_seconds') or self.max_lease), self.max_lease)
+        challenge = secrets.token_hex(8)
+        params = {
+            'hub.mode': form['hub.mode'],
+            'hub.topic': form['hub.topic'],
+            'hub.challenge': challenge,
+            'hub.lease_seconds': str(lease),
+        }
+        callback = form['hub.callback']
+        sep = '&' if '?' in callback else '?'
+        try:
+            with urllib.request.urlopen(callback + sep + urllib.parse.urlencode(params), timeout=5) as resp:
+                ok = resp.status == 200 and resp.read().decode() == challenge
+        except Exception:
+            ok = False
+        key = (form['hub.topic'], callback)
+        with self._lock:
+            if not ok:
+                self.rejected += 1
+                return
+            self.verified += 1
+            if form['hub.mode'] == 'subscribe':
+                self.subscriptions[key] = {'secret': form.get('hub.secret'), 'expires': time.time() + lease}
+            else:
+                self.subscriptions.pop(key, None)
+
+    def publish(self, channel_id, video_id, title='new video'):
+        """チャンネルの購読者全員に通知を送り、[コールバックの HTTP ステータス] を返す"""
+        topic = FEED_TOPIC.format(channel_id)
+        body = atom_feed(channel_id, video_id, title)
+        with self._lock:
+            targets = [(cb, sub) for (t, cb), sub in self.subscriptions.items() if t == topic]
+        statuses = []
+        for callback, sub in targets:
+            headers = {'Content-Type': 'application/atom+xml'}
+            if sub['secret']:
+                digest = hmac.new(sub['secret'].encode(), body, hashlib.sha1).hexdigest()
+                headers['X-Hub-Signature'] = f'sha1={digest}'
+            request = urllib.request.Request(callback, data=body, headers=headers)
+            try:
+                with urllib.request.urlopen(request, timeout=5) as resp:
+                    statuses.append(resp.status)
+            except Exception as e:
+                statuses.append(getattr(e, 'code', None))
+        return statuses
+
+class _Handler(BaseHTTPRequestHandler):
+    hub = None
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        form = {k: v[0] for k, v in urllib.parse.parse_qs(self.rfile.read(length).decode()).items()}
+        status = self.hub.request(form)
+        self.send_response(status)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+def serve(hub, host='127.0.0.1', port=0):
+    """バックグラウンドスレッドでハブを起動し (server, 申し込み先URL) を返す"""
+    handler = type('Handler', (_Handler,), {'hub': hub})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f'http://{host}:{server.server_address[1]}/subscribe'
+
+if __name__ == '__main__':
+    import argparse
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--port', type=int, default=8766)
+    args = parser.parse_args()
+
+    hub = FakeHub()
+    server, url = serve(hub, port=args.port)
+    print(f'fake WebSub hub: {url}')
+    print('「チャンネルID 動画ID [タイトル]」を入力すると購読者へ通知します（Ctrl+D で終了）')
+    for line in sys.stdin:
+        parts = line.split(maxsplit=2)
+        if len(parts) < 2:
+            continue
+        statuses = hub.publish(parts[0], parts[1], parts[2].strip() if len(parts) > 2 else 'new video')
+        print(f'  → 購読者 {len(statuses)}件: {statuses}')
+    server.shutdown()
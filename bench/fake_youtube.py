@@ -0,0 +1,317 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+YouTube Data API v3 のローカル代替サーバー（計測・動作確認用）
+
+auto_check.py を API キーやネットワークなしで動かすための最小限の実装。
+環境変数 YOUTUBE_API_ENDPOINT にこのサーバーの URL を設定して使う。
+
+対応エンドポイント:
+    GET  /youtube/v3/channels        (id / forHandle)
+    GET  /youtube/v3/playlistItems   (アップロード再生リストのみ)
+    GET  /youtube/v3/videos
+    POST /batch                      (BatchHttpRequest の multipart/mixed)
+    HEAD /shorts/{動画ID}, /watch    (Short なら 200、それ以外は /watch へ 303。YOUTUBE_WEB_ENDPOINT 用)
+
+レイテンシ（latency 秒、jitter で ±ゆらぎ）とエラー注入（error_rate の確率で
+error_status を返す。403 は quotaExceeded）を設定できる。乱数は seed 固定。
+
+単体起動:
+    python bench/fake_youtube.py --channels 23 --videos 400 --latency 0.05 --error-rate 0.02
+"""
+
+import sys
+import json
+import time
+import random
+import threading
+import email.parser
+import email.policy
+from collections import Counter
+from urllib.parse import urlsplit, parse_qs
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+# ----------------------------------------------------------------
+# データセット
+# ----------------------------------------------------------------
+
+def make_dataset(n_channels=23, videos_per_channel=400, seed=0, short_ratio=0.3, live_ratio=0.1):
+    """
+    チャンネル・動画のダミーデータを生成する（seed が同じなら同じ内容）。
+    Returns:
+        {channel_id: {'name', 'handle', 'subscribers', 'videos': [API形式の動画item...]}}
+        videos は新しい順（アップロード再生リストの並び）
+    """
+    rng = random.Random(seed)
+    channels = {}
+    for c in range(n_channels):
+        channel_id = f'UC{c:04d}' + 'x' * 18
+        videos = []
+        for n in range(videos_per_channel):
+            vid = f'v{c:03d}_{n:05d}'[:11].ljust(11, '0')
+            roll = rng.random()
+            if roll < short_ratio:
+                duration, live = f'PT{rng.randint(10, 59)}S', None
+            elif roll < short_ratio + live_ratio:
+                duration, live = f'PT{rng.randint(1, 3)}H{rng.randint(0, 59)}M', {'actualStartTime': '2025-01-01T12:00:00Z'}
+            else:
+                duration, live = f'PT{rng.randint(3, 6)}M{rng.randint(0, 59)}S', None
+            day = 1 + (videos_per_channel - n) % 28
+            item = {
+                'id': vid,
+                'snippet': {
+                    'title': f'Channel{c} Video{n}',
+                    'publishedAt': f'2025-{1 + n % 12:02d}-{day:02d}T12:00:00Z',
+                    'liveBroadcastContent': 'none',
+                },
+                'statistics': {
+                    'viewCount': str(rng.randint(100, 2_000_000)),
+                    'likeCount': str(rng.randint(0, 50_000)),
+                    'commentCount': str(rng.randint(0, 3_000)),
+                },
+                'contentDetails': {'duration': duration},
+                'status': {'privacyStatus': 'public'},
+            }
+            if live:
+                item['liveStreamingDetails'] = live
+            videos.append(item)
+        channels[channel_id] = {
+            'name': f'talent{c:02d}',
+            'handle': f'talent{c:02d}',
+            'subscribers': rng.randint(1_000, 500_000),
+            'videos': videos,
+        }
+    return channels
+
+def is_short_item(item):
+    """ダミーデータ上の Short 判定（60秒未満）"""
+    d = item['contentDetails']['duration']
+    return 'H' not in d and 'M' not in d
+
+# ----------------------------------------------------------------
+# API
+# ----------------------------------------------------------------
+
+class FakeYouTube:
+    """データセットに対して API レスポンスを組み立てる。呼び出し回数・注入したエラー数を数える"""
+
+    def __init__(self, dataset, latency=0.0, jitter=0.0, error_rate=0.0, error_status=503, seed=0):
+        self.dataset = dataset
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.calls = Counter()
+        self.errors = Counter()
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._videos = {v['id']: v for ch in dataset.values() for v in ch['videos']}
+        self._by_handle = {ch['handle']: cid for cid, ch in dataset.items()}
+        self._by_playlist = {'UU' + cid[2:]: cid for cid in dataset}
+
+    def count(self, endpoint):
+        with self._lock:
+            self.calls[endpoint] += 1
+
+    def delay(self):
+        if not self.latency:
+            return
+        with self._lock:
+            wait = self.latency + self._rng.uniform(-self.jitter, self.jitter)
+        time.sleep(max(0.0, wait))
+
+    def inject_error(self, endpoint):
+        """error_rate の確率でエラーにする。エラーにするなら (ステータス, レスポンス)、しないなら None"""
+        if not self.error_rate:
+            return None
+        with self._lock:
+            if self._rng.random() >= self.error_rate:
+                return None
+            self.errors[endpoint] += 1
+        reason = 'quotaExceeded' if self.error_status == 403 else 'backendError'
+        return self.error_status, _error(self.error_status, reason)
+
+    def handle(self, endpoint, params, delay=True):
+        """(HTTPステータス, レスポンスJSON) を返す。delay=False ならレイテンシを加えない"""
+        self.count(endpoint)
+        if delay:
+            self.delay()
+        error = self.inject_error(endpoint)
+        if error:
+            return error
+        method = getattr(self, 'api_' + endpoint, None)
+        if method is None:
+            return 404, _error(404, 'notFound')
+        return method(params)
+
+    def api_channels(self, params):
+        if 'forHandle' in params:
+            cid = self._by_handle.get(params['forHandle'].lstrip('@'))
+            ids = [cid] if cid else []
+        else:
+            ids = [i for i in params.get('id', '').split(',') if i in self.dataset]
+        items = []
+        for cid in ids:
+            ch = self.dataset[cid]
+            items.append({
+                'id': cid,
+                'snippet': {'title': ch['name']},
+                'statistics': {
+                    'subscriberCount': str(ch['subscribers']),
+                    'viewCount': str(sum(int(v['statistics']['viewCount']) for v in ch['videos'])),
+                    'videoCount': str(len(ch['videos'])),
+                },
+                'brandingSettings': {'image': {'bannerExternalUrl': ''}},
+                'contentDetails': {'relatedPlaylists': {'uploads': 'UU' + cid[2:]}},
+            })
+        return 200, {'items': items}
+
+    def api_playlistItems(self, params):
+        cid = self._by_playlist.get(params.get('playlistId', ''))
+        if cid is None:
+            return 404, _error(404, 'playlistNotFound')
+        start = int(params.get('pageToken') or 0)
+        size = int(params.get('maxResults', 5))
+        videos = self.dataset[cid]['videos']
+        page = videos[start:start + size]
+        resp = {'items': [{'snippet': {'resourceId': {'videoId': v['id']}}} for v in page]}
+        if start + size < len(videos):
+            resp['nextPageToken'] = str(start + size)
+        return 200, resp
+
+    def api_videos(self, params):
+        ids = [i for i in params.get('id', '').split(',') if i]
+        if len(ids) > 50:
+            return 400, _error(400, 'badRequest')
+        return 200, {'items': [self._videos[i] for i in ids if i in self._videos]}
+
+def _error(code, reason):
+    return {'error': {'code': code, 'message': reason, 'errors': [{'reason': reason}]}}
+
+# ----------------------------------------------------------------
+# HTTPサーバー
+# ----------------------------------------------------------------
+
+def _route(path):
+    """/youtube/v3/videos → 'videos'"""
+    return path.rstrip('/').rsplit('/', 1)[-1]
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    fake = None  # serve() でサブクラスに設定
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status, body, content_type='application/json; charset=UTF-8', headers=None):
+        data = body if isinstance(body, bytes) else json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(data)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        params = {k: v[0] for k, v in parse_qs(url.query).items()}
+        status, body = self.fake.handle(_route(url.path), params)
+        self._send(status, body)
+
+    def do_HEAD(self):
+        url = urlsplit(self.path)
+        if url.path == '/watch':
+            self.fake.count('watch')
+            self.fake.delay()
+            self._send(200, b'', content_type='text/html')
+            return
+        if not url.path.startswith('/shorts/'):
+            self._send(404, b'')
+            return
+        video_id = url.path.split('/')[-1]
+        self.fake.count('shorts')
+        self.fake.delay()
+        error = self.fake.inject_error('shorts')
+        if error:
+            self._send(error[0], b'', content_type='text/html')
+            return
+        item = self.fake._videos.get(video_id)
+        if item is not None and is_short_item(item):
+            self._send(200, b'', content_type='text/html')
+        else:
+            self._send(303, b'', content_type='text/html', headers={'Location': f'/watch?v={video_id}'})
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0))
+        body = self.rfile.read(length)
+        if _route(urlsplit(self.path).path) != 'batch':
+            self._send(404, _error(404, 'notFound'))
+            return
+        self.fake.count('batch')
+        self.fake.delay()  # バッチは1往復分のレイテンシ
+        boundary = 'batch_fake_youtube'
+        self._send(200, _batch_response(self.fake, self.headers['Content-Type'], body, boundary),
+                   content_type=f'multipart/mixed; boundary={boundary}')
+
+def _batch_response(fake, content_type, body, boundary):
+    """multipart/mixed のバッチを個別リクエストとして処理し、multipart/mixed で返す"""
+    msg = email.parser.BytesParser(policy=email.policy.HTTP).parsebytes(
+        f'Content-Type: {content_type}\r\n\r\n'.encode('utf-8') + body
+    )
+    out = []
+    for part in msg.iter_parts():
+        content_id = part['Content-ID'].strip('<>')
+        request_line = part.get_payload(decode=True).decode('utf-8').split('\r\n', 1)[0]
+        _, target, _ = request_line.split(' ', 2)
+        url = urlsplit(target)
+        params = {k: v[0] for k, v in parse_qs(url.query).items()}
+        status, payload = fake.handle(_route(url.path), params, delay=False)
+        out.append(
+            f'--{boundary}\r\n'
+            f'Content-Type: application/http\r\n'
+            f'Content-ID: <response-{content_id}>\r\n\r\n'
+            f'HTTP/1.1 {status} {"OK" if status == 200 else "Error"}\r\n'
+            f'Content-Type: application/json; charset=UTF-8\r\n\r\n'
+            f'{json.dumps(payload)}\r\n'
+        )
+    out.append(f'--{boundary}--\r\n')
+    return ''.join(out).encode('utf-8')
+
+def serve(fake, host='127.0.0.1', port=0):
+    """バックグラウンドスレッドでサーバーを起動し (server, base_url) を返す"""
+    handler = type('Handler', (_Handler,), {'fake': fake})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f'http://{host}:{server.server_address[1]}/'
+
+def channels_config(dataset):
+    """auto_check.py の CHANNELS 形式（name/url）"""
+    return [{'name': ch['name'], 'url': f'https://www.youtube.com/@{ch["handle"]}'} for ch in dataset.values()]
+
+if __name__ == '__main__':
+    import argparse
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--channels', type=int, default=23)
+    parser.add_argument('--videos', type=int, default=400, help='1チャンネルあたりの動画数')
+    parser.add_argument('--latency', type=float, default=0.0, help='1リクエストあたりの遅延（秒）')
+    parser.add_argument('--jitter', type=float, default=0.0, help='レイテンシのゆらぎ（秒）')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='エラーを返す確率')
+    parser.add_argument('--error-status', type=int, default=503, help='注入するエラーのステータス（403 = quotaExceeded）')
+    parser.add_argument('--port', type=int, default=8765)
+    args = parser.parse_args()
+
+    fake = FakeYouTube(make_dataset(args.channels, args.videos), latency=args.latency, jitter=args.jitter,
+                       error_rate=args.error_rate, error_status=args.error_status)
+    server, url = serve(fake, port=args.port)
+    print(f'fake YouTube API: {url}')
+    print(f'  YOUTUBE_API_ENDPOINT={url}')
+    print(f'  YOUTUBE_WEB_ENDPOINT={url.rstrip("/")}')
+    print(f'  CHANNELS={json.dumps(channels_config(fake.dataset), ensure_ascii=False)[:120]}...')
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        server.shutdown()
+        sys.exit(0)
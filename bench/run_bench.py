@@ -0,0 +1,298 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+オフラインベンチマーク（APIキー・ネットワーク不要）
+
+bench/synthetic.py の合成データセットと bench/fake_youtube.py のローカルサーバーを使い、
+auto_check.py の主要処理の所要時間とピークメモリ（tracemalloc）を計測する。
+
+    process_channel      : ローカルサーバーに対する日次処理（キャッシュ済みチャンネル）
+    update_history       : 全タレントに1日分を追記（ジャーナル）
+    update_history_direct: 同上（HISTORY_JOURNAL = False、本体を直接書き換え）
+    update_snapshots     : 全タレントのスナップショット更新＋書き出し
+    summary_full         : dashboard_summary.json の全件再集計
+    summary_incremental  : 1日分追記後の差分更新
+
+結果は --out で JSON に保存でき（コミットID・条件つき）、--compare で以前の結果と比較できる。
+計測の前に bench/check_equivalence.py の回帰チェックを実行し、出力が変わっていれば計測しない
+（--skip-checks で省略）。
+
+    python bench/run_bench.py --talents 100 --videos 300 --days 730 --out bench_100.json
+    python bench/run_bench.py --talents 100 --videos 300 --days 730 --compare bench_100.json
+"""
+
+import os
+import io
+import sys
+import json
+import time
+import shutil
+import tempfile
+import argparse
+import platform
+import subprocess
+import tracemalloc
+import contextlib
+from datetime import datetime
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, BENCH_DIR)
+sys.path.insert(0, ROOT_DIR)
+
+import synthetic
+import history_store
+import check_equivalence
+from fake_youtube import FakeYouTube, make_dataset, serve, channels_config
+
+END_DATE = '2026-10-16'
+
+# ----------------------------------------------------------------
+# 計測対象
+# ----------------------------------------------------------------
+# 各ベンチマークは (setup, run)。setup は計測外で作業ディレクトリ（テンプレートの
+# コピー）を準備して run に渡す引数を返し、run だけを計測する。
+
+def synthetic_day(ac, talents):
+    """全タレントの「翌日分」の (日付, 動画リスト, チャンネル統計)（計測外で1回だけ作る）"""
+    days = {}
+    for name in talents:
+        history = history_store.load_history(name)
+        days[name] = synthetic.next_day(history, synthetic.latest_videos(history))
+    return days
+
+def bench_update_history(ac, ctx, journal=True):
+    def setup():
+        ac.HISTORY_JOURNAL = journal
+        return ctx['next_day']
+
+    def run(next_day):
+        for name, (date, videos, channel_stats) in next_day.items():
+            ac.update_history(name, videos, date, channel_stats=channel_stats)
+        ac.HISTORY_JOURNAL = True
+    return setup, run
+
+def bench_update_snapshots(ac, ctx):
+    def setup():
+        return ctx['next_day']
+
+    def run(next_day):
+        store = ac.SnapshotStore()
+        for name, (date, videos, channel_stats) in next_day.items():
+            ac.update_snapshots(store, name, store.get_channel_id(name), channel_stats, videos)
+        store.flush()
+    return setup, run
+
+def bench_summary_full(ac, ctx):
+    return (lambda: None), (lambda _: ac.build_dashboard_summary(full=True))
+
+def bench_summary_incremental(ac, ctx):
+    def setup():
+        for name, (date, videos, channel_stats) in ctx['next_day'].items():
+            ac.update_history(name, videos, date, channel_stats=channel_stats)
+    return setup, (lambda _: ac.build_dashboard_summary())
+
+def bench_process_channel(ac, ctx):
+    def setup():
+        store = ac.SnapshotStore()
+        ac.short_verdicts = ac.ShortVerdictCache()
+        return store
+
+    def run(store):
+        for ch in ctx['api_channels']:
+            ac.process_channel(ch, {}, ctx['today_str'], store)
+        store.flush()
+        ac.short_verdicts.flush()
+    return setup, run
+
+BENCHMARKS = {
+    'process_channel': ('api', bench_process_channel),
+    'update_history': ('synthetic', bench_update_history),
+    'update_history_direct': ('synthetic', lambda ac, ctx: bench_update_history(ac, ctx, journal=False)),
+    'update_snapshots': ('synthetic', bench_update_snapshots),
+    'summary_full': ('synthetic', bench_summary_full),
+    'summary_incremental': ('synthetic', bench_summary_incremental),
+}
+
+# ----------------------------------------------------------------
+# 実行
+# ----------------------------------------------------------------
+
+@contextlib.contextmanager
+def workdir(template, root):
+    """テンプレートのコピーで作業し、終わったら削除する"""
+    path = os.path.join(root, 'work')
+    shutil.rmtree(path, ignore_errors=True)
+    shutil.copytree(template, path)
+    cwd = os.getcwd()
+    os.chdir(path)
+    try:
+        yield path
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(path, ignore_errors=True)
+
+def measure(ac, factory, ctx, template, root, repeat, verbose):
+    """(各回の秒数, ピークメモリMB) を返す"""
+    out = sys.stdout if verbose else io.StringIO()
+    times = []
+    for _ in range(repeat):
+        with workdir(template, root), contextlib.redirect_stdout(out):
+            setup, run = factory(ac, ctx)
+            arg = setup()
+            start = time.perf_counter()
+            run(arg)
+            times.append(time.perf_counter() - start)
+
+    # メモリは計測のオーバーヘッドがあるので時間とは別に1回
+    with workdir(template, root), contextlib.redirect_stdout(out):
+        setup, run = factory(ac, ctx)
+        arg = setup()
+        tracemalloc.start()
+        try:
+            run(arg)
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    return times, peak / 1e6
+
+def prepare_synthetic(ac, root, args):
+    """合成データセットのテンプレート（サマリー生成済み）と翌日分のデータ"""
+    template = os.path.join(root, 'synthetic')
+    talents = synthetic.generate(template, args.talents, args.videos, args.days, END_DATE)
+    cwd = os.getcwd()
+    os.chdir(template)
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            ac.build_dashboard_summary(full=True)
+        next_day = synthetic_day(ac, talents)
+    finally:
+        os.chdir(cwd)
+    return template, {'next_day': next_day}
+
+def prepare_api(ac, fake, root, args):
+    """ローカルサーバー用のテンプレート（1回処理済み＝キャッシュ済み）"""
+    template = os.path.join(root, 'api')
+    os.makedirs(template)
+    channels = channels_config(fake.dataset)
+    today_str = datetime.now().strftime('%Y-%m-%d')
+    cwd = os.getcwd()
+    os.chdir(template)
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            store = ac.SnapshotStore()
+            for ch in channels:
+                ac.process_channel(ch, {}, today_str, store)
+            store.flush()
+            ac.short_verdicts.flush()
+    finally:
+        os.chdir(cwd)
+    return template, {'api_channels': channels, 'today_str': today_str}
+
+def git_commit():
+    try:
+        rev = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT_DIR,
+                             capture_output=True, text=True, check=True).stdout.strip()
+        dirty = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], cwd=ROOT_DIR,
+                               capture_output=True, text=True).stdout.strip() != ''
+        return rev + ('-dirty' if dirty else '')
+    except Exception:
+        return 'unknown'
+
+def print_results(results, previous=None):
+    prev = (previous or {}).get('results', {})
+    header = f'{"ベンチマーク":<24}{"秒(最小)":>10}{"秒(中央)":>10}{"ピークMB":>10}'
+    if prev:
+        header += f'{"前回比":>10}'
+    print(header)
+    for name, r in results.items():
+        line = f'{name:<24}{r["seconds"]:>10.3f}{r["median"]:>10.3f}{r["peak_mb"]:>10.1f}'
+        if name in prev and prev[name]['seconds']:
+            line += f'{r["seconds"] / prev[name]["seconds"]:>9.2f}x'
+        print(line)
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--talents', type=int, default=23, help='合成データのタレント数')
+    parser.add_argument('--videos', type=int, default=200, help='合成データの1タレントあたりの動画数')
+    parser.add_argument('--days', type=int, default=365, help='合成データの履歴日数')
+    parser.add_argument('--api-channels', type=int, default=5, help='process_channel のチャンネル数')
+    parser.add_argument('--api-videos', type=int, default=300, help='process_channel の1チャンネルあたりの動画数')
+    parser.add_argument('--latency', type=float, default=0.0, help='ローカルサーバーのレイテンシ（秒）')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='ローカルサーバーのエラー注入率')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--only', help='実行するベンチマーク（カンマ区切り）')
+    parser.add_argument('--out', help='結果の保存先（JSON）')
+    parser.add_argument('--compare', help='比較する以前の結果（JSON）')
+    parser.add_argument('--skip-checks', action='store_true', help='計測前の回帰チェック（check_equivalence.py）を省略')
+    parser.add_argument('--verbose', action='store_true', help='auto_check.py のログを表示')
+    args = parser.parse_args()
+
+    names = args.only.split(',') if args.only else list(BENCHMARKS)
+    fake = FakeYouTube(make_dataset(args.api_channels, args.api_videos),
+                       latency=args.latency, error_rate=args.error_rate)
+    server, url = serve(fake)
+
+    # auto_check はインポート時に環境変数を読むので、先に設定する
+    os.environ['YOUTUBE_API_ENDPOINT'] = url
+    os.environ['YOUTUBE_WEB_ENDPOINT'] = url.rstrip('/')
+    os.environ.setdefault('YOUTUBE_API_KEY', 'bench')
+    import auto_check as ac
+
+    if not args.skip_checks:
+        failed = check_equivalence.run_checks(ac, verbose=args.verbose)
+        if failed:
+            print(f'❌ 回帰チェックに失敗したため計測しません: {", ".join(failed)}')
+            server.shutdown()
+            return 1
+        print()
+
+    root = tempfile.mkdtemp(prefix='rkpfr_bench_')
+    print(f'合成データ: {args.talents}タレント × {args.videos}本 × {args.days}日 / '
+          f'API: {args.api_channels}チャンネル × {args.api_videos}本（レイテンシ {args.latency * 1000:.0f}ms）')
+    results = {}
+    try:
+        templates = {}
+        start = time.perf_counter()
+        if any(BENCHMARKS[n][0] == 'synthetic' for n in names):
+            templates['synthetic'] = prepare_synthetic(ac, root, args)
+        if any(BENCHMARKS[n][0] == 'api' for n in names):
+            templates['api'] = prepare_api(ac, fake, root, args)
+        print(f'準備: {time.perf_counter() - start:.1f}秒\n')
+
+        for name in names:
+            kind, factory = BENCHMARKS[name]
+            template, ctx = templates[kind]
+            times, peak_mb = measure(ac, factory, ctx, template, root, args.repeat, args.verbose)
+            results[name] = {
+                'seconds': round(min(times), 4),
+                'median': round(sorted(times)[len(times) // 2], 4),
+                'runs': [round(t, 4) for t in times],
+                'peak_mb': round(peak_mb, 2),
+            }
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+        server.shutdown()
+
+    previous = None
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            previous = json.load(f)
+        print(f'比較対象: {previous.get("commit")}（{previous.get("created_at")}）')
+    print_results(results, previous)
+
+    if args.out:
+        report = {
+            'commit': git_commit(),
+            'created_at': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'params': {k: v for k, v in vars(args).items() if k not in ('out', 'compare', 'verbose', 'skip_checks')},
+            'results': results,
+        }
+        with open(args.out, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f'\n✓ 結果を保存: {args.out}')
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,160 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+合成データセット生成（ベンチマーク用）
+
+実データと同じ形式の history_{talent}.json（列指向コンパクト形式）、
+channels_config.json、all_snapshots.json を任意の規模で生成する。
+タレント数・動画数・日数を増やして、現在の23名から100名・1000名、
+数年分の履歴まで負荷を拡大できる。内容は seed が同じなら同じ。
+
+    python bench/synthetic.py OUTDIR --talents 100 --videos 300 --days 730
+"""
+
+import os
+import sys
+import json
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import history_store
+
+TYPES = ('Movie', 'Movie', 'Short', 'LiveArchive')
+
+def talent_name(t):
+    return f'synth{t:04d}'
+
+def video_id(t, n):
+    return f's{t:04d}_{n:05d}'[:11].ljust(11, '0')
+
+def date_axis(days, end_date):
+    end = datetime.strptime(end_date, '%Y-%m-%d')
+    return [(end - timedelta(days=days - 1 - i)).strftime('%Y-%m-%d') for i in range(days)]
+
+def _growth(total, rate, length, offset=0):
+    """公開直後に伸びて緩やかに頭打ちになる累積値の系列"""
+    return [int(total * (1 - rate ** (offset + i + 1))) + (offset + i) for i in range(length)]
+
+def make_history(t, videos, dates):
+    """1タレント分の履歴（コンパクト形式）"""
+    talent = talent_name(t)
+    history = history_store.new_history(talent)
+    history['dates'] = list(dates)
+    days = len(dates)
+
+    for n in range(videos):
+        # 動画は日付軸に均等に公開（n=0 が最も古い）
+        o = (n * days) // videos
+        length = days - o
+        total = 1000 + (t * 7919 + n * 104729) % 2_000_000
+        rate = 0.90 + ((t + n) % 9) / 100
+        views = _growth(total, rate, length)
+        history['videos'][video_id(t, n)] = {
+            'ti': f'Synthetic {talent} #{n}',
+            'pd': dates[o],
+            'ty': TYPES[(t + n) % len(TYPES)],
+            'du': 45 if TYPES[(t + n) % len(TYPES)] == 'Short' else 240 + (n % 7) * 600,
+            'o': o,
+            'v': views,
+            'l': [v // 40 for v in views],
+            'c': [v // 400 for v in views],
+        }
+
+    subs = _growth(10_000 + t * 997 % 500_000, 0.995, days)
+    total_views = [0] * days
+    for entry in history['videos'].values():
+        o = entry['o']
+        for i, v in enumerate(entry['v']):
+            total_views[o + i] += v
+    history['cs'] = {
+        's': subs,
+        'v': total_views,
+        'n': [sum(1 for n in range(videos) if (n * days) // videos <= i) for i in range(days)],
+    }
+    return history
+
+def latest_videos(history):
+    """履歴の最終日の値を auto_check.py の動画リスト形式で返す"""
+    last = len(history['dates']) - 1
+    videos = []
+    for vid, entry in history['videos'].items():
+        record = history_store.get_record(entry, last)
+        if record is None:
+            continue
+        videos.append({
+            '動画ID': vid,
+            'タイトル': entry['ti'],
+            '公開日': entry['pd'],
+            '再生数': record[0],
+            '高評価数': record[1],
+            'コメント数': record[2],
+            'type': entry['ty'],
+            'duration': entry['du'],
+        })
+    return videos
+
+def next_day(history, videos, growth=0.002):
+    """videos を1日進めた (日付, 動画リスト, チャンネル統計) を返す（履歴は変更しない）"""
+    last = datetime.strptime(history['dates'][-1], '%Y-%m-%d')
+    date = (last + timedelta(days=1)).strftime('%Y-%m-%d')
+    moved = []
+    for v in videos:
+        views = v['再生数'] + int(v['再生数'] * growth) + 1
+        moved.append({**v, '再生数': views, '高評価数': views // 40, 'コメント数': views // 400})
+    cs = history_store.get_channel_stats(history).get(history['dates'][-1], {})
+    channel_stats = {
+        'チャンネル名': history['talent'],
+        '登録者数': cs.get('登録者数', 0) + 10,
+        '総再生数': sum(v['再生数'] for v in moved),
+        '動画数': len(moved),
+    }
+    return date, moved, channel_stats
+
+def generate(outdir, talents=23, videos=200, days=365, end_date='2026-10-16'):
+    """
+    outdir に合成データセットを書き出す。
+    Returns: タレント名のリスト
+    """
+    os.makedirs(outdir, exist_ok=True)
+    dates = date_axis(days, end_date)
+    names = []
+    snapshots = {}
+    for t in range(talents):
+        history = make_history(t, videos, dates)
+        name = history['talent']
+        names.append(name)
+        history_store.save_history(history, os.path.join(outdir, history_store.history_file(name)))
+
+        cs = history_store.get_channel_stats(history)[dates[-1]]
+        snapshots[name] = {
+            'channel_id': f'UCsynth{t:04d}' + 'x' * 13,
+            'channel_stats': {'チャンネル名': name, **cs},
+            'videos': {
+                v['動画ID']: {
+                    'タイトル': v['タイトル'], '再生数': v['再生数'], '高評価数': v['高評価数'],
+                    'コメント数': v['コメント数'], 'duration': v['duration'], 'type': v['type'],
+                }
+                for v in latest_videos(history)
+            },
+        }
+
+    with open(os.path.join(outdir, 'channels_config.json'), 'w', encoding='utf-8') as f:
+        json.dump([{'name': name} for name in names], f, ensure_ascii=False)
+    with open(os.path.join(outdir, 'all_snapshots.json'), 'w', encoding='utf-8') as f:
+        json.dump(snapshots, f, ensure_ascii=False)
+    return names
+
+if __name__ == '__main__':
+    import argparse
+    parser = argparse.ArgumentParser()
+    parser.add_argument('outdir')
+    parser.add_argument('--talents', type=int, default=23)
+    parser.add_argument('--videos', type=int, default=200, help='1タレントあたりの動画数')
+    parser.add_argument('--days', type=int, default=365, help='履歴の日数')
+    parser.add_argument('--end-date', default='2026-10-16')
+    args = parser.parse_args()
+
+    names = generate(args.outdir, args.talents, args.videos, args.days, args.end_date)
+    size = sum(os.path.getsize(os.path.join(args.outdir, f)) for f in os.listdir(args.outdir))
+    print(f'✓ {len(names)}タレント × {args.videos}本 × {args.days}日 → {args.outdir}（{size / 1e6:.1f}MB）')
@@ -0,0 +1,264 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+動画別の伸びの指標 analytics_{talent}.json の生成モジュール（NumPy）
+
+タレントの履歴を指標（再生数・高評価数・コメント数）ごとに1枚の行列
+（行 = 動画、列 = 履歴の先頭日から最終日までの暦日。記録の無い日は NaN）にして、
+全動画の指標を行列演算でまとめて求める。Web は表示するだけで、動画ごとに履歴を走査しない。
+
+    {
+      "format": "rkpfr-analytics", "version": 1, "talent": "MEMESIA",
+      "date": "2026-10-17",                      # 基準日（履歴の最終日）
+      "dates": ["2026-10-03", ..., "2026-10-17"],  # dv / dl / dc の各要素の日付
+      "total": {"dv": [...], "a7", "a28", "f7", "f30"},   # 基準日に記録のある全動画の合計
+      "videos": {
+        "<動画ID>": {"ti", "pd", "ty", "v", "l", "c",
+                     "dv": [日別の再生数の増分...], "dl": [...], "dc": [...],
+                     "a7", "a28",      # 7日・28日移動平均（1日あたりの再生数の伸び）
+                     "g7", "g28",      # 7日・28日の伸び率（期間の伸び ÷ 期間の始まりの再生数）
+                     "k",              # 1日あたりの伸びの減衰率（予測に使う。1 = 横ばい）
+                     "f7", "f30",      # 7日後・30日後の再生数の予測
+                     "m", "eta"}       # 次の節目の再生数と到達予測日（見込みが無ければ null）
+      }
+    }
+
+- 日別の増分はその日の記録と直前の記録の差（記録の無い日は null。欠けた日の分は次の記録の日に入る）
+- 移動平均・伸び率は基準日と W 日前（以前で最新の記録）の差から求める。W 日前より後に公開された動画は
+  W 日前の値を0とし、それ以外で W 日前以前の記録が無い動画は null
+- 予測は直近7日の平均の伸びが、1日ごとに減衰率 k 倍になっていくとみなす。
+  k は直近7日と、その前の21日の平均の伸びの比から求め、ANALYTICS_MIN_DECAY 〜 1 に収める
+  （前の21日が分からない新しい動画は ANALYTICS_NEW_DECAY）
+- 基準日に記録の無い動画（非公開・削除など）は載せない
+- history_anomalies.py の補正値を渡すと、補正後の値で計算する
+- 書き出しは series_{talent}.json と同じく1動画1行
+
+全タレントの analytics を history_{talent}.json から作り直す:
+    python history_analytics.py
+"""
+
+import os
+import sys
+import math
+from datetime import date as Date, timedelta
+
+import history_store
+import history_series
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+ANALYTICS_FORMAT = 'rkpfr-analytics'
+ANALYTICS_VERSION = 1
+ANALYTICS_DAILY_DAYS = 15              # 日別の増分を載せる日数（Web の動画カードの15日分）
+ANALYTICS_WINDOWS = (7, 28)            # 移動平均・伸び率の期間（日数）
+ANALYTICS_FORECAST_DAYS = (7, 30)      # 予測する日数
+ANALYTICS_MILESTONES = (10_000, 50_000, 100_000, 500_000, 1_000_000, 5_000_000,
+                        10_000_000, 50_000_000, 100_000_000)
+ANALYTICS_MIN_DECAY = 0.8              # 減衰率 k の下限
+ANALYTICS_NEW_DECAY = 0.9              # 前の21日の伸びが分からない動画の減衰率
+ANALYTICS_ETA_MAX_DAYS = 3 * 365       # これより先の到達予測は null
+
+METRIC_KEYS = ('v', 'l', 'c')          # history_store の列（再生数・高評価数・コメント数）
+
+def analytics_file(channel_name):
+    return f'analytics_{channel_name}.json'
+
+# ----------------------------------------------------------------
+# 行列
+# ----------------------------------------------------------------
+
+def load_matrices(history, video_repairs=None):
+    """
+    コンパクト形式の履歴を暦日の行列にする。
+    (先頭日, 動画IDのリスト, {'v' / 'l' / 'c': 行列}) を返す。video_repairs は {動画ID: {日付: 補正値}}
+    """
+    dates = history['dates']
+    first = Date.fromisoformat(dates[0])
+    columns = np.array([(Date.fromisoformat(d) - first).days for d in dates], dtype=np.intp)
+    n_days = int(columns[-1]) + 1
+    vids = [vid for vid, entry in history['videos'].items() if entry['v']]
+    matrices = {key: np.full((len(vids), n_days), np.nan) for key in METRIC_KEYS}
+    for row, vid in enumerate(vids):
+        entry = history['videos'][vid]
+        idx = columns[entry['o']:entry['o'] + len(entry['v'])]
+        for key in METRIC_KEYS:
+            matrices[key][row, idx] = np.array(entry[key], dtype=float)   # None は NaN になる
+    for row, vid in enumerate(vids):
+        for d, values in (video_repairs or {}).get(vid, {}).items():
+            col = (Date.fromisoformat(d) - first).days
+            if 0 <= col < n_days:
+                for key, value in zip(METRIC_KEYS, values):
+                    matrices[key][row, col] = np.nan if value is None else value
+    return first, vids, matrices
+
+def _fill_forward(matrix):
+    """各セルをその日以前で最新の記録の値にする（最初の記録より前は NaN）"""
+    idx = np.where(~np.isnan(matrix), np.arange(matrix.shape[1]), 0)
+    np.maximum.accumulate(idx, axis=1, out=idx)
+    return np.take_along_axis(matrix, idx, axis=1)
+
+def _daily_deltas(matrix, filled, days):
+    """直近 days 日の日別の増分（その日の記録 − 直前の記録。どちらかが無ければ NaN）"""
+    prev = np.full_like(filled, np.nan)
+    prev[:, 1:] = filled[:, :-1]
+    return (matrix - prev)[:, -days:]
+
+def _base_values(filled, published_after, w):
+    """基準日の W 日前以前で最新の値。記録が無く W 日前より後に公開された動画は 0"""
+    col = filled.shape[1] - 1 - w
+    base = filled[:, col] if col >= 0 else np.full(filled.shape[0], np.nan)
+    return np.where(np.isnan(base) & published_after, 0.0, base)
+
+def _decay(recent, before):
+    """直近7日の平均の伸びと、その前の21日の平均の伸びから1日あたりの減衰率"""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        k = (recent / before) ** (1 / 14)   # 2つの区間の中心の間隔（3.5日前と17.5日前）
+    k = np.where((before > 0) & (recent > 0), k, ANALYTICS_NEW_DECAY)
+    return np.clip(k, ANALYTICS_MIN_DECAY, 1.0)
+
+def _forecast_gain(rate, k, days):
+    """1日目の伸びが rate * k で、以降1日ごとに k 倍になるとしたときの days 日間の伸び"""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        geometric = rate * k * (1 - k ** days) / (1 - k)
+    return np.where(k < 1, geometric, rate * days)
+
+def _days_to(need, rate, k):
+    """伸びが need に届くまでの日数（届かなければ NaN）"""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        limit = rate * k / (1 - k)   # k < 1 のときの伸びの上限
+        decaying = np.ceil(np.log(1 - need / limit) / np.log(k))
+        days = np.where(k < 1, np.where(need < limit, decaying, np.nan), np.ceil(need / rate))
+    days = np.where(rate > 0, days, np.nan)
+    return np.where(days <= ANALYTICS_ETA_MAX_DAYS, np.maximum(days, 1), np.nan)
+
+# ----------------------------------------------------------------
+# 生成
+# ----------------------------------------------------------------
+
+def _number(value, digits=None):
+    if value is None or math.isnan(value):
+        return None
+    value = float(value)
+    return round(value, digits) if digits is not None else int(value)
+
+def _numbers(values, digits=None):
+    return [_number(v, digits) for v in values.tolist()]
+
+def build_analytics(history, video_repairs=None):
+    """コンパクト形式の履歴から analytics を組み立てる"""
+    if np is None:
+        raise RuntimeError('NumPy がインストールされていません（pip install numpy）')
+    dates = history['dates']
+    analytics = {
+        'format': ANALYTICS_FORMAT,
+        'version': ANALYTICS_VERSION,
+        'talent': history['talent'],
+        'date': dates[-1] if dates else None,
+        'dates': [],
+        'total': {},
+        'videos': {},
+    }
+    if not dates:
+        return analytics
+
+    first, vids, matrices = load_matrices(history, video_repairs)
+    last = Date.fromisoformat(dates[-1])
+    n_days = matrices['v'].shape[1]
+    days = min(ANALYTICS_DAILY_DAYS, n_days)
+    analytics['dates'] = [(last - timedelta(days=i)).isoformat() for i in range(days - 1, -1, -1)]
+
+    current = ~np.isnan(matrices['v'][:, -1])
+    vids = [vid for vid, ok in zip(vids, current) if ok]
+    matrices = {key: m[current] for key, m in matrices.items()}
+    published = [(history['videos'][vid]['pd'] or '')[:10] for vid in vids]
+
+    filled = {key: _fill_forward(m) for key, m in matrices.items()}
+    deltas = {key: _daily_deltas(matrices[key], filled[key], days) for key in METRIC_KEYS}
+    views = filled['v'][:, -1]
+
+    averages, growth = {}, {}
+    for w in ANALYTICS_WINDOWS:
+        base_date = (last - timedelta(days=w)).isoformat()
+        base = _base_values(filled['v'], np.array([pd > base_date for pd in published], dtype=bool), w)
+        averages[w] = (views - base) / w
+        with np.errstate(divide='ignore', invalid='ignore'):
+            growth[w] = np.where(base > 0, (views - base) / base, np.nan)
+
+    # 予測: 直近7日の平均の伸び（a7）が1日ごとに k 倍になっていく
+    rate = np.nan_to_num(averages[7], nan=0.0).clip(min=0)
+    k = _decay(averages[7], (averages[28] * 28 - averages[7] * 7) / 21)
+    forecasts = {h: views + _forecast_gain(rate, k, h) for h in ANALYTICS_FORECAST_DAYS}
+    milestones = np.array(ANALYTICS_MILESTONES, dtype=float)
+    pos = np.searchsorted(milestones, views, side='right')
+    milestone = np.where(pos < len(milestones), milestones[np.minimum(pos, len(milestones) - 1)], np.nan)
+    eta = _days_to(milestone - views, rate, k)
+
+    for row, vid in enumerate(vids):
+        entry = history['videos'][vid]
+        eta_days = _number(eta[row])
+        analytics['videos'][vid] = {
+            'ti': entry['ti'],
+            'pd': entry['pd'],
+            'ty': entry['ty'],
+            'v': _number(views[row]),
+            'l': _number(filled['l'][row, -1]),
+            'c': _number(filled['c'][row, -1]),
+            'dv': _numbers(deltas['v'][row]),
+            'dl': _numbers(deltas['l'][row]),
+            'dc': _numbers(deltas['c'][row]),
+            **{f'a{w}': _number(averages[w][row], 1) for w in ANALYTICS_WINDOWS},
+            **{f'g{w}': _number(growth[w][row], 4) for w in ANALYTICS_WINDOWS},
+            'k': _number(k[row], 4),
+            **{f'f{h}': _number(np.round(forecasts[h][row])) for h in ANALYTICS_FORECAST_DAYS},
+            'm': _number(milestone[row]),
+            'eta': (last + timedelta(days=eta_days)).isoformat() if eta_days is not None else None,
+        }
+
+    analytics['total'] = {
+        'dv': _numbers(np.where(np.isnan(deltas['v']).all(axis=0), np.nan, np.nansum(deltas['v'], axis=0))),
+        **{f'a{w}': _number(np.nansum(averages[w]), 1) for w in ANALYTICS_WINDOWS},
+        **{f'f{h}': _number(np.round(forecasts[h].sum())) for h in ANALYTICS_FORECAST_DAYS},
+    }
+    return analytics
+
+def write_analytics(talent, history=None, path=None, video_repairs=None):
+    """history_{talent}.json（＋ジャーナル）から analytics_{talent}.json を書き出し、analytics を返す"""
+    if history is None:
+        history = history_store.load_history(talent)
+    analytics = build_analytics(history, video_repairs)
+    history_series.save_series(analytics, path or analytics_file(talent))
+    return analytics
+
+if __name__ == '__main__':
+    import glob
+    import time
+    import argparse
+    import history_anomalies
+    parser = argparse.ArgumentParser()
+    parser.add_argument('talents', nargs='*', help='対象タレント（省略時は history_*.json のある全員）')
+    parser.add_argument('--no-repairs', action='store_true', help=f'{history_anomalies.ANOMALY_REPORT_FILE} の補正値を使わない')
+    args = parser.parse_args()
+
+    if np is None:
+        print('❌ NumPy がインストールされていません（pip install numpy）')
+        sys.exit(1)
+    talents = args.talents
+    if not talents:
+        prefix, suffix = history_store.history_file('*').split('*')
+        talents = sorted(
+            os.path.basename(path)[len(prefix):-len(suffix)]
+            for path in glob.glob(history_store.history_file('*'))
+        )
+    if not talents:
+        print('❌ history_*.json がありません')
+        sys.exit(1)
+    repairs = {} if args.no_repairs else history_anomalies.load_repairs()
+    for talent in talents:
+        started = time.perf_counter()
+        analytics = write_analytics(talent, video_repairs=repairs.get(talent))
+        path = analytics_file(talent)
+        print(f'  ✓ {path}: 動画{len(analytics["videos"])}本（{os.path.getsize(path):,} bytes / '
+              f'{(time.perf_counter() - started) * 1000:.0f}ms）')
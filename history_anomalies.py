@@ -0,0 +1,427 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+履歴の異常値検知と補正（NumPy）
+
+全タレントの history_{talent}.json を指標（再生数・高評価数・コメント数）ごとに1枚の行列
+（行 = 動画、列 = 全タレント共通の日付軸。記録の無い日は NaN）に読み込み、
+全動画・全期間を1回のベクトル演算で走査する。
+
+検知する異常（kind）:
+    zeroed      値が0になり、GLITCH_DAYS 回以内の記録で元の水準に戻った            → 補正
+    dip         それまでの最大値から TOLERANCE 以上下がり、GLITCH_DAYS 回以内に戻った → 補正
+    spike       続く GLITCH_DAYS 回の記録より TOLERANCE 以上大きく、その後の値は直前までの水準以上で、
+                跳ね上がった幅の SPIKE_SHARE 以上が戻った（跳ねて元に戻った）        → 補正
+    regression  直前の記録から TOLERANCE 以上下がったまま（YouTube 側の無効な再生の除去・
+                コメントの無効化など。最新日の下落は翌日の記録までこちら）             → 記録のみ
+    surge       1日あたりの再生数の伸びが SURGE_MIN 以上かつ前回の記録の伸びの SURGE_FACTOR 倍以上
+                （公開・記録開始から SURGE_SKIP_DAYS 日以内は除く）                   → 記録のみ
+    gap         動画の最初と最後の記録の間で、タレントの記録はあるのに動画の記録が無い日 → 記録のみ
+    （タレント単位で記録の無い日付は missing_dates に範囲で持つ）
+
+補正値は、dip・zeroed は前後の正常な記録の間を日数で線形補間した値、spike は続く記録の最小値まで
+下げた値（跳ね上がった後に少しだけ戻った本物の伸びを前の水準まで戻さない。履歴ファイル自体は書き換えない）。
+結果は ANOMALY_REPORT_FILE に書き出し、auto_check.py の build_dashboard_summary() が
+補正後の値で集計する（ANOMALY_REPAIRS。一時的な0や跳ねによる前日比・日別種別内訳の歪みを除く）:
+
+    {"generated_at", "digest", "dates": [最初の日付, 最後の日付], "videos": 動画数,
+     "counts": {kind: 件数},
+     "talents": {talent: {"repairs": {動画ID: {日付: [再生数, 高評価数, コメント数]}},
+                          "flags": [{"id", "date", "kind", "metric", "value", "expected"}...],
+                          "gaps": {動画ID: [[開始日, 終了日]...]},
+                          "missing_dates": [[開始日, 終了日]...]}}}
+
+検知には NumPy が必要。補正値の読み込み・適用（load_repairs / repair_records）は NumPy なしで動く。
+
+全履歴の走査（scan）は summary の全件再集計のときだけ行う。日次の差分更新では、新しい1日分と
+前回のレポートだけで補正値が変わりうるか（day_suspects）を調べ、変わりうる動画があれば全件再集計に回す。
+
+    python history_anomalies.py              # 全タレントを走査して書き出す
+    python history_anomalies.py --show 20    # 書き出し後に直近の検知結果を表示
+"""
+
+import os
+import json
+import time
+import hashlib
+import tempfile
+from datetime import date as Date, datetime, timedelta, timezone
+
+import history_store
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+ANOMALY_REPORT_FILE = 'history_anomalies.json'
+
+METRICS = ('views', 'likes', 'comments')                 # 行列・補正値の並び（history_store の v / l / c）
+METRIC_KEYS = {'views': 'v', 'likes': 'l', 'comments': 'c'}
+TOLERANCE = {'views': 0.01, 'likes': 0.5, 'comments': 0.5}   # 異常とみなす変化の割合
+MIN_CHANGE = {'views': 100, 'likes': 10, 'comments': 10}     # 異常とみなす変化の最小値
+GLITCH_DAYS = 3          # 一時的な異常とみなす長さ（記録の回数）
+SPIKE_SHARE = 0.5        # spike: 跳ね上がった幅（直前までの最大値から）のうち、続く記録で戻った割合の下限
+SURGE_FACTOR = 20        # surge: 1日あたりの伸びが前回の記録の伸びの何倍以上か
+SURGE_MIN = 10000        # surge: 1日あたりの伸びの最小値（再生数）
+SURGE_SKIP_DAYS = 7      # surge: 公開・記録開始からこの日数は判定しない
+
+# ----------------------------------------------------------------
+# 読み込み
+# ----------------------------------------------------------------
+
+def load_matrices(talents):
+    """
+    全タレントの履歴（ジャーナル反映済み）を指標ごとの行列に読み込む。
+    (日付軸, 行ごとの (タレント, 動画ID, 公開日), {指標: 行列}, {タレント: 日付軸}) を返す
+    """
+    histories = {t: history_store.load_history(t) for t in talents if history_store.history_exists(t)}
+    dates = sorted({d for h in histories.values() for d in h['dates']})
+    column = {d: i for i, d in enumerate(dates)}
+    n_rows = sum(len(h['videos']) for h in histories.values())
+    matrices = {m: np.full((n_rows, len(dates)), np.nan) for m in METRICS}
+
+    rows = []
+    for talent, history in histories.items():
+        columns = np.array([column[d] for d in history['dates']], dtype=np.intp)
+        for vid, entry in history['videos'].items():
+            if not entry['v']:
+                continue
+            idx = columns[entry['o']:entry['o'] + len(entry['v'])]
+            for metric in METRICS:
+                # None は NaN になる
+                matrices[metric][len(rows), idx] = np.array(entry[METRIC_KEYS[metric]], dtype=float)
+            rows.append((talent, vid, entry['pd']))
+    matrices = {m: a[:len(rows)] for m, a in matrices.items()}
+    return dates, rows, matrices, {t: h['dates'] for t, h in histories.items()}
+
+# ----------------------------------------------------------------
+# 検知
+# ----------------------------------------------------------------
+
+def _prev_index(valid):
+    """各セルより前で最新の記録の列（無ければ -1）"""
+    idx = np.where(valid, np.arange(valid.shape[1]), -1)
+    acc = np.maximum.accumulate(idx, axis=1)
+    out = np.full_like(acc, -1)
+    out[:, 1:] = acc[:, :-1]
+    return out
+
+def _next_index(valid):
+    """各セルより後で最初の記録の列（無ければ列数）"""
+    n = valid.shape[1]
+    idx = np.where(valid, np.arange(n), n)
+    acc = np.minimum.accumulate(idx[:, ::-1], axis=1)[:, ::-1]
+    out = np.full_like(acc, n)
+    out[:, :-1] = acc[:, 1:]
+    return out
+
+def _take(matrix, idx):
+    """行ごとに列 idx の値（範囲外は NaN）"""
+    padded = np.concatenate([matrix, np.full((matrix.shape[0], 1), np.nan)], axis=1)
+    idx = np.where((idx < 0) | (idx >= matrix.shape[1]), matrix.shape[1], idx)
+    return np.take_along_axis(padded, idx, axis=1)
+
+def _ahead_range(matrix, k):
+    """続く k 列の値の (最大値, 最小値)（記録が無ければ NaN）"""
+    high = np.full_like(matrix, np.nan)
+    low = np.full_like(matrix, np.nan)
+    for j in range(1, k + 1):
+        high[:, :-j] = np.fmax(high[:, :-j], matrix[:, j:])
+        low[:, :-j] = np.fmin(low[:, :-j], matrix[:, j:])
+    return high, low
+
+def _transient(matrix, metric):
+    """一時的な異常（dip / zeroed / spike）のセル。(dip, spike) の bool 行列"""
+    tol, floor = TOLERANCE[metric], MIN_CHANGE[metric]
+    prior = np.full_like(matrix, np.nan)
+    prior[:, 1:] = np.fmax.accumulate(matrix, axis=1)[:, :-1]   # それまでの最大値
+    ahead_max, ahead_min = _ahead_range(matrix, GLITCH_DAYS)
+    with np.errstate(invalid='ignore'):
+        dip = (prior - matrix >= np.maximum(floor, tol * prior)) & (ahead_max >= prior)
+        overshoot = matrix - ahead_min
+        spike = ((overshoot >= np.maximum(floor, tol * ahead_min)) & (ahead_min >= prior)
+                 & (overshoot >= SPIKE_SHARE * (matrix - prior)))
+    return dip, spike
+
+def _interpolate(matrix, bad, days):
+    """bad のセルを前後の正常な記録の間で日数による線形補間（後が無ければ前の値）した値"""
+    cleaned = np.where(bad, np.nan, matrix)
+    valid = ~np.isnan(cleaned)
+    p, n = _prev_index(valid), _next_index(valid)
+    before, after = _take(cleaned, p), _take(cleaned, n)
+    day_p = days[np.clip(p, 0, len(days) - 1)]
+    day_n = days[np.clip(n, 0, len(days) - 1)]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        ratio = (days[np.newaxis, :] - day_p) / (day_n - day_p)
+        expected = np.where(np.isnan(after), before, before + (after - before) * ratio)
+    return np.where(bad, np.rint(expected), matrix)
+
+def _with_gaps(valid):
+    """最初と最後の記録の間に記録の無い列がある行（bool 配列）"""
+    n = valid.shape[1]
+    first = np.argmax(valid, axis=1)
+    last = n - 1 - np.argmax(valid[:, ::-1], axis=1)
+    return valid.any(axis=1) & (valid.sum(axis=1) < last - first + 1)
+
+def _transient_cells(matrix, metric, days):
+    """
+    一時的な異常のセルを補正する。(補正後の行列, 補正したセル, 種別 1 = dip・2 = spike) を返す。
+    連続した跳ねは2日目以降が1日目の値を「それまでの最大値」にしてしまうため、
+    検知したセルを記録なしにして GLITCH_DAYS 回まで判定し直す。
+    dip は前後の記録から線形補間し、spike は続く正常な記録の最小値まで下げる
+    （続く GLITCH_DAYS 列に正常な記録が無ければ線形補間）
+    """
+    valid = ~np.isnan(matrix)
+    bad = np.zeros_like(valid)
+    kinds = np.zeros(matrix.shape, dtype=np.int8)
+    current = matrix
+    for _ in range(GLITCH_DAYS):
+        dip, spike = _transient(current, metric)
+        new = valid & ~bad & (dip | spike)
+        if not new.any():
+            break
+        kinds[new & dip] = 1
+        kinds[new & spike & ~dip] = 2
+        bad |= new
+        current = np.where(bad, np.nan, matrix)
+    _, ahead_min = _ahead_range(current, GLITCH_DAYS)
+    clamp = (kinds == 2) & ~np.isnan(ahead_min)
+    return np.where(clamp, ahead_min, _interpolate(matrix, bad, days)), bad, kinds
+
+def detect(dates, matrices):
+    """
+    全行列を走査して (補正後の行列, 検知結果) を返す。
+    検知結果は (kind, 指標, 行の配列, 列の配列, 元の値, 補正値（surge は1日あたりの伸びと前回の伸び）) のリスト。
+
+    一時的な異常も下がったままの異常も、どこかでそれまでの最大値から MIN_CHANGE 以上下がる。
+    まず全行列でそういうセルのある行を選び、重い判定はその行だけに行う（通常は一握り）
+    """
+    days = np.array([Date.fromisoformat(d).toordinal() for d in dates], dtype=float)
+    repaired = {}
+    found = []
+    for metric in METRICS:
+        matrix = matrices[metric]
+        with np.errstate(invalid='ignore'):
+            below = np.fmax.accumulate(matrix, axis=1) - matrix >= MIN_CHANGE[metric]
+        candidates = np.nonzero(below.any(axis=1))[0]
+
+        sub = matrix[candidates]
+        current, bad, kinds = _transient_cells(sub, metric, days)
+        repaired[metric] = matrix.copy()
+        repaired[metric][candidates] = current
+
+        r, c = np.nonzero(bad)
+        values, expected = sub[r, c], current[r, c]
+        is_dip = kinds[r, c] == 1
+        zeroed = is_dip & (values == 0)
+        for kind, mask in (('zeroed', zeroed), ('dip', is_dip & ~zeroed), ('spike', ~is_dip)):
+            found.append((kind, metric, candidates[r[mask]], c[mask], values[mask], expected[mask]))
+
+        # 下がったまま（補正しない）
+        sub_valid = ~np.isnan(sub)
+        sub_prev = _take(current, _prev_index(sub_valid))
+        with np.errstate(invalid='ignore'):
+            drop = sub_valid & ~bad & (sub_prev - current >= np.maximum(MIN_CHANGE[metric], TOLERANCE[metric] * sub_prev))
+        r, c = np.nonzero(drop)
+        found.append(('regression', metric, candidates[r], c, current[r, c], sub_prev[r, c]))
+
+    # 再生数の急増（補正後の値で判定）: 隣の列との差が SURGE_MIN 以上の行と記録の欠けた行だけ、
+    # 1日あたりの伸びを前回の記録の伸びと比べる
+    views = repaired['views']
+    with np.errstate(invalid='ignore'):
+        steps = np.fmax.reduce(np.diff(views, axis=1), axis=1) >= SURGE_MIN
+    candidates = np.nonzero(steps | _with_gaps(~np.isnan(views)))[0]
+    sub = views[candidates]
+    valid = ~np.isnan(sub)
+    p = _prev_index(valid)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        per_day = (sub - _take(sub, p)) / (days[np.newaxis, :] - days[np.clip(p, 0, len(days) - 1)])
+        first_day = days[np.argmax(valid, axis=1)][:, np.newaxis]
+        per_day[(p < 0) | (days[np.newaxis, :] - first_day < SURGE_SKIP_DAYS)] = np.nan
+        before = _take(per_day, p)
+        surge = (per_day >= SURGE_MIN) & (per_day >= SURGE_FACTOR * before)
+    r, c = np.nonzero(surge)
+    found.append(('surge', 'views', candidates[r], c, per_day[r, c], before[r, c]))
+    return repaired, found
+
+def _gaps(valid, rows, dates, talent_dates):
+    """{(タレント, 動画ID): [[開始列, 終了列]...]}（タレントの記録がある日のみ）"""
+    talent_index = {t: i for i, t in enumerate(talent_dates)}
+    column = {d: i for i, d in enumerate(dates)}
+    has_date = np.zeros((len(talent_dates), len(dates)), dtype=bool)
+    for t, ds in talent_dates.items():
+        has_date[talent_index[t], [column[d] for d in ds]] = True
+
+    candidates = np.nonzero(_with_gaps(valid))[0]
+    sub = valid[candidates]
+    row_talent = np.array([talent_index[rows[i][0]] for i in candidates.tolist()], dtype=np.intp)
+    interior = ~sub & (_prev_index(sub) >= 0) & (_next_index(sub) < sub.shape[1])
+    r, c = np.nonzero(interior & has_date[row_talent])
+
+    gaps = {}
+    for row, col in zip(candidates[r].tolist(), c.tolist()):
+        ranges = gaps.setdefault(rows[row][:2], [])
+        if ranges and ranges[-1][1] == col - 1:
+            ranges[-1][1] = col
+        else:
+            ranges.append([col, col])
+    return gaps
+
+def missing_dates(talent_dates):
+    """最初と最後の日付の間で記録の無い日付の範囲 [[開始日, 終了日]...]"""
+    result = []
+    for a, b in zip(talent_dates, talent_dates[1:]):
+        da, db = Date.fromisoformat(a), Date.fromisoformat(b)
+        if (db - da).days > 1:
+            result.append([(da + timedelta(days=1)).isoformat(), (db - timedelta(days=1)).isoformat()])
+    return result
+
+# ----------------------------------------------------------------
+# レポート
+# ----------------------------------------------------------------
+
+def _number(value):
+    """JSON 用（NaN は None、整数値は int）"""
+    if value != value:
+        return None
+    return int(value) if float(value).is_integer() else round(float(value), 1)
+
+def scan(talents):
+    """全タレントを走査してレポート（ANOMALY_REPORT_FILE の内容）を返す"""
+    if np is None:
+        raise RuntimeError('NumPy がインストールされていません（pip install numpy）')
+    dates, rows, matrices, talent_dates = load_matrices(talents)
+    started = time.perf_counter()
+    report = {
+        'generated_at': datetime.now(timezone(timedelta(hours=9))).strftime('%Y-%m-%d %H:%M:%S'),
+        'digest': None,
+        'dates': [dates[0], dates[-1]] if dates else [],
+        'videos': len(rows),
+        'counts': {},
+        'talents': {},
+    }
+    per_talent = {t: {'repairs': {}, 'flags': [], 'gaps': {}, 'missing_dates': missing_dates(ds)}
+                  for t, ds in talent_dates.items()}
+    if not rows:
+        report['digest'] = repairs_digest({})
+        return report
+
+    repaired, found = detect(dates, matrices)
+    repair_cells = set()
+    for kind, metric, r, c, values, expected in found:
+        report['counts'][kind] = report['counts'].get(kind, 0) + len(r)
+        is_repair = kind in ('zeroed', 'dip', 'spike')
+        for row, col, value, exp in zip(r.tolist(), c.tolist(), values.tolist(), expected.tolist()):
+            talent, vid, _ = rows[row]
+            per_talent[talent]['flags'].append({
+                'id': vid, 'date': dates[col], 'kind': kind, 'metric': metric,
+                'value': _number(value), 'expected': _number(exp),
+            })
+            if is_repair:
+                repair_cells.add((row, col))
+    for row, col in sorted(repair_cells):
+        talent, vid, _ = rows[row]
+        per_talent[talent]['repairs'].setdefault(vid, {})[dates[col]] = [
+            int(repaired[m][row, col]) for m in METRICS
+        ]
+
+    gaps = _gaps(~np.isnan(matrices['views']), rows, dates, talent_dates)
+    report['counts']['gap'] = sum(b - a + 1 for ranges in gaps.values() for a, b in ranges)
+    for (talent, vid), ranges in gaps.items():
+        per_talent[talent]['gaps'][vid] = [[dates[a], dates[b]] for a, b in ranges]
+
+    for entry in per_talent.values():
+        entry['flags'].sort(key=lambda f: (f['date'], f['id'], f['metric']))
+    report['talents'] = per_talent
+    report['digest'] = repairs_digest({t: e['repairs'] for t, e in per_talent.items()})
+    report['scan_ms'] = round((time.perf_counter() - started) * 1000, 1)
+    return report
+
+def repairs_digest(repairs):
+    """補正値の内容のハッシュ（補正が変わったかの判定用）"""
+    body = json.dumps({t: r for t, r in repairs.items() if r}, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha1(body.encode('utf-8')).hexdigest()[:12]
+
+def save_report(report, path=ANOMALY_REPORT_FILE):
+    dir_ = os.path.dirname(os.path.abspath(path))
+    with tempfile.NamedTemporaryFile('w', encoding='utf-8', dir=dir_, delete=False, suffix='.tmp') as f:
+        json.dump(report, f, ensure_ascii=False, separators=(',', ':'))
+        tmp_path = f.name
+    os.replace(tmp_path, path)
+
+def load_report(path=ANOMALY_REPORT_FILE):
+    """前回のレポート（無い・壊れていれば None）"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def load_repairs(path=ANOMALY_REPORT_FILE):
+    """前回のレポートの補正値（report_repairs() と同じ形。レポートが無ければ空）"""
+    report = load_report(path)
+    return report_repairs(report) if report else {}
+
+def report_repairs(report):
+    """{タレント: {動画ID: {日付: (再生数, 高評価数, コメント数)}}}（補正のあるタレントのみ）"""
+    return {
+        talent: {vid: {d: tuple(values) for d, values in by_date.items()} for vid, by_date in entry['repairs'].items()}
+        for talent, entry in report.get('talents', {}).items() if entry.get('repairs')
+    }
+
+def day_suspects(report, date, rows):
+    """
+    新しい1日分（date）で、report の走査結果の補正値が変わりうる動画の [(タレント, 動画ID)...]。
+    rows は {(タレント, 動画ID): (date の値, [直前の記録の値...])}（値は (再生数, 高評価数, コメント数)）
+      - date の GLITCH_DAYS 日前以降に regression（まだ戻るかもしれない下落）がある動画
+      - date の値が直前の記録のいずれかから異常とみなす幅以上下がった動画（dip・zeroed の始まり、spike の終わり）
+    どちらにも当たらなければ、date を加えても補正の対象になる記録は無い
+    （一時的な異常は「下がって戻る」か「上がって下がる」ので、始まりか終わりのどちらかで下落が見える）
+    """
+    since = (Date.fromisoformat(date) - timedelta(days=GLITCH_DAYS)).isoformat()
+    suspects = {
+        (talent, f['id'])
+        for talent, entry in report.get('talents', {}).items()
+        for f in entry.get('flags', ())
+        if f['kind'] == 'regression' and f['date'] >= since
+    }
+    for key, (current, previous) in rows.items():
+        if key in suspects:
+            continue
+        for i, metric in enumerate(METRICS):
+            value = current[i]
+            if value is None:
+                continue
+            if any(p is not None and p[i] is not None
+                   and p[i] - value >= max(MIN_CHANGE[metric], TOLERANCE[metric] * p[i]) for p in previous):
+                suspects.add(key)
+                break
+    return sorted(s for s in suspects if s in rows)
+
+def repair_records(records, video_repairs):
+    """[(日付, 再生数, 高評価数, コメント数)...] の補正対象の日付だけ補正値に置き換える"""
+    if not video_repairs:
+        return records
+    return [(date, *video_repairs[date]) if date in video_repairs else (date, *values) for date, *values in records]
+
+if __name__ == '__main__':
+    import argparse
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--show', type=int, default=0, help='直近の検知結果をこの件数だけ表示')
+    args = parser.parse_args()
+
+    import history_db
+    talents = history_db.history_talents()
+    started = time.perf_counter()
+    report = scan(talents)
+    save_report(report)
+    print(f'{ANOMALY_REPORT_FILE}: {len(report["talents"])}タレント・{report["videos"]}本を走査 '
+          f'（検知 {report.get("scan_ms", 0):.0f}ms / 読み込み含め {time.perf_counter() - started:.2f}s）')
+    for kind, count in sorted(report['counts'].items()):
+        print(f'  {kind:<11} {count:>8,}')
+    if args.show:
+        flags = sorted(((t, f) for t, e in report['talents'].items() for f in e['flags']),
+                       key=lambda x: x[1]['date'], reverse=True)[:args.show]
+        for talent, f in flags:
+            print(f'  {f["date"]} {f["kind"]:<10} {f["metric"]:<8} {talent} {f["id"]}: {f["value"]} → {f["expected"]}')
@@ -0,0 +1,305 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+履歴のローカル SQLite ストア history.sqlite3（任意。集計・横断クエリ用）
+
+history_{talent}.json（＋ジャーナル）が正本で、このデータベースはその写し。
+auto_check.py の update_history() が1日分を書き込み、正本と食い違ったタレントは
+JSON から取り込み直す（タレントごとに取り込み時点の本体・ジャーナルのサイズと更新時刻を
+持っておき、変わっていたら取り込み直す）。ファイルを消しても次回の集計で作り直される。
+
+    talents        (talent PK, signature)                              取り込み時点のファイルの状態
+    videos         (id PK, talent, video_id, title, published, type, duration)
+                   UNIQUE(talent, video_id)・INDEX(published)・INDEX(type)
+    channel_stats  (talent, date, subscribers, views, videos)          PK(talent, date)
+    records        (vid → videos.id, date, views, likes, comments)     PK(vid, date)・INDEX(date)
+    type_gains     (talent, date, type, views)                          PK(talent, date, type)
+                   動画ごとの直前の記録からの再生数の増分（正の分のみ）の日別・種別ごとの合計。
+                   書き込みのたびに更新する（全記録を走査せずに種別内訳を出すため）
+
+videos.id はタレント内で history_{talent}.json の動画の並び順になる（書き出し・集計の順序）。
+クエリは history_queries.py。
+
+    python history_db.py --import            # history_*.json から全タレントを取り込み直す
+    python history_db.py --export out/       # out/history_{talent}.json に書き出す（同じ形式）
+"""
+
+import os
+import sys
+import glob
+import sqlite3
+import threading
+
+import history_store
+
+HISTORY_DB_FILE = 'history.sqlite3'
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS talents (
+    talent     TEXT PRIMARY KEY,
+    signature  TEXT
+);
+CREATE TABLE IF NOT EXISTS videos (
+    id         INTEGER PRIMARY KEY,
+    talent     TEXT NOT NULL,
+    video_id   TEXT NOT NULL,
+    title      TEXT,
+    published  TEXT,
+    type       TEXT,
+    duration   INTEGER,
+    UNIQUE (talent, video_id)
+);
+CREATE INDEX IF NOT EXISTS videos_published ON videos (published);
+CREATE INDEX IF NOT EXISTS videos_type ON videos (type);
+CREATE TABLE IF NOT EXISTS channel_stats (
+    talent       TEXT NOT NULL,
+    date         TEXT NOT NULL,
+    subscribers  INTEGER,
+    views        INTEGER,
+    videos       INTEGER,
+    PRIMARY KEY (talent, date)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS records (
+    vid       INTEGER NOT NULL REFERENCES videos (id),
+    date      TEXT NOT NULL,
+    views     INTEGER,
+    likes     INTEGER,
+    comments  INTEGER,
+    PRIMARY KEY (vid, date)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS records_date ON records (date);
+CREATE TABLE IF NOT EXISTS type_gains (
+    talent  TEXT NOT NULL,
+    date    TEXT NOT NULL,
+    type    TEXT NOT NULL,
+    views   INTEGER,
+    PRIMARY KEY (talent, date, type)
+) WITHOUT ROWID;
+'''
+
+# 動画ごとの直前の記録からの増分（正の分のみ）を日付・種別ごとに合計して type_gains に入れる
+_TALENT_GAINS = '''
+INSERT INTO type_gains (talent, date, type, views)
+SELECT ?, g.date, v.type, SUM(g.diff) FROM (
+    SELECT vid, date, views - LAG(views) OVER (PARTITION BY vid ORDER BY date) AS diff
+    FROM records WHERE vid IN (SELECT id FROM videos WHERE talent = ?)
+) g JOIN videos v ON v.id = g.vid
+WHERE g.diff > 0
+GROUP BY g.date, v.type
+'''
+_DAY_GAINS = '''
+INSERT INTO type_gains (talent, date, type, views)
+SELECT ?, ?, type, SUM(diff) FROM (
+    SELECT v.type, r.views - (SELECT p.views FROM records p WHERE p.vid = r.vid AND p.date < r.date
+                              ORDER BY p.date DESC LIMIT 1) AS diff
+    FROM records r JOIN videos v ON v.id = r.vid
+    WHERE r.date = ? AND v.talent = ?
+)
+WHERE diff > 0
+GROUP BY type
+'''
+
+def signature(talent, path=None):
+    """history_{talent}.json とジャーナルのサイズ・更新時刻（変わっていれば取り込み直す）"""
+    path = path or history_store.history_file(talent)
+    parts = []
+    for p in (path, history_store._journal_path_for(path, talent)):
+        try:
+            st = os.stat(p)
+            parts.append(f'{st.st_size}:{st.st_mtime_ns}')
+        except FileNotFoundError:
+            parts.append('-')
+    return '/'.join(parts)
+
+class HistoryDB:
+    """
+    history.sqlite3 への接続。複数スレッドから使ってよい（1接続をロックで共有する）。
+    conn はクエリ用（history_queries.py の関数に渡す）。
+    """
+
+    def __init__(self, path=HISTORY_DB_FILE):
+        self.path = path
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.executescript(SCHEMA)
+        self._lock = threading.RLock()
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
+
+    # ---- 正本との同期 ----
+
+    def is_synced(self, talent, path=None):
+        """取り込み後に history_{talent}.json・ジャーナルが変わっていないか"""
+        with self._lock:
+            row = self.conn.execute('SELECT signature FROM talents WHERE talent = ?', (talent,)).fetchone()
+        return row is not None and row[0] == signature(talent, path)
+
+    def mark_synced(self, talent, path=None):
+        with self._lock, self.conn:
+            self.conn.execute('INSERT OR REPLACE INTO talents (talent, signature) VALUES (?, ?)',
+                              (talent, signature(talent, path)))
+
+    def sync(self, talents):
+        """正本と食い違ったタレントを取り込み直し、取り込んだタレントを返す"""
+        stale = [t for t in talents if not self.is_synced(t)]
+        for talent in stale:
+            self.import_talent(talent)
+        return stale
+
+    # ---- 書き込み ----
+
+    def import_talent(self, talent, path=None):
+        """history_{talent}.json（ジャーナル反映済み）の内容でタレントの行を置き換える"""
+        history = history_store.load_history(talent, path)
+        with self._lock, self.conn:
+            self._delete_talent(talent)
+            self.conn.executemany(
+                'INSERT INTO channel_stats (talent, date, subscribers, views, videos) VALUES (?, ?, ?, ?, ?)',
+                ((talent, date, *_cs_values(cs)) for date, cs in history_store.get_channel_stats(history).items())
+            )
+            row_ids = [
+                (self._insert_video(talent, vid, entry['ti'], entry['pd'], entry['ty'], entry['du']), entry)
+                for vid, entry in history['videos'].items()
+            ]
+            self.conn.executemany(
+                'INSERT INTO records (vid, date, views, likes, comments) VALUES (?, ?, ?, ?, ?)',
+                ((row_id, *r) for row_id, entry in row_ids for r in history_store.iter_records(history, entry))
+            )
+            self._update_gains(talent)
+            self.conn.execute('INSERT OR REPLACE INTO talents (talent, signature) VALUES (?, ?)',
+                              (talent, signature(talent, path)))
+        return history
+
+    def record_day(self, talent, date, videos, channel_stats=None):
+        """
+        auto_check.py の動画リスト1日分を書き込む（history_store.record_day() と同じ扱い:
+        同日は上書き、既存動画のタイトル・タイプ・再生時間は最新値で更新）
+        """
+        with self._lock, self.conn:
+            latest = self.conn.execute(
+                'SELECT MAX(r.date) FROM records r JOIN videos v ON v.id = r.vid WHERE v.talent = ?', (talent,)
+            ).fetchone()[0]
+            rebuild = latest is not None and date < latest   # 過去日の記録は翌日以降の増分も変わる
+            if channel_stats:
+                self.conn.execute(
+                    'INSERT OR REPLACE INTO channel_stats (talent, date, subscribers, views, videos) '
+                    'VALUES (?, ?, ?, ?, ?)',
+                    (talent, date, *_cs_values(channel_stats))
+                )
+            for video in videos:
+                row = self.conn.execute('SELECT id, type FROM videos WHERE talent = ? AND video_id = ?',
+                                        (talent, video['動画ID'])).fetchone()
+                if row is None:
+                    row_id = self._insert_video(talent, video['動画ID'], video['タイトル'], video['公開日'],
+                                                video['type'], video.get('duration', 0))
+                else:
+                    row_id = row[0]
+                    # タイプが変わった動画は過去の増分も付け替える
+                    rebuild = rebuild or row[1] != video['type']
+                    self.conn.execute('UPDATE videos SET title = ?, type = ?, duration = ? WHERE id = ?',
+                                      (video['タイトル'], video['type'], video.get('duration', 0), row_id))
+                self.conn.execute(
+                    'INSERT OR REPLACE INTO records (vid, date, views, likes, comments) VALUES (?, ?, ?, ?, ?)',
+                    (row_id, date, video['再生数'], video['高評価数'], video['コメント数'])
+                )
+            self._update_gains(talent, None if rebuild else date)
+
+    def _update_gains(self, talent, date=None):
+        """type_gains のタレント分（date を渡すとその日の分だけ）を作り直す"""
+        if date is None:
+            self.conn.execute('DELETE FROM type_gains WHERE talent = ?', (talent,))
+            self.conn.execute(_TALENT_GAINS, (talent, talent))
+        else:
+            self.conn.execute('DELETE FROM type_gains WHERE talent = ? AND date = ?', (talent, date))
+            self.conn.execute(_DAY_GAINS, (talent, date, date, talent))
+
+    def _insert_video(self, talent, video_id, title, published, vtype, duration):
+        cur = self.conn.execute(
+            'INSERT INTO videos (talent, video_id, title, published, type, duration) VALUES (?, ?, ?, ?, ?, ?)',
+            (talent, video_id, title, published, vtype, duration)
+        )
+        return cur.lastrowid
+
+    def _delete_talent(self, talent):
+        self.conn.execute('DELETE FROM records WHERE vid IN (SELECT id FROM videos WHERE talent = ?)', (talent,))
+        self.conn.execute('DELETE FROM videos WHERE talent = ?', (talent,))
+        self.conn.execute('DELETE FROM channel_stats WHERE talent = ?', (talent,))
+        self.conn.execute('DELETE FROM type_gains WHERE talent = ?', (talent,))
+        self.conn.execute('DELETE FROM talents WHERE talent = ?', (talent,))
+
+    # ---- 読み出し ----
+
+    def talents(self):
+        with self._lock:
+            return [row[0] for row in self.conn.execute('SELECT talent FROM talents ORDER BY talent')]
+
+    def export_history(self, talent):
+        """タレントの履歴を history_store と同じメモリ上の形（version 2）で返す"""
+        history = history_store.new_history(talent)
+        with self._lock:
+            cs_rows = self.conn.execute(
+                'SELECT date, subscribers, views, videos FROM channel_stats WHERE talent = ? ORDER BY date',
+                (talent,)
+            ).fetchall()
+            video_rows = self.conn.execute(
+                'SELECT id, video_id, title, published, type, duration FROM videos WHERE talent = ? ORDER BY id',
+                (talent,)
+            ).fetchall()
+            record_rows = self.conn.execute(
+                'SELECT r.vid, r.date, r.views, r.likes, r.comments FROM records r '
+                'JOIN videos v ON v.id = r.vid WHERE v.talent = ? ORDER BY r.vid, r.date',
+                (talent,)
+            ).fetchall()
+
+        # 日付軸を先に作っておく（set_record / set_channel_stats が途中に挿入しないように）
+        history['dates'] = sorted({row[0] for row in cs_rows} | {row[1] for row in record_rows})
+        history['cs'] = {key: [None] * len(history['dates']) for key, _ in history_store.CHANNEL_STATS_FIELDS}
+        for date, subscribers, views, n_videos in cs_rows:
+            history_store.set_channel_stats(history, date, {'登録者数': subscribers, '総再生数': views, '動画数': n_videos})
+        ids = {}
+        for row_id, video_id, title, published, vtype, duration in video_rows:
+            history_store.add_video(history, video_id, title, published, vtype, duration)
+            ids[row_id] = video_id
+        for row_id, date, views, likes, comments in record_rows:
+            history_store.set_record(history, ids[row_id], date, views, likes, comments)
+        return history
+
+def _cs_values(channel_stats):
+    return tuple(channel_stats.get(field, 0) for _, field in history_store.CHANNEL_STATS_FIELDS)
+
+def history_talents():
+    """カレントディレクトリの history_{talent}.json・ジャーナルのあるタレント名"""
+    names = {path[len('history_'):-len('.json')] for path in glob.glob(history_store.history_file('*'))}
+    suffix = history_store.journal_file('')[len('history_'):]
+    names.update(path[len('history_'):-len(suffix)] for path in glob.glob(history_store.journal_file('*')))
+    return sorted(names)
+
+if __name__ == '__main__':
+    import time
+    import argparse
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--db', default=HISTORY_DB_FILE)
+    parser.add_argument('--import', dest='import_all', action='store_true',
+                        help='history_*.json（＋ジャーナル）から全タレントを取り込み直す')
+    parser.add_argument('--export', metavar='DIR',
+                        help='DIR/history_{talent}.json に書き出す（history_store と同じ形式）')
+    args = parser.parse_args()
+
+    db = HistoryDB(args.db)
+    if args.import_all:
+        for talent in history_talents():
+            start = time.perf_counter()
+            history = db.import_talent(talent)
+            print(f'  ✓ {talent}: 動画{len(history["videos"])}本 / {len(history["dates"])}日分'
+                  f'（{time.perf_counter() - start:.2f}秒）')
+    elif args.export:
+        os.makedirs(args.export, exist_ok=True)
+        for talent in db.talents():
+            path = os.path.join(args.export, history_store.history_file(talent))
+            history_store.save_history(db.export_history(talent), path)
+            print(f'  ✓ {path}')
+    else:
+        parser.print_help()
+        sys.exit(1)
+    db.close()
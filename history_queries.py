@@ -0,0 +1,228 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+history.sqlite3（history_db.py）に対する集計・横断クエリ
+
+関数はすべて sqlite3 の接続（HistoryDB.conn）を第1引数に取る。
+dashboard_summary.json の全件再集計（auto_check.py の _build_summary_full()）と、
+全タレント横断のその場の問い合わせに使う。
+
+    python history_queries.py movers --days 7 --limit 20     # 直近7日で再生数の伸びた動画
+    python history_queries.py published 2026-10               # その月に公開された動画（全タレント）
+    python history_queries.py engagement                      # 種別ごとの高評価率・コメント率
+"""
+
+import time
+from datetime import date as Date, timedelta
+
+VIDEO_TYPES = ('Movie', 'Short', 'LiveArchive')
+
+def _placeholders(values):
+    return ','.join('?' * len(values))
+
+def latest_date(conn):
+    """記録のある最新の日付（無ければ None）"""
+    return conn.execute('SELECT MAX(date) FROM records').fetchone()[0]
+
+# ----------------------------------------------------------------
+# dashboard_summary.json 用
+# ----------------------------------------------------------------
+
+def channel_stats(conn, talents):
+    """{タレント: {日付: {登録者数, 総再生数, 動画数}}}（記録の無いタレントは含めない）"""
+    result = {}
+    rows = conn.execute(
+        f'SELECT talent, date, subscribers, views, videos FROM channel_stats '
+        f'WHERE talent IN ({_placeholders(talents)}) ORDER BY talent, date',
+        talents
+    )
+    for talent, date, subscribers, views, n_videos in rows:
+        result.setdefault(talent, {})[date] = {'登録者数': subscribers, '総再生数': views, '動画数': n_videos}
+    return {t: result[t] for t in talents if t in result}
+
+def video_snapshots(conn, talents, n_date, p_date):
+    """
+    記録のある動画ごとの n_date / p_date 時点の値（summary の videos と同じ形）。
+    タレントは talents の順、タレント内は history_{talent}.json の動画の順
+    """
+    order = {t: i for i, t in enumerate(talents)}
+    rows = conn.execute(
+        f'''SELECT v.talent, v.video_id, v.title, v.type,
+                   n.views, n.likes, n.comments, p.views, p.likes, p.comments
+            FROM videos v
+            LEFT JOIN records n ON n.vid = v.id AND n.date = ?
+            LEFT JOIN records p ON p.vid = v.id AND p.date = ?
+            WHERE v.talent IN ({_placeholders(talents)})
+              AND EXISTS (SELECT 1 FROM records r WHERE r.vid = v.id)
+            ORDER BY v.id''',
+        (n_date, p_date or '', *talents)
+    ).fetchall()
+    rows.sort(key=lambda row: order[row[0]])   # 安定ソート（タレント内は id 順のまま）
+    return [
+        {'t': t, 'id': vid, 'ti': ti, 'ty': ty, 'vn': vn, 'ln': ln, 'cn': cn, 'vp': vp, 'lp': lp, 'cp': cp}
+        for t, vid, ti, ty, vn, ln, cn, vp, lp, cp in rows
+    ]
+
+def video_window_values(conn, talents, n_date, bases):
+    """
+    n_date に記録のある動画ごとに (タレント, 動画ID, タイトル, type, 公開日, n_date の値,
+    {期間: 基準日以前で最新の値 または None}) を返す（rankings.VideoRankings.add() の引数）。
+    bases は {期間: 基準日}、値は (再生数, 高評価数, コメント数)
+    """
+    windows = list(bases)
+    joins = ''.join(
+        f'''LEFT JOIN records b{i} ON b{i}.vid = cur.vid
+                AND b{i}.date = (SELECT MAX(date) FROM records WHERE vid = cur.vid AND date <= ?) '''
+        for i in range(len(windows))
+    )
+    columns = ''.join(f', b{i}.date, b{i}.views, b{i}.likes, b{i}.comments' for i in range(len(windows)))
+    rows = conn.execute(
+        f'''SELECT v.talent, v.video_id, v.title, v.type, v.published,
+                   cur.views, cur.likes, cur.comments {columns}
+            FROM records cur JOIN videos v ON v.id = cur.vid
+            {joins}
+            WHERE cur.date = ? AND v.talent IN ({_placeholders(talents)})''',
+        (*bases.values(), n_date, *talents)
+    )
+    for row in rows:
+        base_values = {}
+        for i, w in enumerate(windows):
+            date, *values = row[8 + 4 * i: 12 + 4 * i]
+            base_values[w] = tuple(values) if date is not None else None
+        yield (*row[:5], tuple(row[5:8]), base_values)
+
+def video_records(conn, talent, video_ids):
+    """{動画ID: [(日付, 再生数, 高評価数, コメント数)...]}（日付順）"""
+    result = {}
+    rows = conn.execute(
+        f'''SELECT v.video_id, r.date, r.views, r.likes, r.comments
+            FROM videos v JOIN records r ON r.vid = v.id
+            WHERE v.talent = ? AND v.video_id IN ({_placeholders(video_ids)})
+            ORDER BY v.video_id, r.date''',
+        (talent, *video_ids)
+    )
+    for vid, date, views, likes, comments in rows:
+        result.setdefault(vid, []).append((date, views, likes, comments))
+    return result
+
+def daily_type_totals(conn, talents):
+    """
+    {日付: {Movie, Short, LiveArchive}}: 動画ごとに直前の記録からの再生数の増分（正の分のみ）を
+    その日の種別ごとに合計する（記録の無い日は飛ばして直前の記録と比べる。書き込み時に集計済みの type_gains）
+    """
+    totals = {}
+    rows = conn.execute(
+        f'SELECT date, type, SUM(views) FROM type_gains WHERE talent IN ({_placeholders(talents)}) '
+        f'GROUP BY date, type',
+        talents
+    )
+    for date, vtype, views in rows:
+        bucket = totals.setdefault(date, dict.fromkeys(VIDEO_TYPES, 0))
+        if vtype in bucket:
+            bucket[vtype] += views
+    return totals
+
+# ----------------------------------------------------------------
+# 横断クエリ
+# ----------------------------------------------------------------
+
+def top_movers(conn, days=7, date=None, limit=20, vtype=None):
+    """
+    date（省略時は最新の記録日）までの days 日間で再生数の伸びた動画の上位 limit 件。
+    期間の始まり以前の記録が無い動画（期間中に公開）は伸び = 再生数
+    """
+    date = date or latest_date(conn)
+    if date is None:
+        return []
+    start = (Date.fromisoformat(date) - timedelta(days=days)).isoformat()
+    type_filter = 'AND v.type = ?' if vtype else ''
+    rows = conn.execute(
+        f'''SELECT v.talent, v.video_id, v.title, v.type, cur.views,
+                   cur.views - COALESCE((SELECT b.views FROM records b
+                                         WHERE b.vid = cur.vid AND b.date <= ?
+                                         ORDER BY b.date DESC LIMIT 1), 0) AS gain
+            FROM records cur JOIN videos v ON v.id = cur.vid
+            WHERE cur.date = ? {type_filter}
+            ORDER BY gain DESC LIMIT ?''',
+        (start, date, *([vtype] if vtype else []), limit)
+    )
+    return [
+        {'talent': t, 'video_id': vid, 'title': ti, 'type': ty, 'views': views, 'gain': gain}
+        for t, vid, ti, ty, views, gain in rows
+    ]
+
+def published_between(conn, start, end, talents=None):
+    """公開日が start 以上 end 未満の動画（全タレント、公開日順）"""
+    talent_filter = f'AND talent IN ({_placeholders(talents)})' if talents else ''
+    rows = conn.execute(
+        f'''SELECT talent, video_id, title, type, published FROM videos
+            WHERE published >= ? AND published < ? {talent_filter}
+            ORDER BY published, talent''',
+        (start, end, *(talents or ()))
+    )
+    return [
+        {'talent': t, 'video_id': vid, 'title': ti, 'type': ty, 'published': pd}
+        for t, vid, ti, ty, pd in rows
+    ]
+
+def engagement_by_type(conn, date=None, talent=None):
+    """date 時点の種別ごとの本数・再生数・高評価数・コメント数と、再生あたりの高評価・コメント"""
+    date = date or latest_date(conn)
+    talent_filter = 'AND v.talent = ?' if talent else ''
+    rows = conn.execute(
+        f'''SELECT v.type, COUNT(*), SUM(r.views), SUM(r.likes), SUM(r.comments)
+            FROM records r JOIN videos v ON v.id = r.vid
+            WHERE r.date = ? {talent_filter}
+            GROUP BY v.type ORDER BY SUM(r.views) DESC''',
+        (date, *([talent] if talent else []))
+    )
+    return [
+        {'type': ty, 'videos': n, 'views': views, 'likes': likes, 'comments': comments,
+         'likes_per_view': likes / views if views else None,
+         'comments_per_view': comments / views if views else None}
+        for ty, n, views, likes, comments in rows
+    ]
+
+if __name__ == '__main__':
+    import argparse
+    import history_db
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--db', default=history_db.HISTORY_DB_FILE)
+    sub = parser.add_subparsers(dest='command', required=True)
+    p = sub.add_parser('movers', help='期間内に再生数の伸びた動画')
+    p.add_argument('--days', type=int, default=7)
+    p.add_argument('--date')
+    p.add_argument('--limit', type=int, default=20)
+    p.add_argument('--type', choices=VIDEO_TYPES)
+    p = sub.add_parser('published', help='その月（YYYY-MM）または日付範囲に公開された動画')
+    p.add_argument('start', help='YYYY-MM または YYYY-MM-DD')
+    p.add_argument('end', nargs='?', help='YYYY-MM-DD（この日を含まない）')
+    p = sub.add_parser('engagement', help='種別ごとの高評価率・コメント率')
+    p.add_argument('--date')
+    p.add_argument('--talent')
+    args = parser.parse_args()
+
+    db = history_db.HistoryDB(args.db)
+    stale = [t for t in history_db.history_talents() if not db.is_synced(t)]
+    if stale:
+        print(f'⚠️  {len(stale)}タレントが history_*.json と食い違っています（python history_db.py --import で取り込み直し）')
+    started = time.perf_counter()
+    if args.command == 'movers':
+        for n, row in enumerate(top_movers(db.conn, args.days, args.date, args.limit, args.type), 1):
+            print(f'{n:>3}. +{row["gain"]:>10,}  {row["talent"]} [{row["type"]}] {row["title"][:50]}')
+    elif args.command == 'published':
+        if len(args.start) == 7:
+            year, month = map(int, args.start.split('-'))
+            start = f'{args.start}-01'
+            end = args.end or (f'{year + 1}-01-01' if month == 12 else f'{year}-{month + 1:02d}-01')
+        else:
+            start, end = args.start, args.end or '9999-12-31'
+        for row in published_between(db.conn, start, end):
+            print(f'{row["published"]}  {row["talent"]} [{row["type"]}] {row["title"][:50]}')
+    else:
+        for row in engagement_by_type(db.conn, args.date, args.talent):
+            lpv = f'{row["likes_per_view"]:.2%}' if row['likes_per_view'] is not None else '-'
+            cpv = f'{row["comments_per_view"]:.3%}' if row['comments_per_view'] is not None else '-'
+            print(f'{row["type"]:<12} {row["videos"]:>6,}本  再生 {row["views"]:>14,}  高評価率 {lpv}  コメント率 {cpv}')
+    print(f'\n({(time.perf_counter() - started) * 1000:.1f}ms)')
+    db.close()
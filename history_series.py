@@ -0,0 +1,189 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+動画別の再生数推移（グラフ用に間引いた系列）series_{talent}.json の生成モジュール
+
+TalentPage のグラフは動画ごとの再生数推移を描くが、全履歴から組み立てると
+動画数×日数の全レコードを取得・走査することになる。グラフ表示には形が
+分かれば十分なので、動画ごとに LTTB（Largest-Triangle-Three-Buckets）で
+SERIES_MAX_POINTS 点までに間引いた系列を事前に作っておく。
+直近 SERIES_FULL_DAYS 日は間引かず日次のまま残す。
+
+    {
+      "format": "rkpfr-series", "version": 1, "talent": "MEMESIA",
+      "base": "2026-02-10",          # 日付オフセットの起点（履歴の先頭日）
+      "last": "2026-10-17",          # 履歴の最終日
+      "videos": {
+        "<動画ID>": {"ti": タイトル, "pd": 公開日, "ty": type,
+                     "d": [日付オフセットの差分...], "v": [再生数の差分...]}
+      }
+    }
+
+- d / v は差分符号化（先頭は base からの日数・再生数そのもの、以降は直前との差）
+- 1動画1行で書き出す（history_store.py と同じく git の差分が動画単位に収まる）
+
+全タレントの series を history_{talent}.json から作り直す:
+    python history_series.py
+"""
+
+import os
+import sys
+import json
+import tempfile
+from datetime import datetime
+
+import history_store
+
+SERIES_FORMAT = 'rkpfr-series'
+SERIES_VERSION = 1
+SERIES_MAX_POINTS = 90   # 1動画あたりの最大点数
+SERIES_FULL_DAYS = 28    # 直近この日数は間引かない
+
+def series_file(channel_name):
+    return f'series_{channel_name}.json'
+
+# ----------------------------------------------------------------
+# 間引き
+# ----------------------------------------------------------------
+
+def lttb(points, threshold):
+    """
+    Largest-Triangle-Three-Buckets で points [(x, y)...] を threshold 点に間引く。
+    先頭・末尾の点は必ず残る。
+    """
+    n = len(points)
+    if threshold >= n or threshold < 3:
+        return list(points)
+
+    sampled = [points[0]]
+    bucket = (n - 2) / (threshold - 2)
+    a = 0
+    for i in range(threshold - 2):
+        start = int(i * bucket) + 1
+        end = int((i + 1) * bucket) + 1
+
+        # 次のバケットの平均点
+        next_end = min(int((i + 2) * bucket) + 1, n)
+        span = points[end:next_end] or [points[-1]]
+        avg_x = sum(p[0] for p in span) / len(span)
+        avg_y = sum(p[1] for p in span) / len(span)
+
+        # 直前に選んだ点・次バケットの平均点と作る三角形が最大の点を選ぶ
+        ax, ay = points[a]
+        best, best_area = start, -1.0
+        for j in range(start, end):
+            x, y = points[j]
+            area = abs((ax - avg_x) * (y - ay) - (ax - x) * (avg_y - ay))
+            if area > best_area:
+                best, best_area = j, area
+        sampled.append(points[best])
+        a = best
+
+    sampled.append(points[-1])
+    return sampled
+
+def downsample(points, last_day, max_points=SERIES_MAX_POINTS, full_days=SERIES_FULL_DAYS):
+    """直近 full_days 日はそのまま、それより前を LTTB で残りの点数に収める"""
+    cutoff = last_day - full_days
+    split = next((i for i, (x, _) in enumerate(points) if x > cutoff), len(points))
+    old, recent = points[:split], points[split:]
+    budget = max(max_points - len(recent), 3)
+    return lttb(old, budget) + recent
+
+def _delta(values):
+    prev = 0
+    out = []
+    for value in values:
+        out.append(value - prev)
+        prev = value
+    return out
+
+# ----------------------------------------------------------------
+# 生成
+# ----------------------------------------------------------------
+
+def build_series(history, max_points=SERIES_MAX_POINTS, full_days=SERIES_FULL_DAYS):
+    """コンパクト形式の履歴から series を組み立てる"""
+    dates = history['dates']
+    series = {
+        'format': SERIES_FORMAT,
+        'version': SERIES_VERSION,
+        'talent': history['talent'],
+        'base': dates[0] if dates else None,
+        'last': dates[-1] if dates else None,
+        'videos': {},
+    }
+    if not dates:
+        return series
+
+    base = datetime.strptime(dates[0], '%Y-%m-%d')
+    days = [(datetime.strptime(d, '%Y-%m-%d') - base).days for d in dates]
+    last_day = days[-1]
+
+    for vid, entry in history['videos'].items():
+        o = entry['o']
+        points = [(days[o + pos], views) for pos, views in enumerate(entry['v']) if views is not None]
+        if not points:
+            continue
+        points = downsample(points, last_day, max_points, full_days)
+        series['videos'][vid] = {
+            'ti': entry['ti'],
+            'pd': entry['pd'],
+            'ty': entry['ty'],
+            'd': _delta([x for x, _ in points]),
+            'v': _delta([y for _, y in points]),
+        }
+    return series
+
+def save_series(series, path=None):
+    """1動画1行のコンパクトJSONとしてアトミックに書き出す"""
+    path = path or series_file(series['talent'])
+
+    def dumps(obj):
+        return json.dumps(obj, ensure_ascii=False, separators=(',', ':'))
+
+    header = {k: v for k, v in series.items() if k != 'videos'}
+    lines = [dumps(header)[:-1] + ',"videos":{']
+    items = list(series['videos'].items())
+    for n, (vid, entry) in enumerate(items):
+        sep = ',' if n < len(items) - 1 else ''
+        lines.append(f'{dumps(vid)}:{dumps(entry)}{sep}')
+    lines.append('}}')
+
+    dir_ = os.path.dirname(os.path.abspath(path))
+    with tempfile.NamedTemporaryFile('w', encoding='utf-8', dir=dir_, delete=False, suffix='.tmp') as f:
+        f.write('\n'.join(lines))
+        f.write('\n')
+        tmp_path = f.name
+    os.replace(tmp_path, path)
+
+def write_series(talent, history=None, path=None):
+    """history_{talent}.json（＋ジャーナル）から series_{talent}.json を書き出し、series を返す"""
+    if history is None:
+        history = history_store.load_history(talent)
+    series = build_series(history)
+    save_series(series, path)
+    return series
+
+if __name__ == '__main__':
+    import glob
+    import argparse
+    parser = argparse.ArgumentParser()
+    parser.add_argument('talents', nargs='*', help='対象タレント（省略時は history_*.json のある全員）')
+    args = parser.parse_args()
+
+    talents = args.talents
+    if not talents:
+        prefix, suffix = history_store.history_file('*').split('*')
+        talents = sorted(
+            os.path.basename(path)[len(prefix):-len(suffix)]
+            for path in glob.glob(history_store.history_file('*'))
+        )
+    if not talents:
+        print('❌ history_*.json がありません')
+        sys.exit(1)
+    for talent in talents:
+        series = write_series(talent)
+        path = series_file(talent)
+        points = sum(len(v['d']) for v in series['videos'].values())
+        print(f'  ✓ {path}: 動画{len(series["videos"])}本 / {points:,}点（{os.path.getsize(path):,} bytes）')
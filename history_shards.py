@@ -0,0 +1,188 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+月別シャード（history/{talent}/{YYYY-MM}.json）と manifest の書き出しモジュール
+
+history_{talent}.json は全期間を1ファイルに持つため、Web 側で直近の数か月だけを
+表示したい場合も全体を取得する必要がある。履歴を月ごとに分割したシャードと、
+シャードの一覧・期間をまとめた manifest を併せて公開し、Web 側は表示範囲に
+必要なシャードだけを取得する。
+
+    history/{talent}/manifest.json
+    {
+      "talent": "MEMESIA",
+      "shards": [
+        {"month": "2026-09", "file": "2026-09.json", "first": "2026-09-01",
+         "last": "2026-09-30", "videos": 120, "bytes": 48213},
+        ...
+      ]
+    }
+
+- シャードの中身は history_store.py と同じ列指向コンパクト形式
+  （dates はその月の日付のみ。o はシャード内の日付インデックス）
+- その月に記録のある動画だけを含む（メタ情報 ti/pd/ty/du は各シャードに複製）
+- 日次更新では当月のシャードだけを読み書きする（history_{talent}.json は読まない）
+
+全タレントのシャードを history_{talent}.json から作り直す:
+    python history_shards.py --rebuild
+"""
+
+import os
+import sys
+import json
+import glob
+import tempfile
+
+import history_store
+
+SHARD_DIR = 'history'
+MANIFEST_FILE = 'manifest.json'
+
+def shard_dir(talent, root=SHARD_DIR):
+    return os.path.join(root, talent)
+
+def shard_path(talent, month, root=SHARD_DIR):
+    return os.path.join(shard_dir(talent, root), f'{month}.json')
+
+def manifest_path(talent, root=SHARD_DIR):
+    return os.path.join(shard_dir(talent, root), MANIFEST_FILE)
+
+def load_manifest(talent, root=SHARD_DIR):
+    """manifest を読み込む（無い・壊れている場合は None）"""
+    path = manifest_path(talent, root)
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except Exception as e:
+        print(f'⚠️  {path} 読み込みエラー: {e}')
+        return None
+
+def _save_manifest(manifest, path):
+    dir_ = os.path.dirname(os.path.abspath(path))
+    with tempfile.NamedTemporaryFile('w', encoding='utf-8', dir=dir_, delete=False, suffix='.tmp') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=1)
+        tmp_path = f.name
+    os.replace(tmp_path, path)
+
+# ----------------------------------------------------------------
+# 分割
+# ----------------------------------------------------------------
+
+def months_of(history):
+    """履歴に含まれる月（YYYY-MM）を昇順で返す"""
+    return sorted({date[:7] for date in history['dates']})
+
+def month_slice(history, month):
+    """履歴のうち month（YYYY-MM）の日付分だけを持つコンパクト形式の履歴を返す"""
+    dates = history['dates']
+    start = next((i for i, d in enumerate(dates) if d[:7] == month), len(dates))
+    end = start
+    while end < len(dates) and dates[end][:7] == month:
+        end += 1
+
+    shard = history_store.new_history(history['talent'])
+    shard['dates'] = dates[start:end]
+    shard['cs'] = {key: arr[start:end] for key, arr in history['cs'].items()}
+
+    for vid, entry in history['videos'].items():
+        o = entry['o']
+        lo = max(start, o) - o
+        hi = min(end, o + len(entry['v'])) - o
+        if lo >= hi or all(v is None for v in entry['v'][lo:hi]):
+            continue
+        sliced = {k: entry[k] for k in history_store.META_FIELDS}
+        sliced['o'] = o + lo - start
+        for key, _ in history_store.RECORD_FIELDS:
+            sliced[key] = entry[key][lo:hi]
+        shard['videos'][vid] = sliced
+    return shard
+
+def _manifest_entry(month, shard, path):
+    return {
+        'month': month,
+        'file': os.path.basename(path),
+        'first': shard['dates'][0] if shard['dates'] else None,
+        'last': shard['dates'][-1] if shard['dates'] else None,
+        'videos': len(shard['videos']),
+        'bytes': os.path.getsize(path),
+    }
+
+def rebuild_shards(talent, history=None, root=SHARD_DIR):
+    """
+    全期間のシャードと manifest を作り直す（history 省略時は history_{talent}.json から読む）。
+    Returns: manifest
+    """
+    if history is None:
+        history = history_store.load_history(talent)
+    os.makedirs(shard_dir(talent, root), exist_ok=True)
+
+    shards = []
+    for month in months_of(history):
+        shard = month_slice(history, month)
+        path = shard_path(talent, month, root)
+        history_store.save_history(shard, path)
+        shards.append(_manifest_entry(month, shard, path))
+
+    # 履歴から消えた月のシャードは削除する
+    keep = {entry['file'] for entry in shards} | {MANIFEST_FILE}
+    for path in glob.glob(os.path.join(shard_dir(talent, root), '*.json')):
+        if os.path.basename(path) not in keep:
+            os.remove(path)
+
+    manifest = {'talent': talent, 'shards': shards}
+    _save_manifest(manifest, manifest_path(talent, root))
+    return manifest
+
+# ----------------------------------------------------------------
+# 日次更新
+# ----------------------------------------------------------------
+
+def update_month_shard(talent, videos, date, channel_stats=None, root=SHARD_DIR):
+    """
+    date の月のシャードに1日分を記録し、manifest を更新する。
+    manifest が無ければ（初回）history_{talent}.json から全シャードを作り直す。
+    """
+    manifest = load_manifest(talent, root)
+    if manifest is None:
+        return rebuild_shards(talent, root=root)
+
+    month = date[:7]
+    path = shard_path(talent, month, root)
+    shard = history_store.load_history(talent, path, with_journal=False)
+    history_store.record_day(shard, date, videos, channel_stats)
+    history_store.save_history(shard, path)
+
+    entry = _manifest_entry(month, shard, path)
+    shards = [s for s in manifest['shards'] if s['month'] != month] + [entry]
+    manifest['shards'] = sorted(shards, key=lambda s: s['month'])
+    _save_manifest(manifest, manifest_path(talent, root))
+    return manifest
+
+def rebuild_all(talents=None, root=SHARD_DIR):
+    """history_*.json のある全タレントのシャードを作り直す"""
+    if not talents:
+        prefix, suffix = history_store.history_file('*').split('*')
+        talents = sorted(
+            os.path.basename(path)[len(prefix):-len(suffix)]
+            for path in glob.glob(history_store.history_file('*'))
+        )
+    for talent in talents:
+        manifest = rebuild_shards(talent, root=root)
+        total = sum(s['bytes'] for s in manifest['shards'])
+        print(f'  ✓ {talent}: {len(manifest["shards"])}シャード（{total:,} bytes）')
+
+if __name__ == '__main__':
+    import argparse
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rebuild', action='store_true',
+                        help='history_*.json から月別シャードと manifest を作り直す')
+    parser.add_argument('talents', nargs='*', help='対象タレント（省略時は全員）')
+    args = parser.parse_args()
+
+    if args.rebuild:
+        rebuild_all(args.talents)
+    else:
+        parser.print_help()
+        sys.exit(1)
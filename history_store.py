@@ -0,0 +1,775 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+history_{talent}.json 読み書きモジュール（列指向コンパクト形式）
+
+旧形式は動画ごと・日付ごとに {再生数, 高評価数, コメント数} の辞書を持ち、
+indent=2 で保存していたためファイルが急速に肥大化していた。
+新形式はタレントごとに共通の日付軸を1本だけ持ち、動画ごとに
+日付軸と並行な整数配列（再生数/高評価数/コメント数）を持つ。
+
+    {
+      "format": "rkpfr-history", "version": 2, "talent": "MEMESIA",
+      "dates": ["2026-05-11", "2026-05-12", ...],
+      "cs": {"s": [登録者数...], "v": [総再生数...], "n": [動画数...]},
+      "videos": {
+        "<動画ID>": {"ti": タイトル, "pd": 公開日, "ty": type, "du": duration,
+                     "o": 先頭レコードの日付インデックス,
+                     "v": [再生数...], "l": [高評価数...], "c": [コメント数...]}
+      }
+    }
+
+- cs の配列は dates と同じ長さ。記録の無い日は null
+- 動画の配列は dates[o] から始まる。途中で記録の無い日は null
+- 1動画1行で書き出す（差分が動画単位の行に収まり、git の差分も小さい）
+- 旧形式のファイルも load_history() でそのまま読める（メモリ上で変換）
+
+変化分のみの保存（version 3、SPARSE_RECORDS = True で書き出す形式）:
+    過去の動画は再生数・高評価数・コメント数が日々ほとんど変わらないため、
+    ファイル上の配列では直前と同じ値の連続を負の数 -k（直前の値が更に k 日続く）に
+    まとめる。例: [100, -3, 105] → [100, 100, 100, 100, 105]
+    カウンターは負にならないので通常の値と区別できる。読み込み時に前方補完して
+    version 2 と同じメモリ上の形に戻す（以降の処理は形式を意識しない）。
+    変換: python history_store.py --sparse（version 2 に戻す: --dense）
+          月別シャードは python history_shards.py --rebuild で同じ形式に書き直される
+
+ジャーナル（history_{talent}.journal.jsonl）:
+    日次更新は本体を書き換えず、1日1行の差分をジャーナルへ追記する。
+    load_history() は本体にジャーナルを重ねた結果を返し、
+    compact_history() がジャーナルを本体へ畳み込んで削除する。
+
+    {"date": "2026-08-23", "cs": [登録者数, 総再生数, 動画数],
+     "r": {"<動画ID>": [再生数, 高評価数, コメント数]},
+     "m": {"<動画ID>": {"ti": ..., "pd": ..., "ty": ..., "du": ...}}}
+
+    m はジャーナル内で初出または変更のあった動画のみ（先頭行は全動画）。
+    同じ日付の行が複数あれば後の行が優先される。
+
+    "ff": true の行は変化分のみ（SPARSE_RECORDS = True で2行目以降）:
+    r には前日（ジャーナル内でその行より前の最新の日付）から値の変わった動画だけを持ち、
+    前日に記録のあった動画のうち r に無いものは前日の値のまま記録されたものとして扱う。
+    前日に記録があって当日は取得されなかった動画は "x": [動画ID...] に列挙する。
+
+旧形式からの一括変換 / ジャーナルの畳み込み:
+    python history_store.py --convert
+    python history_store.py --compact
+"""
+
+import os
+import sys
+import json
+import glob
+import bisect
+import tempfile
+
+HISTORY_FORMAT = 'rkpfr-history'
+HISTORY_VERSION = 2          # メモリ上の形（配列は日ごとの値そのもの）
+SPARSE_VERSION = 3           # 変化分のみの保存形式（ファイル上のみ）
+SPARSE_RECORDS = True        # save_history() / ジャーナルを変化分のみで書き出す
+
+# 配列キー → 旧形式のフィールド名
+RECORD_FIELDS = (('v', '再生数'), ('l', '高評価数'), ('c', 'コメント数'))
+CHANNEL_STATS_FIELDS = (('s', '登録者数'), ('v', '総再生数'), ('n', '動画数'))
+META_FIELDS = ('ti', 'pd', 'ty', 'du')
+
+def history_file(channel_name):
+    return f'history_{channel_name}.json'
+
+def journal_file(channel_name):
+    return f'history_{channel_name}.journal.jsonl'
+
+# ----------------------------------------------------------------
+# 生成・判定
+# ----------------------------------------------------------------
+
+def new_history(talent):
+    return {
+        'format': HISTORY_FORMAT,
+        'version': HISTORY_VERSION,
+        'talent': talent,
+        'dates': [],
+        'cs': {key: [] for key, _ in CHANNEL_STATS_FIELDS},
+        'videos': {},
+    }
+
+def is_compact(data):
+    return isinstance(data, dict) and data.get('format') == HISTORY_FORMAT
+
+# ----------------------------------------------------------------
+# 日付軸
+# ----------------------------------------------------------------
+
+def date_index(history, date):
+    """日付のインデックスを返す（存在しなければ None）"""
+    dates = history['dates']
+    i = bisect.bisect_left(dates, date)
+    if i < len(dates) and dates[i] == date:
+        return i
+    return None
+
+def ensure_date(history, date):
+    """日付軸に date を追加してインデックスを返す（通常は末尾追加、過去日は挿入）"""
+    dates = history['dates']
+    i = bisect.bisect_left(dates, date)
+    if i < len(dates) and dates[i] == date:
+        return i
+
+    dates.insert(i, date)
+    for arr in history['cs'].values():
+        arr.insert(i, None)
+    if i == len(dates) - 1:
+        return i
+
+    # 過去日の挿入: 以降のインデックスをずらす
+    for entry in history['videos'].values():
+        o = entry['o']
+        if o >= i:
+            entry['o'] = o + 1
+        elif o + len(entry['v']) > i:
+            for key, _ in RECORD_FIELDS:
+                entry[key].insert(i - o, None)
+    return i
+
+# ----------------------------------------------------------------
+# チャンネル統計
+# ----------------------------------------------------------------
+
+def set_channel_stats(history, date, channel_stats):
+    i = ensure_date(history, date)
+    for key, field in CHANNEL_STATS_FIELDS:
+        history['cs'][key][i] = channel_stats.get(field, 0)
+
+def get_channel_stats(history):
+    """{日付: {登録者数, 総再生数, 動画数}}（旧形式の _channel_stats と同じ形）"""
+    cs = history['cs']
+    result = {}
+    for i, date in enumerate(history['dates']):
+        if cs['s'][i] is None:
+            continue
+        result[date] = {field: cs[key][i] for key, field in CHANNEL_STATS_FIELDS}
+    return result
+
+# ----------------------------------------------------------------
+# 動画
+# ----------------------------------------------------------------
+
+def add_video(history, video_id, title, published, vtype, duration=0):
+    entry = {
+        'ti': title,
+        'pd': published,
+        'ty': vtype,
+        'du': duration,
+        'o': 0,
+        'v': [],
+        'l': [],
+        'c': [],
+    }
+    history['videos'][video_id] = entry
+    return entry
+
+def set_record(history, video_id, date, views, likes, comments):
+    """動画の date 時点の値を記録する（同日は上書き）"""
+    i = ensure_date(history, date)
+    entry = history['videos'][video_id]
+    values = (views, likes, comments)
+
+    if not entry['v']:
+        entry['o'] = i
+    elif i < entry['o']:
+        pad = [None] * (entry['o'] - i)
+        for key, _ in RECORD_FIELDS:
+            entry[key][:0] = pad
+        entry['o'] = i
+
+    pos = i - entry['o']
+    for (key, _), value in zip(RECORD_FIELDS, values):
+        arr = entry[key]
+        if pos >= len(arr):
+            arr.extend([None] * (pos - len(arr) + 1))
+        arr[pos] = value
+
+def record_day(history, date, videos, channel_stats=None):
+    """
+    auto_check.py の動画リスト1日分を記録する（同日は上書き）。
+    タイプが変わった動画の [(動画, 旧タイプ)] を返す。
+    """
+    if channel_stats:
+        set_channel_stats(history, date, channel_stats)
+
+    type_changes = []
+    for video in videos:
+        video_id = video['動画ID']
+        entry = history['videos'].get(video_id)
+
+        if entry is None:
+            add_video(
+                history, video_id, video['タイトル'], video['公開日'],
+                video['type'], video.get('duration', 0),
+            )
+        else:
+            if entry['ty'] != video['type']:
+                type_changes.append((video, entry['ty']))
+            entry['ty'] = video['type']
+            entry['ti'] = video['タイトル']
+            entry['du'] = video.get('duration', 0)
+
+        set_record(history, video_id, date, video['再生数'], video['高評価数'], video['コメント数'])
+    return type_changes
+
+def get_record(entry, i):
+    """日付インデックス i の (再生数, 高評価数, コメント数)。記録が無ければ None"""
+    if i is None:
+        return None
+    pos = i - entry['o']
+    if pos < 0 or pos >= len(entry['v']) or entry['v'][pos] is None:
+        return None
+    return entry['v'][pos], entry['l'][pos], entry['c'][pos]
+
+def has_records(entry):
+    return any(x is not None for x in entry['v'])
+
+def iter_records(history, entry):
+    """(日付, 再生数, 高評価数, コメント数) を日付順に返す（記録の無い日は飛ばす）"""
+    dates = history['dates']
+    o = entry['o']
+    for pos, views in enumerate(entry['v']):
+        if views is None:
+            continue
+        yield dates[o + pos], views, entry['l'][pos], entry['c'][pos]
+
+# ----------------------------------------------------------------
+# 旧形式との相互変換
+# ----------------------------------------------------------------
+
+def from_legacy(channel_history, talent):
+    """旧形式（history[talent] の中身）をコンパクト形式に変換"""
+    history = new_history(talent)
+
+    all_dates = set(channel_history.get('_channel_stats', {}).keys())
+    for vid, v in channel_history.items():
+        if vid != '_channel_stats':
+            all_dates.update(v.get('records', {}).keys())
+    history['dates'] = sorted(all_dates)
+    history['cs'] = {key: [None] * len(history['dates']) for key, _ in CHANNEL_STATS_FIELDS}
+
+    for date, stats in channel_history.get('_channel_stats', {}).items():
+        set_channel_stats(history, date, stats)
+
+    for vid, v in channel_history.items():
+        if vid == '_channel_stats':
+            continue
+        add_video(history, vid, v.get('タイトル', vid), v.get('公開日', ''),
+                  v.get('type', 'Movie'), v.get('duration', 0))
+        for date in sorted(v.get('records', {})):
+            r = v['records'][date]
+            set_record(history, vid, date,
+                       r.get('再生数', 0), r.get('高評価数', 0), r.get('コメント数', 0))
+    return history
+
+def to_legacy(history):
+    """コンパクト形式を旧形式（history[talent] の中身）に戻す"""
+    channel_history = {'_channel_stats': get_channel_stats(history)}
+    for vid, entry in history['videos'].items():
+        channel_history[vid] = {
+            'タイトル': entry['ti'],
+            '公開日': entry['pd'],
+            'type': entry['ty'],
+            'duration': entry['du'],
+            'records': {
+                date: {'再生数': v, '高評価数': l, 'コメント数': c}
+                for date, v, l, c in iter_records(history, entry)
+            },
+        }
+    return channel_history
+
+# ----------------------------------------------------------------
+# ファイル読み書き
+# ----------------------------------------------------------------
+
+def _dumps(obj):
+    return json.dumps(obj, ensure_ascii=False, separators=(',', ':'))
+
+def encode_runs(values):
+    """直前と同じ値の連続を -k にまとめる（None は記録なしのまま残す）"""
+    out = []
+    prev = None
+    run = 0
+    for value in values:
+        if value is not None and value == prev:
+            run += 1
+            continue
+        if run:
+            out.append(-run)
+            run = 0
+        out.append(value)
+        prev = value
+    if run:
+        out.append(-run)
+    return out
+
+def decode_runs(values):
+    """encode_runs() の逆（-k を直前の値 k 個に展開する）"""
+    out = []
+    for value in values:
+        if value is not None and value < 0:
+            out.extend([out[-1]] * -value)
+        else:
+            out.append(value)
+    return out
+
+def _decode_cs(cs):
+    return {key: decode_runs(arr) for key, arr in cs.items()}
+
+def _decode_video(entry):
+    for key, _ in RECORD_FIELDS:
+        entry[key] = decode_runs(entry[key])
+    return entry
+
+def _encode_video(entry):
+    encoded = dict(entry)
+    for key, _ in RECORD_FIELDS:
+        encoded[key] = encode_runs(entry[key])
+    return encoded
+
+def _decode_sparse(data):
+    """version 3 のファイル内容をメモリ上の形（version 2）に戻す"""
+    data['cs'] = _decode_cs(data['cs'])
+    for entry in data['videos'].values():
+        _decode_video(entry)
+    data['version'] = HISTORY_VERSION
+    return data
+
+def load_history(talent, path=None, with_journal=True):
+    """
+    history_{talent}.json を読み込む（旧形式は変換、ファイルが無ければ空の履歴）。
+    with_journal=True ならジャーナルの未畳み込み分も反映した結果を返す。
+    """
+    path = path or history_file(talent)
+    history = _load_base(talent, path)
+    if with_journal:
+        apply_journal(history, read_journal(talent, _journal_path_for(path, talent)))
+    return history
+
+def history_exists(talent, path=None):
+    path = path or history_file(talent)
+    return os.path.exists(path) or os.path.exists(_journal_path_for(path, talent))
+
+def _load_base(talent, path):
+    if not os.path.exists(path):
+        return new_history(talent)
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except Exception as e:
+        print(f'⚠️  {path} 読み込みエラー: {e}')
+        return new_history(talent)
+
+    if is_compact(data):
+        return _decode_sparse(data) if data.get('version') == SPARSE_VERSION else data
+    return from_legacy(data.get(talent, {}), talent)
+
+def _journal_path_for(path, talent):
+    """本体ファイルのパスに対応するジャーナルのパス（同じディレクトリに置く）"""
+    return os.path.join(os.path.dirname(path), journal_file(talent))
+
+def save_history(history, path=None, sparse=None):
+    """
+    1動画1行のコンパクトJSONとしてアトミックに書き出す。
+    sparse=True（省略時は SPARSE_RECORDS）なら変化分のみの形式（version 3）で書き出す。
+    """
+    path = path or history_file(history['talent'])
+    sparse = SPARSE_RECORDS if sparse is None else sparse
+    header = {k: history[k] for k in ('format', 'version', 'talent', 'dates', 'cs')}
+    if sparse:
+        header['version'] = SPARSE_VERSION
+        header['cs'] = {key: encode_runs(arr) for key, arr in history['cs'].items()}
+    lines = [_dumps(header)[:-1] + ',"videos":{']
+    items = list(history['videos'].items())
+    for n, (vid, entry) in enumerate(items):
+        sep = ',' if n < len(items) - 1 else ''
+        lines.append(f'{_dumps(vid)}:{_dumps(_encode_video(entry) if sparse else entry)}{sep}')
+    lines.append('}}')
+
+    dir_ = os.path.dirname(os.path.abspath(path))
+    with tempfile.NamedTemporaryFile('w', encoding='utf-8', dir=dir_, delete=False, suffix='.tmp') as f:
+        f.write('\n'.join(lines))
+        f.write('\n')
+        tmp_path = f.name
+    os.replace(tmp_path, path)
+
+# ----------------------------------------------------------------
+# ジャーナル（日次差分の追記）
+# ----------------------------------------------------------------
+
+def read_journal(talent, path=None):
+    """ジャーナルの各行を返す（書き込み途中で壊れた行は読み飛ばす）"""
+    path = path or journal_file(talent)
+    if not os.path.exists(path):
+        return []
+    entries = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for n, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                entries.append(json.loads(line))
+            except ValueError:
+                print(f'⚠️  {path} {n}行目を読み飛ばしました（不正なJSON）')
+    return entries
+
+def journal_meta(entries):
+    """ジャーナル内で確定している動画メタ情報 {動画ID: {ti, pd, ty, du}}"""
+    meta = {}
+    for entry in entries:
+        for vid, m in entry.get('m', {}).items():
+            meta.setdefault(vid, {}).update(m)
+    return meta
+
+def journal_rows(entries):
+    """
+    各行を (行, その行の記録 {動画ID: (再生数, 高評価数, コメント数)}) にして返す。
+    "ff" の行は前日（それより前の最新の日付）の記録で前方補完した全動画分になる。
+    """
+    by_date = {}
+    for entry in entries:
+        date = entry['date']
+        rows = {vid: tuple(values) for vid, values in entry.get('r', {}).items()}
+        if entry.get('ff'):
+            before = [d for d in by_date if d < date]
+            previous = by_date[max(before)] if before else {}
+            missing = set(entry.get('x', ()))
+            filled = {vid: values for vid, values in previous.items() if vid not in missing}
+            filled.update(rows)
+            rows = filled
+        by_date.setdefault(date, {}).update(rows)
+        yield entry, rows
+
+def journal_last_rows(entries, before):
+    """before より前の最新の日付の記録（前方補完済み）。ジャーナルに無ければ None"""
+    last_date, last = None, None
+    for entry, rows in journal_rows(entries):
+        date = entry['date']
+        if date >= before:
+            continue
+        if last_date is None or date > last_date:
+            last_date, last = date, dict(rows)
+        elif date == last_date:
+            last.update(rows)
+    return last
+
+def append_journal(talent, date, channel_stats, records, meta, path=None, previous=None):
+    """
+    1日分の差分を1行追記する（本体ファイルは読み書きしない）。
+    records:  {動画ID: (再生数, 高評価数, コメント数)}
+    meta:     {動画ID: {ti, pd, ty, du} のうち変更分}
+    previous: 前日の記録（journal_last_rows()）。指定すると値の変わった動画だけを書く（"ff" の行）
+    """
+    path = path or journal_file(talent)
+    entry = {'date': date}
+    if channel_stats:
+        entry['cs'] = [channel_stats.get(field, 0) for _, field in CHANNEL_STATS_FIELDS]
+    if previous is None:
+        entry['r'] = {vid: list(values) for vid, values in records.items()}
+    else:
+        entry['ff'] = True
+        entry['r'] = {
+            vid: list(values) for vid, values in records.items()
+            if previous.get(vid) != tuple(values)
+        }
+        missing = [vid for vid in previous if vid not in records]
+        if missing:
+            entry['x'] = missing
+    if meta:
+        entry['m'] = meta
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write(_dumps(entry) + '\n')
+
+def apply_journal(history, entries):
+    """ジャーナルの各行を履歴に反映する（行の順に適用、同日は後勝ち）"""
+    for entry, rows in journal_rows(entries):
+        date = entry['date']
+        if entry.get('cs'):
+            set_channel_stats(history, date, dict(zip(
+                (field for _, field in CHANNEL_STATS_FIELDS), entry['cs']
+            )))
+        for vid, m in entry.get('m', {}).items():
+            video = history['videos'].get(vid)
+            if video is None:
+                add_video(history, vid, m.get('ti', vid), m.get('pd', ''),
+                          m.get('ty', 'Movie'), m.get('du', 0))
+            else:
+                video.update({k: m[k] for k in META_FIELDS if k in m})
+        for vid, values in rows.items():
+            if vid not in history['videos']:
+                add_video(history, vid, vid, '', 'Movie')
+            set_record(history, vid, date, *values)
+    return history
+
+def journal_dates(entries):
+    return sorted({entry['date'] for entry in entries})
+
+def read_header(path):
+    """
+    本体の先頭行（format/version/talent/dates/cs）だけを読む。
+    save_history() の1動画1行レイアウトでない場合（旧形式など）は None。
+    ファイルが無ければ空の日付軸を返す。
+    """
+    if not os.path.exists(path):
+        return {'dates': [], 'cs': {key: [] for key, _ in CHANNEL_STATS_FIELDS}}
+    with open(path, 'r', encoding='utf-8') as f:
+        line = f.readline().rstrip('\n')
+    tail = ',"videos":{'
+    if not line.startswith('{"format":"' + HISTORY_FORMAT + '"') or not line.endswith(tail):
+        return None
+    try:
+        header = json.loads(line[:-len(tail)] + '}')
+    except ValueError:
+        return None
+    if header.get('version') == SPARSE_VERSION:
+        header['cs'] = _decode_cs(header['cs'])
+    return header
+
+def load_recent(talent, after, path=None):
+    """
+    after より後の日付分だけを返す。
+        {'cs': {日付: {登録者数, 総再生数, 動画数}},
+         'records': {日付: {動画ID: (再生数, 高評価数, コメント数)}},
+         'meta': {動画ID: {ti, pd, ty, du} のうち判明している項目}}
+
+    本体の日付軸が after 以前で終わっていれば（通常の日次運用）ジャーナルだけで
+    組み立て、本体の動画データは読まない。畳み込み直後などで本体に after より後の
+    日付がある場合は全体を読み込む。
+    """
+    path = path or history_file(talent)
+    entries = read_journal(talent, _journal_path_for(path, talent))
+    header = read_header(path)
+    recent = {'cs': {}, 'records': {}, 'meta': {}}
+
+    if header is not None and (not header['dates'] or header['dates'][-1] <= after):
+        recent['meta'] = journal_meta(entries)
+        for entry, rows in journal_rows(entries):
+            date = entry['date']
+            if date <= after:
+                continue
+            if entry.get('cs'):
+                recent['cs'][date] = dict(zip((field for _, field in CHANNEL_STATS_FIELDS), entry['cs']))
+            recent['records'].setdefault(date, {}).update(rows)
+        return recent
+
+    history = _load_base(talent, path)
+    apply_journal(history, entries)
+    recent['cs'] = {d: cs for d, cs in get_channel_stats(history).items() if d > after}
+    start = bisect.bisect_right(history['dates'], after)
+    for vid, entry in history['videos'].items():
+        recent['meta'][vid] = {k: entry[k] for k in META_FIELDS}
+        for i in range(start, len(history['dates'])):
+            r = get_record(entry, i)
+            if r is not None:
+                recent['records'].setdefault(history['dates'][i], {})[vid] = r
+    return recent
+
+# ----------------------------------------------------------------
+# 1動画ずつの読み出し（全体をメモリに載せない）
+# ----------------------------------------------------------------
+
+def read_channel_stats(talent, path=None):
+    """
+    チャンネル統計 {日付: {登録者数, 総再生数, 動画数}} だけを読む（ジャーナル反映済み）。
+    本体は先頭行しか読まない（旧形式などは全体を読み込む）。
+    """
+    path = path or history_file(talent)
+    entries = read_journal(talent, _journal_path_for(path, talent))
+    header = read_header(path)
+    if header is None:
+        history = _load_base(talent, path)
+        apply_journal(history, entries)
+        return get_channel_stats(history)
+
+    cs = get_channel_stats(header)
+    for entry in entries:
+        if entry.get('cs'):
+            cs[entry['date']] = dict(zip((field for _, field in CHANNEL_STATS_FIELDS), entry['cs']))
+    return dict(sorted(cs.items()))
+
+def iter_video_records(talent, path=None):
+    """
+    (動画ID, メタ情報 {ti, pd, ty, du}, [(日付, 再生数, 高評価数, コメント数)...]) を
+    load_history() の動画の順に1動画ずつ返す（ジャーナル反映済み・記録は日付順）。
+
+    本体は save_history() の1動画1行レイアウトを1行ずつ読むため、メモリに載るのは
+    日付軸・ジャーナルと1動画分だけ。旧形式などは全体を読み込んでから返す。
+    """
+    path = path or history_file(talent)
+    entries = read_journal(talent, _journal_path_for(path, talent))
+    header = read_header(path)
+    if header is None:
+        history = _load_base(talent, path)
+        apply_journal(history, entries)
+        for vid, entry in history['videos'].items():
+            yield vid, {k: entry[k] for k in META_FIELDS}, list(iter_records(history, entry))
+        return
+
+    # ジャーナルの動画ごとの記録と、ジャーナルで初めて現れた動画の順序（apply_journal と同じ）
+    meta = journal_meta(entries)
+    journal_records = {}
+    journal_order = {}
+    for entry, rows in journal_rows(entries):
+        for vid in entry.get('m', {}):
+            journal_order.setdefault(vid, None)
+        for vid, values in rows.items():
+            journal_order.setdefault(vid, None)
+            journal_records.setdefault(vid, {})[entry['date']] = values
+
+    dates = header['dates']
+    sparse = header.get('version') == SPARSE_VERSION
+    seen = set()
+    if os.path.exists(path):
+        with open(path, 'r', encoding='utf-8') as f:
+            f.readline()
+            for line in f:
+                line = line.rstrip('\n')
+                if line == '}}':
+                    break
+                vid, entry = next(iter(json.loads('{' + line.rstrip(',') + '}').items()))
+                if sparse:
+                    _decode_video(entry)
+                seen.add(vid)
+                m = {k: entry[k] for k in META_FIELDS}
+                m.update({k: v for k, v in meta.get(vid, {}).items() if k in META_FIELDS})
+                records = {
+                    dates[entry['o'] + pos]: (views, entry['l'][pos], entry['c'][pos])
+                    for pos, views in enumerate(entry['v']) if views is not None
+                }
+                records.update(journal_records.get(vid, {}))
+                yield vid, m, [(date, *records[date]) for date in sorted(records)]
+
+    for vid in journal_order:
+        if vid in seen:
+            continue
+        m = {'ti': vid, 'pd': '', 'ty': 'Movie', 'du': 0}
+        m.update({k: v for k, v in meta.get(vid, {}).items() if k in META_FIELDS})
+        records = journal_records.get(vid, {})
+        yield vid, m, [(date, *records[date]) for date in sorted(records)]
+
+def compact_history(talent, path=None):
+    """ジャーナルを本体に畳み込んで削除する。畳み込んだ日数を返す"""
+    path = path or history_file(talent)
+    jpath = _journal_path_for(path, talent)
+    entries = read_journal(talent, jpath)
+    if not entries:
+        return 0
+    history = _load_base(talent, path)
+    apply_journal(history, entries)
+    # 本体の保存後にジャーナルを消す（途中で落ちても再適用で同じ結果になる）
+    save_history(history, path)
+    os.remove(jpath)
+    return len(journal_dates(entries))
+
+# ----------------------------------------------------------------
+# 旧形式からの一括変換
+# ----------------------------------------------------------------
+
+def convert_all(paths=None):
+    """旧形式の history_*.json をコンパクト形式に書き換える（変換済みは読み飛ばす）"""
+    paths = paths or sorted(glob.glob(history_file('*')))
+    for path in paths:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if is_compact(data):
+            print(f'  - {path}: 変換済み')
+            continue
+        if len(data) != 1:
+            print(f'  ⚠️  {path}: タレントキーが1つではないためスキップ')
+            continue
+
+        talent = next(iter(data))
+        before = os.path.getsize(path)
+        history = from_legacy(data[talent], talent)
+        if to_legacy(history) != _normalized_legacy(data[talent]):
+            print(f'  ❌ {path}: 変換結果が元データと一致しないためスキップ')
+            continue
+        save_history(history, path)
+        after = os.path.getsize(path)
+        print(f'  ✓ {path}: {before:,} → {after:,} bytes ({after / before:.0%})')
+
+def _normalized_legacy(channel_history):
+    """往復変換の検証用に旧形式を正規化（レコードのキー欠落を0で補完）"""
+    result = {'_channel_stats': {
+        date: {field: stats.get(field, 0) for _, field in CHANNEL_STATS_FIELDS}
+        for date, stats in channel_history.get('_channel_stats', {}).items()
+    }}
+    for vid, v in channel_history.items():
+        if vid == '_channel_stats':
+            continue
+        result[vid] = {
+            'タイトル': v.get('タイトル', vid),
+            '公開日': v.get('公開日', ''),
+            'type': v.get('type', 'Movie'),
+            'duration': v.get('duration', 0),
+            'records': {
+                date: {field: r.get(field, 0) for _, field in RECORD_FIELDS}
+                for date, r in v.get('records', {}).items()
+            },
+        }
+    return result
+
+def rewrite_all(sparse, paths=None):
+    """
+    コンパクト形式の history_*.json を変化分のみの形式（sparse=True）または
+    日ごとの値の形式（sparse=False）で書き直す。読み戻して一致しなければ元に戻す。
+    """
+    paths = paths or sorted(glob.glob(history_file('*')))
+    for path in paths:
+        with open(path, 'r', encoding='utf-8') as f:
+            raw = f.read()
+        data = json.loads(raw)
+        if not is_compact(data):
+            print(f'  ⚠️  {path}: 旧形式のためスキップ（先に --convert）')
+            continue
+
+        talent = data['talent']
+        history = _load_base(talent, path)
+        expected = _dumps(history)
+        save_history(history, path, sparse=sparse)
+        if _dumps(_load_base(talent, path)) != expected:
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(raw)
+            print(f'  ❌ {path}: 書き直した結果が元データと一致しないため元に戻しました')
+            continue
+        print(f'  ✓ {path}: {len(raw.encode("utf-8")):,} → {os.path.getsize(path):,} bytes')
+
+def compact_all(paths=None):
+    """ジャーナルのある全タレントを畳み込む"""
+    paths = paths or sorted(glob.glob(journal_file('*')))
+    suffix = journal_file('')[len('history_'):]
+    for jpath in paths:
+        name = os.path.basename(jpath)
+        talent = name[len('history_'):-len(suffix)]
+        path = os.path.join(os.path.dirname(jpath), history_file(talent))
+        days = compact_history(talent, path)
+        print(f'  ✓ {path}: ジャーナル{days}日分を畳み込み')
+
+if __name__ == '__main__':
+    import argparse
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--convert', action='store_true',
+                        help='旧形式の history_*.json をコンパクト形式に一括変換')
+    parser.add_argument('--compact', action='store_true',
+                        help='history_*.journal.jsonl を本体に畳み込んで削除')
+    parser.add_argument('--sparse', action='store_true',
+                        help='history_*.json を変化分のみの形式（version 3）に書き直す')
+    parser.add_argument('--dense', action='store_true',
+                        help='history_*.json を日ごとの値の形式（version 2）に書き直す')
+    parser.add_argument('paths', nargs='*', help='対象ファイル（省略時は全件）')
+    args = parser.parse_args()
+
+    if args.convert:
+        convert_all(args.paths)
+    elif args.compact:
+        compact_all(args.paths)
+    elif args.sparse or args.dense:
+        rewrite_all(args.sparse, args.paths)
+    else:
+        parser.print_help()
+        sys.exit(1)
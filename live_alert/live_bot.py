@@ -1,16 +1,31 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 """
-Discord Bot: /check コマンドで4名のライブ・見逃し配信を確認する
+Discord Bot: /check コマンドで全タレントのライブ・今日の配信を確認する
+
+判定は live_status.py（アップロード再生リスト＋videos.list、キャッシュ付き）で行う。
+監視対象は ../channels_config.json の全タレント。
+
+config.json に alert_channel_id（Discord のテキストチャンネルID）を設定すると、
+live_monitor.py の常時監視を起動して配信の開始・終了をそのチャンネルに通知する。
+websub_callback_url（ハブから到達できるこのBotの公開URL、websub_port で待ち受け）も
+設定すると WebSub の通知でも確認する。
 """
 
 import json
 import os
+import time
+import asyncio
+import traceback
 import discord
 from discord import app_commands
-from datetime import datetime, timezone, timedelta
+from datetime import datetime
 from googleapiclient.discovery import build
 
+import live_status
+import live_monitor
+from live_status import JST
+
 # ----------------------------------------------------------------
 # 設定読み込み
 # ----------------------------------------------------------------
@@ -21,80 +36,69 @@ with open(CONFIG_PATH, encoding='utf-8') as f:
 
 YOUTUBE_API_KEY = config['youtube_api_key']
 DISCORD_TOKEN = config['discord_token']
+ALERT_CHANNEL_ID = int(config.get('alert_channel_id') or 0)
+WEBSUB_CALLBACK_URL = config.get('websub_callback_url') or ''
+WEBSUB_PORT = int(config.get('websub_port') or 8080)
+WEBSUB_SECRET = config.get('websub_secret') or None
+WEBSUB_HUB_URL = config.get('websub_hub_url') or live_monitor.HUB_URL
 
 # ----------------------------------------------------------------
-# 監視対象シンガー
+# 監視対象・ライブ状態
 # ----------------------------------------------------------------
-SINGERS = [
-    {'name': '深影', 'channel_id': 'UC2daHxnuJJBM5NWci1RRkeA'},
-    {'name': '妃玖',  'channel_id': 'UCFBc8kuCtTwmtdsBcJoZ3qA'},
-    {'name': 'Diα',  'channel_id': 'UC80TduEq6Sp4n2DkiUH2eLQ'},
-    {'name': 'wouca', 'channel_id': 'UC8TVZmQuOl0GNbpvThwwSdQ'},
-]
+TALENTS = live_status.load_talents()
 
-JST = timezone(timedelta(hours=9))
+DISCORD_MESSAGE_LIMIT = 2000
+CHECK_DEADLINE = 10   # /check で取得を待つ上限（秒）。間に合わないタレントは前回の結果で返す
 
-# ----------------------------------------------------------------
-# YouTube API
-# ----------------------------------------------------------------
 def get_youtube():
     return build('youtube', 'v3', developerKey=YOUTUBE_API_KEY)
 
-def jst_today_midnight_utc() -> str:
-    """今日のJST 0:00 をUTC ISO形式で返す"""
-    now_jst = datetime.now(JST)
-    midnight_jst = now_jst.replace(hour=0, minute=0, second=0, microsecond=0)
-    return midnight_jst.astimezone(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
-
-def check_channel(youtube, channel_id: str) -> dict:
-    """
-    1チャンネルについて現在ライブ中と今日のアーカイブを取得する。
-    Returns:
-        {
-            'live': [{'title': ..., 'video_id': ...}],
-            'archives': [{'title': ..., 'video_id': ..., 'started_at': ...}],
-        }
-    """
-    result = {'live': [], 'archives': []}
-
-    # 現在ライブ中
-    live_res = youtube.search().list(
-        channelId=channel_id,
-        eventType='live',
-        type='video',
-        part='id,snippet',
-        maxResults=3,
-    ).execute()
-    for item in live_res.get('items', []):
-        result['live'].append({
-            'title': item['snippet']['title'],
-            'video_id': item['id']['videoId'],
-        })
-
-    # 今日のアーカイブ（配信終了分）
-    archive_res = youtube.search().list(
-        channelId=channel_id,
-        eventType='completed',
-        type='video',
-        part='id,snippet',
-        publishedAfter=jst_today_midnight_utc(),
-        maxResults=5,
-        order='date',
-    ).execute()
-    for item in archive_res.get('items', []):
-        started_at = item['snippet'].get('publishedAt', '')
-        if started_at:
-            dt = datetime.fromisoformat(started_at.replace('Z', '+00:00')).astimezone(JST)
-            started_str = dt.strftime('%H:%M')
-        else:
-            started_str = '--:--'
-        result['archives'].append({
-            'title': item['snippet']['title'],
-            'video_id': item['id']['videoId'],
-            'started_at': started_str,
-        })
+status_service = live_status.LiveStatusService(get_youtube, TALENTS)
 
-    return result
+def format_report(status, fetched_at) -> list:
+    """/check の返信本文を Discord の文字数上限ごとに分けて返す"""
+    today_str = datetime.now(JST).strftime('%Y/%m/%d')
+    fetched_str = datetime.fromtimestamp(fetched_at, JST).strftime('%H:%M:%S')
+    header = f'📅 **{today_str} 配信チェック**（{fetched_str} 時点）\n'
+    blocks = []
+    quiet, failed = [], []
+
+    for talent in TALENTS:
+        data = status[talent['channel_id']]
+        name = talent['name']
+
+        lines = []
+        if data['live']:
+            for v in data['live']:
+                url = f"https://www.youtube.com/watch?v={v['video_id']}"
+                lines.append(f"🔴 **{name}さん ライブ中！**")
+                lines.append(f"　{v['title']}")
+                lines.append(f"　{url}")
+        elif data['archives']:
+            lines.append(f"📼 **{name}さん** 今日の配信:")
+            for v in data['archives']:
+                url = f"https://www.youtube.com/watch?v={v['video_id']}"
+                lines.append(f"　{v['started_at']}〜 {v['title']}")
+                lines.append(f"　{url}")
+        elif 'error' in data:
+            failed.append(name)
+        else:
+            quiet.append(name)
+        if lines:
+            blocks.append('\n'.join(lines) + '\n')
+
+    if quiet:
+        blocks.append(f"✅ 今日は配信なし: {'、'.join(quiet)}")
+    if failed:
+        blocks.append(f"⚠️ 取得失敗: {'、'.join(failed)}")
+
+    # タレント単位で上限に収まるように詰める
+    messages = [header]
+    for block in blocks:
+        if len(messages[-1]) + len(block) + 1 > DISCORD_MESSAGE_LIMIT:
+            messages.append('')
+        messages[-1] += block + '\n'
+    return messages
 
 # ----------------------------------------------------------------
 # Discord Bot
@@ -104,46 +108,63 @@ class LiveCheckerBot(discord.Client):
         intents = discord.Intents.default()
         super().__init__(intents=intents)
         self.tree = app_commands.CommandTree(self)
+        self.monitor = None
+        self.monitor_task = None   # イベントループはタスクを弱参照でしか持たないので、ここで保持する
 
     async def setup_hook(self):
         await self.tree.sync()
         print('スラッシュコマンド同期完了')
+        if ALERT_CHANNEL_ID:
+            self.monitor = build_monitor(self.post_alert)
+            self.monitor_task = asyncio.create_task(self.monitor.run())
+            self.monitor_task.add_done_callback(self._monitor_done)
+            print(f'ライブ監視開始: {len(TALENTS)}タレント → チャンネル {ALERT_CHANNEL_ID}')
+
+    def _monitor_done(self, task):
+        """監視ループは終了しないので、ここに来たら（キャンセル以外は）止まった理由を出す"""
+        if task.cancelled():
+            return
+        e = task.exception()
+        if e is not None:
+            print(f'❌ ライブ監視が停止しました: {e!r}')
+            traceback.print_exception(type(e), e, e.__traceback__)
+        else:
+            print('⚠️  ライブ監視が終了しました')
+
+    async def close(self):
+        if self.monitor_task is not None:
+            self.monitor_task.cancel()
+        if self.monitor is not None and self.monitor.receiver is not None:
+            self.monitor.receiver.stop()
+        await super().close()
+
+    async def post_alert(self, message: str):
+        await self.wait_until_ready()
+        channel = self.get_channel(ALERT_CHANNEL_ID) or await self.fetch_channel(ALERT_CHANNEL_ID)
+        await channel.send(message)
 
     async def on_ready(self):
         print(f'Bot起動: {self.user}')
 
+def build_monitor(notify):
+    monitor = live_monitor.LiveMonitor(status_service, TALENTS, notify)
+    if WEBSUB_CALLBACK_URL:
+        monitor.receiver = live_monitor.WebSubReceiver(
+            WEBSUB_CALLBACK_URL, monitor.poke, hub_url=WEBSUB_HUB_URL,
+            secret=WEBSUB_SECRET, port=WEBSUB_PORT,
+        ).start()
+    return monitor
+
 client = LiveCheckerBot()
 
-@client.tree.command(name='check', description='4名のライブ・見逃し配信を確認する')
+@client.tree.command(name='check', description='全タレントのライブ・今日の配信を確認する')
 async def check(interaction: discord.Interaction):
     await interaction.response.defer()
 
-    youtube = get_youtube()
-    today_str = datetime.now(JST).strftime('%Y/%m/%d')
-    lines = [f'📅 **{today_str} 配信チェック**\n']
-
-    for singer in SINGERS:
-        data = check_channel(youtube, singer['channel_id'])
-        name = singer['name']
-
-        if data['live']:
-            for v in data['live']:
-                url = f"https://www.youtube.com/watch?v={v['video_id']}"
-                lines.append(f"🔴 **{name}さん ライブ中！**")
-                lines.append(f"　{v['title']}")
-                lines.append(f"　{url}")
-        elif data['archives']:
-            lines.append(f"📼 **{name}さん** 今日の配信:")
-            for v in data['archives']:
-                url = f"https://www.youtube.com/watch?v={v['video_id']}"
-                lines.append(f"　{v['started_at']}〜 {v['title']}")
-                lines.append(f"　{url}")
-        else:
-            lines.append(f"✅ **{name}さん**: 今日は配信なし")
-
-        lines.append('')
-
-    await interaction.followup.send('\n'.join(lines))
+    status, fetched_at = await status_service.get_async(timeout=CHECK_DEADLINE)
+    print(f'/check: {time.time() - fetched_at:.0f}秒前の取得分 / 累計 {status_service.quota_used}ユニット')
+    for message in format_report(status, fetched_at):
+        await interaction.followup.send(message)
 
 # ----------------------------------------------------------------
 # 起動
@@ -0,0 +1,401 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ライブ配信の常時監視（WebSub 受信＋適応ポーリング）と Discord 通知
+
+/check を待たずに配信の開始・終了を通知する。情報源は2つ:
+
+- WebSub（PubSubHubbub）: YouTube のアップロードフィード
+  https://www.youtube.com/xml/feeds/videos.xml?channel_id=... をハブ経由で購読し、
+  動画の公開・更新（待機所の作成を含む）の通知を WebSubReceiver で受ける。
+  通知された動画は LiveStatusService で追跡し、そのチャンネルをすぐ確認する。
+  配信の開始そのものでは通知が来ないことがあるので、開始・終了の判定はポーリングで行う。
+- 適応ポーリング: チャンネルごとに次の確認時刻を決める
+    ライブ中 / 待機所の予定時刻の UPCOMING_WINDOW 秒前から → POLL_LIVE 秒ごと
+    過去に配信を始めた時間帯（JSTの時、前後1時間）      → POLL_ACTIVE 秒ごと
+    それ以外                                             → POLL_IDLE 秒ごと
+  配信を始めた時間帯は live_hours.json に学習して残す。
+
+1チャンネル1回2ユニット。23タレントを POLL_IDLE=30分で回すと1日約2,200ユニットで、
+配信の多い時間帯・配信中のチャンネルの分がこれに加わる。
+
+ライブ状態（LiveStateTable）はメモリ上のみ。起動直後の各チャンネル1回目の確認は
+ベースラインとして扱い、すでにライブ中の配信は通知しない。
+
+ローカルでの動作確認は bench/fake_websub_hub.py（ハブの代替）を使う。
+"""
+
+import os
+import hmac
+import json
+import time
+import asyncio
+import hashlib
+import tempfile
+import threading
+import urllib.parse
+import urllib.request
+import xml.etree.ElementTree as ET
+from datetime import datetime
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+from live_status import JST, _parse_time
+
+LIVE_HOURS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'live_hours.json')
+
+POLL_IDLE = 30 * 60        # 通常の確認間隔（秒）
+POLL_ACTIVE = 5 * 60       # 配信の多い時間帯の確認間隔
+POLL_LIVE = 60             # ライブ中・開始間近の確認間隔
+UPCOMING_WINDOW = 15 * 60  # 待機所の予定時刻の何秒前から POLL_LIVE にするか
+UPCOMING_GRACE = 2 * 3600  # 予定時刻を過ぎても始まらない待機所を POLL_LIVE で見続ける秒数
+ACTIVE_MIN_STARTS = 2      # 前後1時間の開始回数がこれ以上なら「配信の多い時間帯」
+POLL_DEADLINE = 30         # 1回の確認で取得を待つ上限（秒）
+TICK = 60                  # 確認予定が無くても起きる間隔（WebSub の購読更新の確認）
+
+HUB_URL = 'https://pubsubhubbub.appspot.com/subscribe'
+FEED_TOPIC = 'https://www.youtube.com/xml/feeds/videos.xml?channel_id={}'
+LEASE_SECONDS = 5 * 24 * 3600   # 購読の有効期間（ハブが短くすることがある）
+RENEW_MARGIN = 12 * 3600        # 期限のこの秒数前に購読し直す
+VERIFY_RETRY = 3600             # ハブからの確認が来ない購読を申し込み直すまでの秒数
+MAX_NOTIFY_BYTES = 1 << 20
+
+ATOM = '{http://www.w3.org/2005/Atom}'
+YT = '{http://www.youtube.com/xml/schemas/2015}'
+
+# ----------------------------------------------------------------
+# ライブ状態
+# ----------------------------------------------------------------
+
+class LiveStateTable:
+    """
+    動画ID → {'channel_id', 'title', 'state': 'live' | 'upcoming', 'started_at' | 'scheduled_at'}。
+    チャンネルごとの取得結果を反映するたびに配信の開始・終了を返す。
+    """
+
+    def __init__(self):
+        self.videos = {}
+        self._seen = set()   # 1回以上反映したチャンネル
+
+    def channel_videos(self, channel_id):
+        return [v for v in self.videos.values() if v['channel_id'] == channel_id]
+
+    def apply(self, channel_id, result):
+        """
+        1チャンネル分の取得結果（LiveStatusService の status[channel_id]）を反映する。
+        Returns: [('start' | 'end', {'video_id', 'title', ...})]
+        """
+        if 'error' in result:
+            return []
+        baseline = channel_id not in self._seen
+        self._seen.add(channel_id)
+
+        previous = {vid: v for vid, v in self.videos.items() if v['channel_id'] == channel_id}
+        current = {}
+        for entry in result.get('upcoming', []):
+            current[entry['video_id']] = {'channel_id': channel_id, 'title': entry['title'],
+                                          'state': 'upcoming', 'scheduled_at': entry['scheduled_at']}
+        for entry in result.get('live', []):
+            current[entry['video_id']] = {'channel_id': channel_id, 'title': entry['title'],
+                                          'state': 'live', 'started_at': entry['started_at']}
+
+        events = []
+        if not baseline:
+            for vid, v in current.items():
+                if v['state'] == 'live' and previous.get(vid, {}).get('state') != 'live':
+                    events.append(('start', {'video_id': vid, **v}))
+            for vid, v in previous.items():
+                if v['state'] == 'live' and current.get(vid, {}).get('state') != 'live':
+                    events.append(('end', {'video_id': vid, **v}))
+
+        for vid in previous:
+            del self.videos[vid]
+        self.videos.update(current)
+        return events
+
+class LiveHours:
+    """
+    チャンネルごとの配信開始時刻（JSTの時）の回数。live_hours.json に保存する。
+        {チャンネルID: {"hours": [0時..23時の回数], "recent": [数えた動画ID...]}}
+    """
+
+    RECENT_LIMIT = 100
+
+    def __init__(self, path=LIVE_HOURS_FILE):
+        self.path = path
+        self.dirty = False
+        try:
+            with open(path, encoding='utf-8') as f:
+                self.data = json.load(f)
+        except (FileNotFoundError, ValueError):
+            self.data = {}
+
+    def record(self, channel_id, video_id, started_at):
+        """started_at（'HH:MM'）の時を1回数える。同じ動画は1回だけ"""
+        if not started_at[:2].isdigit():
+            return
+        entry = self.data.setdefault(channel_id, {'hours': [0] * 24, 'recent': []})
+        if video_id in entry['recent']:
+            return
+        entry['hours'][int(started_at[:2]) % 24] += 1
+        entry['recent'] = (entry['recent'] + [video_id])[-self.RECENT_LIMIT:]
+        self.dirty = True
+
+    def is_active(self, channel_id, hour):
+        hours = self.data.get(channel_id, {}).get('hours')
+        if not hours:
+            return False
+        return sum(hours[(hour + d) % 24] for d in (-1, 0, 1)) >= ACTIVE_MIN_STARTS
+
+    def save(self):
+        if not self.dirty:
+            return
+        dir_ = os.path.dirname(os.path.abspath(self.path))
+        with tempfile.NamedTemporaryFile('w', encoding='utf-8', dir=dir_, delete=False, suffix='.tmp') as f:
+            json.dump(self.data, f, ensure_ascii=False)
+            tmp_path = f.name
+        os.replace(tmp_path, self.path)
+        self.dirty = False
+
+# ----------------------------------------------------------------
+# 監視ループ
+# ----------------------------------------------------------------
+
+def format_event(kind, name, entry):
+    url = f"https://www.youtube.com/watch?v={entry['video_id']}"
+    if kind == 'start':
+        return f"🔴 **{name}さん 配信開始！**\n　{entry['title']}\n　{url}"
+    return f"⏹️ **{name}さん** 配信終了\n　{entry['title']}\n　{url}"
+
+class LiveMonitor:
+    """
+    チャンネルごとの次の確認時刻に従って LiveStatusService で取得し、
+    LiveStateTable の開始・終了を notify（async 関数、引数はメッセージ文字列）で通知する。
+    receiver（WebSubReceiver）を渡すと起動時に全チャンネルを購読し、期限前に更新する。
+    """
+
+    def __init__(self, service, talents, notify, hours=None, receiver=None):
+        self.service = service
+        self.names = {t['channel_id']: t['name'] for t in talents}
+        self.notify = notify
+        self.table = LiveStateTable()
+        self.hours = hours if hours is not None else LiveHours()
+        self.receiver = receiver
+        self._next = dict.fromkeys(self.names, 0.0)   # チャンネルID → 次の確認時刻
+        self._loop = None
+        self._wake = None
+
+    def poke(self, channel_id, video_id=None):
+        """channel_id をすぐ確認する（WebSub の通知など。どのスレッドからでも呼べる）"""
+        if channel_id not in self.names:
+            return
+        if video_id:
+            self.service.track(channel_id, video_id)
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._poke, channel_id)
+
+    def _poke(self, channel_id):
+        self._next[channel_id] = 0.0
+        self._wake.set()
+
+    def next_interval(self, channel_id, now):
+        """次に確認するまでの秒数"""
+        videos = self.table.channel_videos(channel_id)
+        if any(v['state'] == 'live' for v in videos):
+            return POLL_LIVE
+        hour = datetime.fromtimestamp(now, JST).hour
+        interval = POLL_ACTIVE if self.hours.is_active(channel_id, hour) else POLL_IDLE
+        for v in videos:
+            scheduled = _parse_time(v.get('scheduled_at'))
+            if scheduled is None:
+                continue
+            until = scheduled.timestamp() - now
+            if -UPCOMING_GRACE <= until <= UPCOMING_WINDOW:
+                return POLL_LIVE
+            if until > UPCOMING_WINDOW:
+                interval = min(interval, until - UPCOMING_WINDOW)
+        return interval
+
+    async def check(self, channel_ids):
+        """channel_ids を取得し直して状態を反映・通知する"""
+        status, _ = await self.service.get_async(max_age=0, timeout=POLL_DEADLINE, channel_ids=channel_ids)
+        now = time.time()
+        for channel_id in channel_ids:
+            result = status[channel_id]
+            for kind, entry in self.table.apply(channel_id, result):
+                message = format_event(kind, self.names[channel_id], entry)
+                print(f'通知: {message.splitlines()[0]}')
+                try:
+                    await self.notify(message)
+                except Exception as e:
+                    print(f'⚠️  通知の送信に失敗: {e}')
+            for entry in result.get('live', []) + result.get('archives', []):
+                self.hours.record(channel_id, entry['video_id'], entry['started_at'])
+            self._next[channel_id] = now + self.next_interval(channel_id, now)
+        self.hours.save()
+
+    async def run(self):
+        """監視ループ（終了しない）"""
+        self._loop = asyncio.get_running_loop()
+        self._wake = asyncio.Event()
+        if self.receiver is not None:
+            await self._loop.run_in_executor(None, self.receiver.subscribe_all, list(self.names))
+
+        while True:
+            due = [cid for cid, at in self._next.items() if at <= time.time()]
+            if due:
+                try:
+                    await self.check(due)
+                except Exception as e:
+                    print(f'⚠️  ライブ監視の確認に失敗: {e}')
+                    for channel_id in due:
+                        self._next[channel_id] = time.time() + POLL_LIVE
+            if self.receiver is not None:
+                await self._loop.run_in_executor(None, self.receiver.renew_due)
+
+            wait = min(max(0.0, min(self._next.values()) - time.time()), TICK)
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=wait)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+
+# ----------------------------------------------------------------
+# WebSub（PubSubHubbub）
+# ----------------------------------------------------------------
+
+def parse_feed(body):
+    """通知の Atom フィードから [(チャンネルID, 動画ID)] を取り出す（削除通知は無視）"""
+    root = ET.fromstring(body)
+    return [
+        (entry.findtext(YT + 'channelId'), entry.findtext(YT + 'videoId'))
+        for entry in root.iter(ATOM + 'entry')
+        if entry.findtext(YT + 'videoId')
+    ]
+
+class WebSubReceiver:
+    """
+    WebSub の購読とコールバックの受信。callback_url はハブから到達できる
+    このサーバーの公開URL（port で待ち受ける）。通知ごとに
+    on_notify(チャンネルID, 動画ID) をサーバーのスレッドから呼ぶ。
+    secret を設定するとハブに渡し、X-Hub-Signature が一致しない通知は捨てる。
+    """
+
+    def __init__(self, callback_url, on_notify, hub_url=HUB_URL, secret=None,
+                 host='0.0.0.0', port=8080, lease_seconds=LEASE_SECONDS):
+        self.callback_url = callback_url
+        self.on_notify = on_notify
+        self.hub_url = hub_url
+        self.secret = secret or None
+        self.host = host
+        self.port = port
+        self.lease_seconds = lease_seconds
+        self._topics = {}    # トピックURL → チャンネルID（購読を申し込んだもの）
+        self._expires = {}   # トピックURL → 購読期限 time.time()
+        self._lock = threading.Lock()
+        self._server = None
+
+    def start(self):
+        """バックグラウンドスレッドでコールバックの待ち受けを始める"""
+        handler = type('Handler', (_CallbackHandler,), {'receiver': self})
+        self._server = ThreadingHTTPServer((self.host, self.port), handler)
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        print(f'WebSub 受信: :{self.port} → {self.callback_url}')
+        return self
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server = None
+
+    def subscribe(self, channel_id, mode='subscribe'):
+        """ハブに購読（mode='unsubscribe' で解除）を申し込む。確認はハブからの GET で完了する"""
+        topic = FEED_TOPIC.format(channel_id)
+        with self._lock:
+            self._topics[topic] = channel_id
+            # 確認が来るまでの仮の期限（来なければ VERIFY_RETRY 秒後に申し込み直す）
+            self._expires[topic] = float('inf') if mode == 'unsubscribe' else time.time() + RENEW_MARGIN + VERIFY_RETRY
+        form = {
+            'hub.callback': self.callback_url,
+            'hub.mode': mode,
+            'hub.topic': topic,
+            'hub.verify': 'async',
+            'hub.lease_seconds': str(self.lease_seconds),
+        }
+        if self.secret:
+            form['hub.secret'] = self.secret
+        request = urllib.request.Request(self.hub_url, data=urllib.parse.urlencode(form).encode())
+        with urllib.request.urlopen(request, timeout=10) as resp:
+            return resp.status
+
+    def subscribe_all(self, channel_ids):
+        for channel_id in channel_ids:
+            try:
+                self.subscribe(channel_id)
+            except Exception as e:
+                print(f'⚠️  WebSub 購読の申し込みに失敗 ({channel_id}): {e}')
+
+    def renew_due(self):
+        """期限が近い（または確認が来ていない）購読を申し込み直す"""
+        now = time.time()
+        with self._lock:
+            due = [cid for topic, cid in self._topics.items() if self._expires[topic] - now < RENEW_MARGIN]
+        self.subscribe_all(due)
+
+    def verify(self, params):
+        """ハブからの購読確認（GET）。(ステータス, 本文) を返す"""
+        mode = params.get('hub.mode')
+        topic = params.get('hub.topic')
+        with self._lock:
+            if mode not in ('subscribe', 'unsubscribe') or topic not in self._topics:
+                return 404, b''
+            if mode == 'subscribe':
+                lease = int(params.get('hub.lease_seconds') or self.lease_seconds)
+                self._expires[topic] = time.time() + lease
+            else:
+                self._topics.pop(topic, None)
+                self._expires.pop(topic, None)
+        return 200, params.get('hub.challenge', '').encode()
+
+    def receive(self, body, signature):
+        """ハブからの通知（POST）。署名が合わないものは受け取った扱いにして捨てる"""
+        if self.secret:
+            expected = 'sha1=' + hmac.new(self.secret.encode(), body, hashlib.sha1).hexdigest()
+            if not hmac.compare_digest(expected, signature or ''):
+                print('⚠️  WebSub: 署名が一致しない通知を破棄')
+                return
+        try:
+            entries = parse_feed(body)
+        except ET.ParseError as e:
+            print(f'⚠️  WebSub: フィードを読めません: {e}')
+            return
+        for channel_id, video_id in entries:
+            self.on_notify(channel_id, video_id)
+
+class _CallbackHandler(BaseHTTPRequestHandler):
+    receiver = None
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status, body=b''):
+        self.send_response(status)
+        self.send_header('Content-Type', 'text/plain')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        query = urllib.parse.urlsplit(self.path).query
+        params = {k: v[0] for k, v in urllib.parse.parse_qs(query).items()}
+        self._send(*self.receiver.verify(params))
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        if length > MAX_NOTIFY_BYTES:
+            self._send(413)
+            return
+        body = self.rfile.read(length)
+        self.receiver.receive(body, self.headers.get('X-Hub-Signature'))
+        self._send(204)
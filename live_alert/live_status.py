@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ライブ中・今日の配信の判定（低クォータ・キャッシュ付き）
+
+search().list（1回100ユニット）は使わず、各チャンネルのアップロード再生リストから
+直近の動画IDを取り（playlistItems.list：1ユニット）、
+videos.list(part='snippet,liveStreamingDetails')（1ユニット）で状態を見る。
+1タレント2ユニット、23タレント分で1回あたり46ユニット。
+
+取得はタレントごとにスレッドプールで並列に行い（APIクライアントはスレッドごとに
+1つを使い回す）、所要時間は一番遅いタレントの分だけになる。
+結果はタレントごとに CACHE_TTL 秒のあいだキャッシュし、/check は期限内ならキャッシュから返す。
+get_async() は asyncio のイベントループを止めずに待ち、期限（timeout）までに
+揃わなかったタレントは前回の結果（無ければエラー扱い）で返す。取得自体は裏で続き、
+終わり次第キャッシュに入る。
+待機所（予約枠）やライブ中の動画は再生リストの先頭から外れても追跡を続ける。
+
+    status = {
+        channel_id: {
+            'live':     [{'title', 'video_id', 'started_at'}],
+            'archives': [{'title', 'video_id', 'started_at'}],   # 今日（JST）開始して終了済み
+            'upcoming': [{'title', 'video_id', 'scheduled_at'}], # 待機所（scheduled_at は UTC ISO形式）
+            'error':    'メッセージ',                             # 取得に失敗した場合のみ
+        }
+    }
+"""
+
+import os
+import json
+import time
+import asyncio
+import threading
+import concurrent.futures
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone, timedelta
+
+JST = timezone(timedelta(hours=9))
+
+CHANNELS_CONFIG = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'channels_config.json')
+CACHE_TTL = 120        # キャッシュの有効期間（秒）
+PLAYLIST_DEPTH = 10    # アップロード再生リストの先頭から見る動画数
+FETCH_WORKERS = 8      # 同時に取得するタレント数
+
+# ----------------------------------------------------------------
+# 監視対象
+# ----------------------------------------------------------------
+
+def load_talents(path=CHANNELS_CONFIG):
+    """
+    channels_config.json から [{'name', 'channel_id'}] を返す。
+    /channel/UC... 形式のURLのみ対象（@ハンドル形式は API で解決が要るためスキップ）。
+    """
+    with open(path, encoding='utf-8') as f:
+        channels = json.load(f)
+    talents = []
+    for ch in channels:
+        url = ch.get('url', '')
+        if '/channel/' not in url:
+            print(f'⚠️  {ch.get("name")}: チャンネルID形式のURLではないためスキップ ({url})')
+            continue
+        talents.append({'name': ch['name'], 'channel_id': url.split('/channel/')[-1].strip('/')})
+    return talents
+
+def uploads_playlist_id(channel_id):
+    """アップロード再生リストのID（UC... → UU...）"""
+    return 'UU' + channel_id[2:]
+
+def jst_today_midnight():
+    return datetime.now(JST).replace(hour=0, minute=0, second=0, microsecond=0)
+
+def _parse_time(value):
+    return datetime.fromisoformat(value.replace('Z', '+00:00')) if value else None
+
+# ----------------------------------------------------------------
+# 判定
+# ----------------------------------------------------------------
+
+def classify(item, midnight):
+    """
+    videos.list の item を 'live' / 'upcoming' / 'archive'（今日開始・終了済み）/ None に分類する
+    """
+    details = item.get('liveStreamingDetails')
+    if not details:
+        return None
+    content = item.get('snippet', {}).get('liveBroadcastContent')
+    if content in ('live', 'upcoming'):
+        return content
+    started = _parse_time(details.get('actualStartTime'))
+    if started and details.get('actualEndTime') and started >= midnight:
+        return 'archive'
+    return None
+
+def _entry(item, kind):
+    entry = {'title': item['snippet']['title'], 'video_id': item['id']}
+    details = item['liveStreamingDetails']
+    if kind == 'upcoming':
+        entry['scheduled_at'] = details.get('scheduledStartTime', '')
+        return entry
+    started = _parse_time(details.get('actualStartTime'))
+    entry['started_at'] = started.astimezone(JST).strftime('%H:%M') if started else '--:--'
+    return entry
+
+class LiveStatusService:
+    """
+    タレント全員のライブ状態を取得・キャッシュする。
+    get() / get_async() はキャッシュが CACHE_TTL 秒以内のタレントはそのまま返し、
+    古いタレントだけ取得し直す。同じタレントの取得が実行中なら相乗りする。
+
+    youtube_factory: APIクライアントを作る関数（googleapiclient はスレッドセーフでないため
+                     ワーカースレッドごとに1回呼んで使い回す）
+    """
+
+    def __init__(self, youtube_factory, talents, ttl=CACHE_TTL, depth=PLAYLIST_DEPTH,
+                 workers=FETCH_WORKERS):
+        self.youtube_factory = youtube_factory
+        self.talents = talents
+        self.ttl = ttl
+        self.depth = depth
+        self.quota_used = 0          # 起動からの消費ユニット数（1呼び出し = 1ユニット）
+        self._entries = {}           # チャンネルID → (結果, 取得時刻 time.time())
+        self._inflight = {}          # チャンネルID → 実行中の Future
+        self._tracked = {}           # チャンネルID → 待機所・ライブ中の動画IDの集合
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='live_status')
+
+    def get(self, max_age=None, timeout=None, channel_ids=None):
+        """
+        古いタレントを取得し直して (status, 最も古い取得時刻) を返す。
+        timeout 秒で打ち切り、間に合わなかったタレントは前回の結果で返す。
+        channel_ids を渡すとそのタレントだけを取得し直す（status は全員分）。
+        """
+        futures = self._refresh(max_age, channel_ids)
+        if futures:
+            concurrent.futures.wait(futures, timeout=timeout)
+        return self.snapshot()
+
+    async def get_async(self, max_age=None, timeout=None, channel_ids=None):
+        """get() のイベントループを止めない版"""
+        futures = self._refresh(max_age, channel_ids)
+        if futures:
+            await asyncio.wait([asyncio.wrap_future(f) for f in futures], timeout=timeout)
+        return self.snapshot()
+
+    def snapshot(self):
+        """現在のキャッシュから (status, 最も古い取得時刻) を組み立てる"""
+        status = {}
+        oldest = time.time()
+        with self._lock:
+            for talent in self.talents:
+                channel_id = talent['channel_id']
+                entry = self._entries.get(channel_id)
+                if entry is None:
+                    status[channel_id] = {'live': [], 'archives': [], 'upcoming': [],
+                                          'error': '時間内に取得できませんでした'}
+                    continue
+                status[channel_id], fetched_at = entry
+                oldest = min(oldest, fetched_at)
+        return status, oldest
+
+    def track(self, channel_id, video_id):
+        """次回の取得で再生リストの先頭に無くても video_id を確認する（WebSub の通知など）"""
+        with self._lock:
+            self._tracked.setdefault(channel_id, set()).add(video_id)
+
+    def _refresh(self, max_age, channel_ids=None):
+        """キャッシュが max_age 秒より古いタレントの取得を始め、待つべき Future を返す"""
+        max_age = self.ttl if max_age is None else max_age
+        now = time.time()
+        futures = []
+        with self._lock:
+            for talent in self.talents:
+                channel_id = talent['channel_id']
+                if channel_ids is not None and channel_id not in channel_ids:
+                    continue
+                entry = self._entries.get(channel_id)
+                if entry is not None and now - entry[1] <= max_age:
+                    continue
+                future = self._inflight.get(channel_id)
+                if future is None:
+                    future = self._executor.submit(self._fetch_channel, channel_id)
+                    self._inflight[channel_id] = future
+                futures.append(future)
+        return futures
+
+    def _youtube(self):
+        if not hasattr(self._local, 'youtube'):
+            self._local.youtube = self.youtube_factory()
+        return self._local.youtube
+
+    def _call(self, request):
+        with self._lock:
+            self.quota_used += 1
+        return request.execute()
+
+    def _fetch_channel(self, channel_id):
+        """1タレント分を取得してキャッシュに入れる（ワーカースレッドで実行）"""
+        try:
+            result, tracked, checked = self._fetch(channel_id)
+        except Exception as e:
+            with self._lock:
+                previous = self._entries.get(channel_id, ({'live': [], 'archives': [], 'upcoming': []}, 0))[0]
+                result = {**previous, 'error': str(e)}
+            tracked, checked = set(), set()
+        with self._lock:
+            self._entries[channel_id] = (result, time.time())
+            # 確認した動画は結果で置き換え、取得中に track() された動画は残す
+            self._tracked[channel_id] = tracked | (self._tracked.get(channel_id, set()) - checked)
+            self._inflight.pop(channel_id, None)
+        return result
+
+    def _fetch(self, channel_id):
+        youtube = self._youtube()
+        resp = self._call(youtube.playlistItems().list(
+            part='snippet',
+            playlistId=uploads_playlist_id(channel_id),
+            maxResults=self.depth,
+        ))
+        # 直近の動画ID（＋追跡中の待機所・ライブ）
+        ids = [item['snippet']['resourceId']['videoId'] for item in resp.get('items', [])]
+        with self._lock:
+            ids = list(dict.fromkeys(sorted(self._tracked.get(channel_id, ())) + ids))[:50]
+
+        result = {'live': [], 'archives': [], 'upcoming': []}
+        tracked = set()
+        if not ids:
+            return result, tracked, set()
+        resp = self._call(youtube.videos().list(
+            part='snippet,liveStreamingDetails',
+            id=','.join(ids),
+        ))
+        midnight = jst_today_midnight()
+        for item in resp.get('items', []):
+            kind = classify(item, midnight)
+            if kind in ('live', 'upcoming'):
+                tracked.add(item['id'])
+            if kind == 'archive':
+                result['archives'].append(_entry(item, kind))
+            elif kind:
+                result[kind].append(_entry(item, kind))
+        result['archives'].sort(key=lambda v: v['started_at'])
+        return result, tracked, set(ids)
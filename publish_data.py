@@ -0,0 +1,181 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Web公開用データの書き出し（minify・内容ハッシュ付きファイル名）
+
+Web は GitHub の raw URL から JSON を取得しているが、ファイル名が毎日同じなので
+ブラウザ側ではキャッシュが新しいかどうか判断できない。公開対象のファイルを
+minify した上で内容ハッシュ付きのファイル名で data/ 以下に書き出し、
+論理名 → ハッシュ付きファイルの対応を data_manifest.json にまとめる。
+Web は manifest だけを毎回取得し、ハッシュが変わったファイルだけを取り直す
+（ハッシュ付きファイルは内容が変わらないので無期限にキャッシュできる）。
+
+    data_manifest.json
+    {
+      "version": 1,
+      "generated_at": "2026-10-17 00:05:12",
+      "files": {
+        "dashboard_summary.json": {
+          "path": "data/dashboard_summary.3f9a1c2b7d4e.json",
+          "hash": "3f9a1c2b7d4e", "bytes": 81234,
+          "src": "<元ファイルの sha256>"
+        },
+        "history/MEMESIA/2026-10.json": {...},
+        ...
+      }
+    }
+
+- PRECOMPRESS = True なら .gz（gzip）と、brotli パッケージがあれば .br も併せて書き出す
+  （Content-Encoding を付けて配信できるホスティング向け。manifest に "gz" / "br" のサイズが付く）。
+  raw.githubusercontent.com は事前圧縮版を配信に使えず、data/ はワークフローが毎日コミットするので
+  既定では書き出さない
+- 元ファイルの内容が前回と同じなら minify・圧縮をやり直さない
+- 前回の manifest が参照していたファイルは1世代だけ残す
+  （古い manifest を持っているクライアントが取得できるように）
+
+手動で書き出す:
+    python publish_data.py
+"""
+
+import os
+import json
+import glob
+import gzip
+import hashlib
+import tempfile
+from datetime import datetime, timezone, timedelta
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+DATA_MANIFEST_FILE = 'data_manifest.json'
+DATA_MANIFEST_VERSION = 1
+PUBLISH_DIR = 'data'
+HASH_LENGTH = 12
+PRECOMPRESS = False  # .gz/.br も書き出す（Content-Encoding を付けて配信できるホスティングの場合のみ）
+
+# 公開対象（論理名のパターン）。Web が取得するファイルのみ
+PUBLISH_PATTERNS = (
+    'dashboard_summary.json',
+    'video_flags.json',
+    'series_*.json',
+    'analytics_*.json',
+    'history/*/*.json',
+)
+
+def published_path(name, digest):
+    """論理名 'history/MEMESIA/2026-10.json' → 'data/history/MEMESIA/2026-10.<hash>.json'"""
+    stem, ext = os.path.splitext(name)
+    return f'{PUBLISH_DIR}/{stem}.{digest}{ext}'
+
+def minify(raw):
+    """JSON を空白なしの UTF-8 バイト列にする"""
+    data = json.loads(raw)
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+def _write_bytes(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with tempfile.NamedTemporaryFile('wb', dir=os.path.dirname(path), delete=False, suffix='.tmp') as f:
+        f.write(data)
+        tmp_path = f.name
+    os.replace(tmp_path, path)
+
+def publish_file(name, raw):
+    """1ファイル分を書き出して manifest のエントリを返す"""
+    body = minify(raw)
+    digest = hashlib.sha256(body).hexdigest()[:HASH_LENGTH]
+    path = published_path(name, digest)
+    entry = {'path': path, 'hash': digest, 'bytes': len(body)}
+
+    if not os.path.exists(path):
+        _write_bytes(path, body)
+    if not PRECOMPRESS:
+        return entry
+    # mtime=0 で同じ内容なら同じバイト列にする
+    gz = gzip.compress(body, compresslevel=9, mtime=0)
+    if not os.path.exists(path + '.gz'):
+        _write_bytes(path + '.gz', gz)
+    entry['gz'] = len(gz)
+    if brotli is not None:
+        br = brotli.compress(body)
+        if not os.path.exists(path + '.br'):
+            _write_bytes(path + '.br', br)
+        entry['br'] = len(br)
+    return entry
+
+def load_manifest(path=DATA_MANIFEST_FILE):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except Exception:
+        return None
+
+def logical_names(patterns=PUBLISH_PATTERNS):
+    names = set()
+    for pattern in patterns:
+        for path in glob.glob(pattern):
+            names.add(path.replace(os.sep, '/'))
+    return sorted(names)
+
+def publish(patterns=PUBLISH_PATTERNS, manifest_path=DATA_MANIFEST_FILE):
+    """
+    公開対象を data/ に書き出して data_manifest.json を更新する。
+    Returns: (manifest, 書き出し直したファイル数)
+    """
+    previous = load_manifest(manifest_path) or {}
+    prev_files = previous.get('files', {})
+
+    files = {}
+    changed = 0
+    for name in logical_names(patterns):
+        with open(name, 'rb') as f:
+            raw = f.read()
+        src = hashlib.sha256(raw).hexdigest()
+        prev = prev_files.get(name)
+        if prev and prev.get('src') == src and os.path.exists(prev['path']):
+            files[name] = prev
+            continue
+        try:
+            entry = publish_file(name, raw)
+        except ValueError as e:
+            print(f'  ⚠️  {name}: JSONとして読めないため公開をスキップ: {e}')
+            continue
+        entry['src'] = src
+        files[name] = entry
+        changed += 1
+
+    manifest = {
+        'version': DATA_MANIFEST_VERSION,
+        'generated_at': datetime.now(timezone(timedelta(hours=9))).strftime('%Y-%m-%d %H:%M:%S'),
+        'files': files,
+    }
+    dir_ = os.path.dirname(os.path.abspath(manifest_path))
+    with tempfile.NamedTemporaryFile('w', encoding='utf-8', dir=dir_, delete=False, suffix='.tmp') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=1)
+        tmp_path = f.name
+    os.replace(tmp_path, manifest_path)
+
+    prune({e['path'] for e in files.values()} | {e['path'] for e in prev_files.values()})
+    return manifest, changed
+
+def prune(keep_paths):
+    """data/ 以下のうち keep_paths（PRECOMPRESS なら圧縮版も）以外を削除する"""
+    keep = set()
+    for path in keep_paths:
+        keep.update((path, path + '.gz', path + '.br') if PRECOMPRESS else (path,))
+    for root, _, names in os.walk(PUBLISH_DIR, topdown=False):
+        for name in names:
+            path = os.path.join(root, name).replace(os.sep, '/')
+            if path not in keep:
+                os.remove(path)
+        if root != PUBLISH_DIR and not os.listdir(root):
+            os.rmdir(root)
+
+if __name__ == '__main__':
+    manifest, changed = publish()
+    total = sum(e['bytes'] for e in manifest['files'].values())
+    gz = sum(e.get('gz', 0) for e in manifest['files'].values())
+    print(f'✓ {DATA_MANIFEST_FILE}: {len(manifest["files"])}ファイル（更新 {changed}） '
+          f'{total:,} bytes' + (f' / gzip {gz:,} bytes' if PRECOMPRESS else ''))
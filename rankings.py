@@ -0,0 +1,132 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+dashboard_summary.json の期間別ランキング（上位K件）
+
+指標・種別・期間ごとに「期間中の伸び」が大きい上位 K 件だけを選び、summary の rankings に載せる。
+Web はこれを表示するだけで、1日より長い期間のランキングのためにタレントごとの履歴を取得しない。
+
+    "rankings": {
+      "k": 50, "windows": [1, 7, 30],
+      "base": {"1": "2026-10-16", "7": "2026-10-10", "30": "2026-09-17"},
+      "videos":   {"7": {"Movie": {"views": [{"t", "id", "ti", "n", "d"}...], "likes": [...], "comments": [...]},
+                         "Short": {...}, "LiveArchive": {...}}, ...},
+      "channels": {"7": {"subscribers": [{"t", "n", "d"}...], "views": [...]}, ...}
+    }
+
+- 期間 W 日の伸び d = n_date の値 − 基準日（n_date の W 日前）以前で最新の記録の値
+- 基準日以前に記録の無い動画は、基準日より後に公開されたもの（期間中の新作）だけ d = 値とし、
+  それ以外（途中から記録し始めた古い動画）は伸びが分からないので載せない
+- n_date に記録の無い動画・チャンネルは載せない
+- 同じ伸びは n_date の値が大きい順（それも同じならタレント名・動画IDの逆順）
+
+選択は指標ごとに大きさ K のヒープ（heapq）で行い、全動画を並べ替えない。
+タレントごとの結果を merge() でまとめても全体を一度に選んだ結果と同じになる
+（全体の上位 K 件は、各タレントの上位 K 件の和集合に必ず含まれる）。
+"""
+
+import heapq
+from datetime import date as Date, timedelta
+
+TOP_K = 50
+WINDOWS = (1, 7, 30)
+VIDEO_TYPES = ('Movie', 'Short', 'LiveArchive')
+VIDEO_METRICS = ('views', 'likes', 'comments')
+CHANNEL_METRICS = ('subscribers', 'views')
+
+def base_dates(n_date, windows=WINDOWS):
+    """{期間: 基準日}（n_date の W 日前）"""
+    n = Date.fromisoformat(n_date)
+    return {w: (n - timedelta(days=w)).isoformat() for w in windows}
+
+def _push(heap, k, item):
+    if len(heap) < k:
+        heapq.heappush(heap, item)
+    elif item > heap[0]:
+        heapq.heappushpop(heap, item)
+
+class VideoRankings:
+    """期間 × 種別 × 指標ごとの上位 K 件（動画）。add() で1本ずつ渡す"""
+
+    def __init__(self, n_date, windows=WINDOWS, k=TOP_K):
+        self.n_date = n_date
+        self.k = k
+        self.bases = base_dates(n_date, windows)
+        self.heaps = {(w, ty, m): [] for w in self.bases for ty in VIDEO_TYPES for m in VIDEO_METRICS}
+
+    def add(self, talent, vid_id, title, vtype, published, current, bases):
+        """
+        current: n_date の (再生数, 高評価数, コメント数)
+        bases:   {期間: 基準日以前で最新の (再生数, 高評価数, コメント数) または None}
+        """
+        if vtype not in VIDEO_TYPES or current is None or current[0] is None:
+            return
+        for w, base_date in self.bases.items():
+            base = bases.get(w)
+            if base is None and not (published and published[:10] > base_date):
+                continue
+            for i, metric in enumerate(VIDEO_METRICS):
+                value = current[i] or 0
+                gain = value - ((base[i] or 0) if base else 0)
+                _push(self.heaps[(w, vtype, metric)], self.k, (gain, value, talent, vid_id, title))
+
+    def add_records(self, talent, vid_id, meta, records):
+        """history_store.iter_video_records() の1動画分（記録は日付順）を渡す"""
+        current = None
+        bases = {}
+        for date, views, likes, comments in records:
+            if date == self.n_date:
+                current = (views, likes, comments)
+            for w, base_date in self.bases.items():
+                if date <= base_date:
+                    bases[w] = (views, likes, comments)
+        self.add(talent, vid_id, meta['ti'], meta['ty'], meta.get('pd'), current, bases)
+
+    def merge(self, other):
+        for key, heap in other.heaps.items():
+            for item in heap:
+                _push(self.heaps[key], self.k, item)
+        return self
+
+    def to_json(self):
+        result = {}
+        for (w, vtype, metric), heap in self.heaps.items():
+            result.setdefault(str(w), {}).setdefault(vtype, {})[metric] = [
+                {'t': t, 'id': vid_id, 'ti': title, 'n': value, 'd': gain}
+                for gain, value, t, vid_id, title in sorted(heap, reverse=True)
+            ]
+        return result
+
+def channel_rankings(channel_stats, n_date, windows=WINDOWS, k=TOP_K):
+    """
+    {期間: {subscribers, views: [{t, n, d}...]}}（summary の channel_stats から。
+    基準日以前の記録が無いタレントは載せない）
+    """
+    fields = {'subscribers': '登録者数', 'views': '総再生数'}
+    result = {}
+    for w, base_date in base_dates(n_date, windows).items():
+        heaps = {m: [] for m in CHANNEL_METRICS}
+        for talent, cs in channel_stats.items():
+            current = cs.get(n_date)
+            before = [d for d in cs if d <= base_date]
+            if current is None or not before:
+                continue
+            base = cs[max(before)]
+            for metric in CHANNEL_METRICS:
+                value = current.get(fields[metric]) or 0
+                _push(heaps[metric], k, (value - (base.get(fields[metric]) or 0), value, talent))
+        result[str(w)] = {
+            metric: [{'t': t, 'n': value, 'd': gain} for gain, value, t in sorted(heap, reverse=True)]
+            for metric, heap in heaps.items()
+        }
+    return result
+
+def build_rankings(n_date, channel_stats, videos, windows=WINDOWS, k=TOP_K):
+    """summary の rankings（videos は VideoRankings）"""
+    return {
+        'k': k,
+        'windows': list(windows),
+        'base': {str(w): d for w, d in base_dates(n_date, windows).items()},
+        'videos': videos.to_json(),
+        'channels': channel_rankings(channel_stats, n_date, windows, k),
+    }
@@ -0,0 +1,273 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+YouTube API（と Short 判定の HEAD）呼び出しの流量制御
+
+auto_check.py の API 呼び出しはすべて RequestController.execute() を通す。
+
+- エンドポイントごとのトークンバケット（1秒あたりの送信数）。エラーの出方で速さを変える（AIMD）:
+    最初の 429・rateLimitExceeded までは速度を制限しない。429 を受けたらその時点の直近1秒の送信数の
+    半分から制限を始め、以降は 429 で半分、5xx で 3/4 に下げ、成功が続けば上限なく少しずつ上げる（+RATE_STEP）
+- リトライはジッター付き指数バックオフ（0 〜 base×2^n のランダム、Retry-After があればそれ以上）
+- 実行全体の期限（deadline）を共有し、期限を過ぎたら新しい呼び出しをしない。
+  待つと期限を越えるリトライは行わずに元のエラーを返す
+- エラーの分類:
+    quota      403 quotaExceeded / dailyLimitExceeded → 以降の呼び出しをすべて止める（リトライしない）
+    rate       429 / 403 rateLimitExceeded 等          → 速度を下げてリトライ
+    transient  5xx・404 playlistNotFound・通信エラー   → リトライ
+    fatal      それ以外（400・404 notFound など）      → そのまま返す
+
+止まった後の呼び出しは QuotaExhausted / DeadlineExceeded を送出する（API には送らない）。
+"""
+
+import json
+import time
+import collections
+import random
+import threading
+
+# エンドポイントごとの送信速度の上限（回/秒）。未記載のエンドポイントは 429 を受けるまで制限しない
+RATES = {}
+MIN_RATE = 0.5       # 下げるときの下限（回/秒）
+RATE_STEP = 0.5      # 成功1回ごとに上げる量（制限中のみ）
+
+MAX_RETRIES = 3
+BACKOFF_BASE = {'rate': 2.0, 'transient': 1.0, 'playlistNotFound': 5.0}   # 1回目の待ち時間の上限（秒）
+BACKOFF_MAX = 60.0
+
+QUOTA_REASONS = {'quotaExceeded', 'dailyLimitExceeded'}
+RATE_REASONS = {'rateLimitExceeded', 'userRateLimitExceeded'}
+TRANSIENT_STATUSES = {500, 502, 503, 504}
+
+class ApiStopped(Exception):
+    """流量制御により呼び出しを行わなかった"""
+
+class QuotaExhausted(ApiStopped):
+    pass
+
+class DeadlineExceeded(ApiStopped):
+    pass
+
+class HttpStatusError(Exception):
+    """HTTP ステータスだけを持つエラー（Short判定の HEAD など googleapiclient 以外の呼び出し用）"""
+
+    def __init__(self, status_code, retry_after=None):
+        super().__init__(f'HTTP {status_code}')
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+def error_reasons(error):
+    """HttpError のレスポンス本文から reason の一覧（'quotaExceeded' など）を取り出す"""
+    try:
+        data = json.loads(error.content.decode('utf-8'))
+        return {e.get('reason') for e in data['error'].get('errors', [])}
+    except Exception:
+        pass
+    details = getattr(error, 'error_details', None)
+    if isinstance(details, list):
+        return {d.get('reason') for d in details if isinstance(d, dict)}
+    return set()
+
+def classify_error(error):
+    """'quota' / 'rate' / 'transient' / 'playlistNotFound' / 'fatal' のいずれか"""
+    status = getattr(error, 'status_code', None)
+    if status is None:
+        # googleapiclient・requests の通信エラー（タイムアウト・接続断）は OSError の派生
+        return 'transient' if isinstance(error, OSError) else 'fatal'
+    reasons = error_reasons(error) if hasattr(error, 'content') else set()
+    if status == 429 or reasons & RATE_REASONS:
+        return 'rate'
+    if status == 403 and reasons & QUOTA_REASONS:
+        return 'quota'
+    if status in TRANSIENT_STATUSES:
+        return 'transient'
+    if status == 404 and 'playlistNotFound' in reasons:
+        # 公開直後などに一時的に返ることがある
+        return 'playlistNotFound'
+    return 'fatal'
+
+def retry_after(error):
+    """Retry-After ヘッダー（秒）。無ければ None"""
+    value = getattr(error, 'retry_after', None)
+    if value is None:
+        resp = getattr(error, 'resp', None)
+        value = resp.get('retry-after') if hasattr(resp, 'get') else None
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+class TokenBucket:
+    """
+    1秒あたり rate 回・最大 rate 回分まで貯められるトークンバケット。rate は実行中に変わる。
+    rate が None の間（429 を受けるまで）は待たせずに、直近1秒の送信時刻だけを記録する
+    """
+
+    def __init__(self, rate=None):
+        self.rate = rate
+        self.tokens = rate or 0.0
+        self.updated = time.monotonic()
+        self.recent = collections.deque()   # 制限前の直近1秒の送信時刻
+        self._lock = threading.Lock()
+
+    def reserve(self):
+        """トークンを1つ取り、送信してよいまでの待ち時間（秒）を返す"""
+        with self._lock:
+            now = time.monotonic()
+            if self.rate is None:
+                self.recent.append(now)
+                while self.recent[0] < now - 1.0:
+                    self.recent.popleft()
+                return 0.0
+            self.tokens = min(self.rate, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1
+            return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+    def succeeded(self):
+        with self._lock:
+            if self.rate is not None:
+                self.rate += RATE_STEP
+
+    def throttled(self, factor, rate_limited):
+        """
+        エラーを受けて速度を factor 倍にする。制限前は 429・rateLimitExceeded（rate_limited）のときだけ、
+        直近1秒の送信数を基準に制限を始める（5xx は速度と無関係なことが多いので制限を始めない）
+        """
+        with self._lock:
+            if self.rate is None:
+                if not rate_limited:
+                    return
+                self.rate = len(self.recent) or MIN_RATE
+                self.tokens = 0.0
+                self.updated = time.monotonic()
+            self.rate = max(MIN_RATE, self.rate * factor)
+
+class RequestController:
+    """
+    API呼び出しの送信速度・リトライ・実行期限をまとめて管理する（スレッドセーフ）。
+    on_call(endpoint, 秒, error) / on_retry(endpoint) で1回ごとの結果を通知する（実行メトリクス用）。
+    """
+
+    def __init__(self, rates=None, max_retries=MAX_RETRIES, on_call=None, on_retry=None, seed=None):
+        self.rates = dict(RATES, **(rates or {}))
+        self.max_retries = max_retries
+        self.on_call = on_call
+        self.on_retry = on_retry
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.start()
+
+    def start(self, deadline_sec=None):
+        """新しい実行を始める（バケット・停止状態を初期化し、deadline_sec 秒後を期限にする）"""
+        with self._lock:
+            self.buckets = {}
+            self.deadline = time.monotonic() + deadline_sec if deadline_sec else None
+            self.stop_reason = None
+            self.errors = {}    # 分類 → 回数
+
+    # ---- 状態 ----
+
+    @property
+    def stopped(self):
+        """新しい呼び出しを止めているか（クォータ切れ・期限切れ）"""
+        return self._check_stop() is not None
+
+    def remaining(self):
+        """期限までの残り秒数（期限なしなら None）"""
+        return None if self.deadline is None else self.deadline - time.monotonic()
+
+    def _check_stop(self):
+        with self._lock:
+            if self.stop_reason is None and self.deadline is not None and time.monotonic() >= self.deadline:
+                self.stop_reason = 'deadline'
+                print('⚠️  実行期限に達しました。新しいAPI呼び出しを停止します')
+            return self.stop_reason
+
+    def _stop(self, reason):
+        with self._lock:
+            if self.stop_reason is not None:
+                return
+            self.stop_reason = reason
+        print('❌ APIクォータ切れ（quotaExceeded）。新しいAPI呼び出しを停止します')
+
+    def _bucket(self, endpoint):
+        with self._lock:
+            bucket = self.buckets.get(endpoint)
+            if bucket is None:
+                bucket = self.buckets[endpoint] = TokenBucket(self.rates.get(endpoint))
+            return bucket
+
+    # ---- 呼び出し ----
+
+    def execute(self, endpoint, fn, retries=None):
+        """
+        fn() をエンドポイントの速度に合わせて実行し、一時的なエラーはバックオフしてリトライする。
+        止まっている場合は API に送らずに ApiStopped を送出する。
+        """
+        retries = self.max_retries if retries is None else retries
+        bucket = self._bucket(endpoint)
+        for attempt in range(retries + 1):
+            self._raise_if_stopped()
+            self.sleep(bucket.reserve())
+            self._raise_if_stopped()
+            start = time.perf_counter()
+            try:
+                result = fn()
+            except Exception as e:
+                if self.on_call:
+                    self.on_call(endpoint, time.perf_counter() - start, True)
+                kind = classify_error(e)
+                with self._lock:
+                    self.errors[kind] = self.errors.get(kind, 0) + 1
+                if kind == 'quota':
+                    self._stop('quota')
+                    raise
+                if kind == 'fatal' or attempt >= retries:
+                    raise
+                bucket.throttled(0.5 if kind == 'rate' else 0.75, kind == 'rate')
+                wait = self.backoff(kind, attempt, retry_after(e))
+                remaining = self.remaining()
+                if remaining is not None and wait >= remaining:
+                    raise
+                if self.on_retry:
+                    self.on_retry(endpoint)
+                print(f'  ⚠️  {endpoint} {getattr(e, "status_code", type(e).__name__)}エラー、'
+                      f'{wait:.1f}秒後にリトライ ({attempt + 1}/{retries})')
+                self.sleep(wait)
+                continue
+            if self.on_call:
+                self.on_call(endpoint, time.perf_counter() - start, False)
+            bucket.succeeded()
+            return result
+
+    def _raise_if_stopped(self):
+        reason = self._check_stop()
+        if reason == 'quota':
+            raise QuotaExhausted('APIクォータ切れのため呼び出しを停止中')
+        if reason == 'deadline':
+            raise DeadlineExceeded('実行期限を過ぎたため呼び出しを停止中')
+
+    def backoff(self, kind, attempt, at_least=None):
+        """ジッター付き指数バックオフの待ち時間（0 〜 base×2^attempt、BACKOFF_MAX まで）"""
+        cap = min(BACKOFF_MAX, BACKOFF_BASE.get(kind, 1.0) * 2 ** attempt)
+        with self._lock:
+            wait = self._random.uniform(0, cap)
+        return max(wait, min(at_least, BACKOFF_MAX)) if at_least else wait
+
+    def sleep(self, seconds):
+        """期限を越えない範囲で待つ"""
+        remaining = self.remaining()
+        if remaining is not None:
+            seconds = min(seconds, max(0.0, remaining))
+        if seconds > 0:
+            time.sleep(seconds)
+
+    def report(self):
+        """実行メトリクス用: 停止理由・エラー分類ごとの回数・終了時の送信速度"""
+        with self._lock:
+            return {
+                'stopped': self.stop_reason,
+                'errors': dict(sorted(self.errors.items())),
+                'rates': {name: round(b.rate, 2) for name, b in sorted(self.buckets.items()) if b.rate is not None},
+            }
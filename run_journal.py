@@ -0,0 +1,98 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+実行の途中経過（チャンネルごとの完了段階）の記録 run_journal.jsonl
+
+夜間の auto_check.py が途中で止まっても（タイムアウト・ランナーの中断・クォータ切れ）、
+同じ日（today_str）に再実行すれば完了済みの段階を飛ばして続きから処理する。
+
+    {"date": "2026-10-17", "channel": "MEMESIA", "stage": "stats", "data": {...}}
+
+段階（この順に進む）:
+    stats       チャンネルID・チャンネル統計・アップロード再生リストID
+    video_list  動画ID一覧（full_sweep / 前回の全件取得日）
+    shorts      新規動画のShort判定 {動画ID: bool}
+    videos      タイプ判定・グリッチ修正済みの動画リストの動画ID（内容は履歴に書くので記録しない）
+    history     履歴（ジャーナル・シャード）の書き込み完了
+
+- ワークフローは失敗した実行でもこのファイルをコミットするので、動画の内容（タイトル・再生数など）は書かない。
+  履歴まで書き込み済みなら動画リストは履歴の今日の分から戻し、そうでなければ動画詳細から取得し直す
+- 1段階1行の追記のみ。日付の違う行は読み飛ばし、今日の最初の書き込みでファイルを作り直す
+- 全チャンネル成功で実行が終わったら clear() で消す（再開するものが無いため）
+"""
+
+import os
+import json
+import threading
+
+RUN_JOURNAL_FILE = 'run_journal.jsonl'
+STAGES = ('stats', 'video_list', 'shorts', 'videos', 'history')
+
+class RunJournal:
+    """
+    チャンネル → {段階: データ} を今日の分だけ保持する。open() するまでは何も記録しない。
+    複数スレッドから record() してよい。
+    """
+
+    def __init__(self, path=RUN_JOURNAL_FILE):
+        self.path = path
+        self.today_str = None
+        self._stages = {}
+        self._stale = False   # 別の日の行が残っている（今日の最初の書き込みで作り直す）
+        self._lock = threading.Lock()
+
+    def open(self, today_str, fresh=False):
+        """today_str の記録を読み込む。fresh=True なら読み込まずに作り直す"""
+        self.today_str = today_str
+        self._stages = {}
+        self._stale = False
+        if not os.path.exists(self.path):
+            return self
+        if fresh:
+            self._stale = True
+            return self
+        with open(self.path, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue   # 書き込み途中で止まった行
+                if entry.get('date') != today_str:
+                    self._stale = True
+                    continue
+                self._stages.setdefault(entry['channel'], {})[entry['stage']] = entry.get('data')
+        return self
+
+    def get(self, channel, stage):
+        """記録済みならその段階のデータ、未完了なら None"""
+        return self._stages.get(channel, {}).get(stage)
+
+    def done(self, channel, stage):
+        return stage in self._stages.get(channel, {})
+
+    def channels(self):
+        """今日の記録があるチャンネル名"""
+        return list(self._stages)
+
+    def record(self, channel, stage, data=None):
+        """段階の完了を1行追記する"""
+        if self.today_str is None:
+            return
+        line = json.dumps({'date': self.today_str, 'channel': channel, 'stage': stage, 'data': data},
+                          ensure_ascii=False, separators=(',', ':'))
+        with self._lock:
+            mode = 'w' if self._stale else 'a'
+            with open(self.path, mode, encoding='utf-8') as f:
+                f.write(line + '\n')
+                f.flush()
+                os.fsync(f.fileno())
+            self._stale = False
+            self._stages.setdefault(channel, {})[stage] = data
+
+    def clear(self):
+        """記録を消す（全チャンネル完了後）"""
+        with self._lock:
+            self._stages = {}
+            self._stale = False
+            if os.path.exists(self.path):
+                os.remove(self.path)
@@ -0,0 +1,263 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+実行メトリクス（API使用量・レイテンシ・段階ごとの所要時間）の計測モジュール
+
+auto_check.py の1回の実行について以下を集計し、run_metrics.json に追記する
+（直近 keep 回分を保持するローリング履歴。新しい実行が末尾）。
+
+    {
+      "runs": [
+        {
+          "started_at": "2026-10-17T00:00:05+09:00", "engine": "thread",
+          "duration_sec": 412.3, "success": 23, "failed": [],
+          "quota": {"total": 812, "by_endpoint": {"videos.list": 760, ...}},
+          "calls": {
+            "videos.list": {"count": 760, "errors": 2, "retries": 2,
+                            "latency_ms": {"p50": 210, "p95": 540, "max": 1800,
+                                           "hist": {"<=100": 3, "<=200": 350, ...}}}
+          },
+          "requests": {"stopped": null, "errors": {"transient": 2},   # 流量制御（request_control.py）
+                       "rates": {"videos.list": 10.0, ...}},          # 429 で制限を始めたエンドポイントのみ
+          "stages": {"paging": 35.2, "videos": 120.4, ...},    # 全チャンネル合計（秒）
+          "channels": {"MEMESIA": {"total": 18.2, "stages": {"paging": 1.2, ...}}}
+        }
+      ]
+    }
+
+段階（stage）:
+    id_lookup, stats, paging, videos, shorts, glitch,
+    save_snapshot, save_history, summary, series, analytics, publish
+
+メトリクスの表示:
+    python run_metrics.py            # 直近の実行
+    python run_metrics.py --runs 7   # 直近7回の推移
+"""
+
+import os
+import sys
+import json
+import time
+import bisect
+import inspect
+import threading
+import functools
+import contextlib
+import contextvars
+from datetime import datetime, timezone, timedelta
+
+METRICS_FILE = 'run_metrics.json'
+METRICS_KEEP_RUNS = 90
+
+# YouTube Data API v3 のクォータ消費（1リクエストあたり）。未記載は 1
+QUOTA_COSTS = {
+    'search.list': 100,
+    'batch': 0,        # バッチ自体は消費なし（中の各リクエストが消費）
+    'shorts.head': 0,  # youtube.com へのアクセス（API外）
+}
+
+LATENCY_BUCKETS_MS = (50, 100, 200, 500, 1000, 2000, 5000)
+
+# 現在処理中のチャンネル（スレッド・コルーチンごと）
+_current_channel = contextvars.ContextVar('current_channel', default=None)
+
+def endpoint_name(request):
+    """googleapiclient の HttpRequest から 'videos.list' 形式の名前を得る"""
+    method_id = getattr(request, 'methodId', None) or ''
+    return method_id.split('.', 1)[-1] if method_id else 'unknown'
+
+class _CallStats:
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.retries = 0
+        self.latencies = []
+
+    def report(self):
+        lat = sorted(self.latencies)
+        hist = {}
+        for bound in LATENCY_BUCKETS_MS:
+            hist[f'<={bound}'] = 0
+        hist[f'>{LATENCY_BUCKETS_MS[-1]}'] = 0
+        for ms in lat:
+            i = bisect.bisect_left(LATENCY_BUCKETS_MS, ms)
+            key = f'<={LATENCY_BUCKETS_MS[i]}' if i < len(LATENCY_BUCKETS_MS) else f'>{LATENCY_BUCKETS_MS[-1]}'
+            hist[key] += 1
+        return {
+            'count': self.count,
+            'errors': self.errors,
+            'retries': self.retries,
+            'latency_ms': {
+                'p50': _percentile(lat, 0.50),
+                'p95': _percentile(lat, 0.95),
+                'max': round(lat[-1]) if lat else None,
+                'hist': hist,
+            },
+        }
+
+def _percentile(sorted_values, q):
+    if not sorted_values:
+        return None
+    return round(sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * q))])
+
+class RunMetrics:
+    """1回の実行分のメトリクス（スレッドセーフ）"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.started = time.perf_counter()
+            self.started_at = datetime.now(timezone(timedelta(hours=9))).isoformat(timespec='seconds')
+            self.calls = {}
+            self.quota = {}
+            self.stages = {}
+            self.channels = {}
+
+    # ---- API呼び出し ----
+
+    def record_call(self, endpoint, seconds=None, error=False):
+        """1リクエスト分を記録（seconds=None ならレイテンシは記録しない。バッチ内の個別リクエストなど）"""
+        with self._lock:
+            stats = self.calls.setdefault(endpoint, _CallStats())
+            stats.count += 1
+            if error:
+                stats.errors += 1
+            if seconds is not None:
+                stats.latencies.append(seconds * 1000)
+            self.quota[endpoint] = self.quota.get(endpoint, 0) + QUOTA_COSTS.get(endpoint, 1)
+
+    def record_retry(self, endpoint):
+        with self._lock:
+            self.calls.setdefault(endpoint, _CallStats()).retries += 1
+
+    # ---- 所要時間 ----
+
+    @contextlib.contextmanager
+    def channel(self, channel_name):
+        """このブロック内の処理を channel_name の分として計測する"""
+        token = _current_channel.set(channel_name)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            _current_channel.reset(token)
+            with self._lock:
+                entry = self.channels.setdefault(channel_name, {'total': 0.0, 'stages': {}})
+                entry['total'] += elapsed
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._add_stage(name, time.perf_counter() - start)
+
+    def _add_stage(self, name, elapsed):
+        channel_name = _current_channel.get()
+        with self._lock:
+            self.stages[name] = self.stages.get(name, 0.0) + elapsed
+            if channel_name is not None:
+                entry = self.channels.setdefault(channel_name, {'total': 0.0, 'stages': {}})
+                entry['stages'][name] = entry['stages'].get(name, 0.0) + elapsed
+
+    def timed(self, name):
+        """関数（コルーチン関数も可）の実行時間を段階 name として計測するデコレーター"""
+        def decorator(fn):
+            if inspect.iscoroutinefunction(fn):
+                @functools.wraps(fn)
+                async def async_wrapper(*args, **kwargs):
+                    with self.stage(name):
+                        return await fn(*args, **kwargs)
+                return async_wrapper
+
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                with self.stage(name):
+                    return fn(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    # ---- 出力 ----
+
+    def report(self, **extra):
+        with self._lock:
+            return {
+                'started_at': self.started_at,
+                **extra,
+                'duration_sec': round(time.perf_counter() - self.started, 1),
+                'quota': {
+                    'total': sum(self.quota.values()),
+                    'by_endpoint': dict(sorted(self.quota.items())),
+                },
+                'calls': {name: stats.report() for name, stats in sorted(self.calls.items())},
+                'stages': _rounded(self.stages),
+                'channels': {
+                    name: {'total': round(entry['total'], 2), 'stages': _rounded(entry['stages'])}
+                    for name, entry in sorted(self.channels.items())
+                },
+            }
+
+    def save(self, path=METRICS_FILE, keep=METRICS_KEEP_RUNS, **extra):
+        """今回の実行分を path のローリング履歴に追記し、今回分を返す"""
+        run = self.report(**extra)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                runs = json.load(f).get('runs', [])
+        except Exception:
+            runs = []
+        runs = (runs + [run])[-keep:]
+        tmp = f'{path}.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump({'runs': runs}, f, ensure_ascii=False, indent=1)
+        os.replace(tmp, path)
+        return run
+
+def _rounded(seconds_by_name):
+    return {k: round(v, 2) for k, v in sorted(seconds_by_name.items(), key=lambda kv: -kv[1])}
+
+def print_run(run, top=5):
+    """1回分のメトリクスを要約して表示"""
+    quota = run['quota']
+    print(f'  API使用量: {quota["total"]:,} units（'
+          + ' / '.join(f'{k} {v:,}' for k, v in quota['by_endpoint'].items() if v) + '）')
+    for name, stats in run['calls'].items():
+        lat = stats['latency_ms']
+        line = f'    {name}: {stats["count"]:,}回 エラー{stats["errors"]} リトライ{stats["retries"]}'
+        if lat['p50'] is not None:
+            line += f' / p50 {lat["p50"]}ms p95 {lat["p95"]}ms max {lat["max"]}ms'
+        print(line)
+    control = run.get('requests')
+    if control and (control['stopped'] or control['errors']):
+        print(f'  流量制御: 停止 {control["stopped"] or "なし"} / エラー分類 '
+              + (' / '.join(f'{k} {v}' for k, v in control['errors'].items()) or 'なし')
+              + ' / 終了時の速度 ' + (' / '.join(f'{k} {v}/秒' for k, v in control['rates'].items()) or '制限なし'))
+    stages = list(run['stages'].items())[:top]
+    if stages:
+        print('  段階別（全チャンネル合計）: ' + ' / '.join(f'{k} {v:.1f}秒' for k, v in stages))
+    channels = sorted(run['channels'].items(), key=lambda kv: -kv[1]['total'])[:top]
+    if channels:
+        print('  時間のかかったチャンネル: ' + ' / '.join(f'{k} {v["total"]:.1f}秒' for k, v in channels))
+
+if __name__ == '__main__':
+    import argparse
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--runs', type=int, default=1, help='表示する直近の実行数')
+    parser.add_argument('--file', default=METRICS_FILE)
+    args = parser.parse_args()
+
+    try:
+        with open(args.file, 'r', encoding='utf-8') as f:
+            runs = json.load(f).get('runs', [])
+    except FileNotFoundError:
+        print(f'❌ {args.file} がありません')
+        sys.exit(1)
+
+    for run in runs[-args.runs:]:
+        print(f'\n{run["started_at"]}  {run.get("duration_sec", 0):.0f}秒'
+              f'  成功 {run.get("success", "?")} / 失敗 {len(run.get("failed", []))}')
+        print_run(run)
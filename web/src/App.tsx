@@ -1,6 +1,9 @@
 import { useState, useEffect, useRef } from 'react'
-import { AllHistory, VideoFlags, ChannelComments, DashboardSummary } from './types'
-import { loadDashboardSummary, loadVideoFlags, loadTalentHistory, loadTalentComments, TALENT_ORDER } from './utils/data'
+import { AllHistory, VideoFlags, ChannelComments, DashboardSummary, TalentSeries } from './types'
+import {
+  loadDashboardSummary, loadVideoFlags, loadTalentHistory, loadTalentHistoryMonths, mergeTalentHistory,
+  loadTalentComments, loadTalentSeries, TALENT_ORDER,
+} from './utils/data'
 import DashboardPage from './components/DashboardPage'
 import TalentPage from './components/TalentPage'
 import Footer from './components/Footer'
@@ -16,9 +19,14 @@ export default function App() {
 
   const [talentCache, setTalentCache]     = useState<Record<string, AllHistory[string] | null>>({})
   const [commentsCache, setCommentsCache] = useState<Record<string, ChannelComments>>({})
+  const [seriesCache, setSeriesCache]     = useState<Record<string, TalentSeries | null>>({})
   const [talentLoading, setTalentLoading] = useState<Record<string, boolean>>({})
   const [talentError, setTalentError]     = useState<Record<string, string | null>>({})
   const inFlightRef = useRef<Set<string>>(new Set())
+  // 月別シャードのうち未取得の古い月（分析タブを開いたときに追加取得する）
+  const [olderMonths, setOlderMonths]       = useState<Record<string, string[]>>({})
+  const [olderLoading, setOlderLoading]     = useState<Record<string, boolean>>({})
+  const olderInFlightRef = useRef<Set<string>>(new Set())
 
   const [activePage, setActivePage] = useState<Page>('Dashboard')
   const [sidebarOpen, setSidebarOpen] = useState(false)
@@ -44,12 +52,16 @@ export default function App() {
     setTalentLoading(prev => ({ ...prev, [talent]: true }))
     setTalentError(prev => ({ ...prev, [talent]: null }))
     try {
-      const [h, c] = await Promise.all([loadTalentHistory(talent), loadTalentComments(talent)])
+      const [h, c, s] = await Promise.all([
+        loadTalentHistory(talent), loadTalentComments(talent), loadTalentSeries(talent),
+      ])
       if (h.failed) {
         setTalentError(prev => ({ ...prev, [talent]: 'データの取得に失敗しました' }))
       } else {
         setTalentCache(prev => ({ ...prev, [talent]: h.data }))
         setCommentsCache(prev => ({ ...prev, [talent]: c }))
+        setSeriesCache(prev => ({ ...prev, [talent]: s }))
+        setOlderMonths(prev => ({ ...prev, [talent]: h.olderMonths }))
       }
     } finally {
       inFlightRef.current.delete(talent)
@@ -57,6 +69,27 @@ export default function App() {
     }
   }
 
+  async function ensureTalentFullHistory(talent: string) {
+    const months = olderMonths[talent] ?? []
+    if (months.length === 0 || olderInFlightRef.current.has(talent)) return
+    olderInFlightRef.current.add(talent)
+    setOlderLoading(prev => ({ ...prev, [talent]: true }))
+    try {
+      const older = await loadTalentHistoryMonths(talent, months)
+      if (older.failed || !older.data) return
+      const olderData = older.data
+      // 既存（新しい月）を後からマージしてメタ情報は新しい方を優先する
+      setTalentCache(prev => ({
+        ...prev,
+        [talent]: prev[talent] ? mergeTalentHistory(olderData, prev[talent]!) : olderData,
+      }))
+      setOlderMonths(prev => ({ ...prev, [talent]: [] }))
+    } finally {
+      olderInFlightRef.current.delete(talent)
+      setOlderLoading(prev => ({ ...prev, [talent]: false }))
+    }
+  }
+
   function navigate(page: Page) {
     setActivePage(page)
     setSidebarOpen(false)
@@ -133,6 +166,10 @@ export default function App() {
                 talentName={activePage}
                 flags={flags}
                 comments={{ [activePage]: commentsCache[activePage] ?? {} }}
+                series={seriesCache[activePage] ?? null}
+                partialHistory={(olderMonths[activePage] ?? []).length > 0}
+                historyLoading={olderLoading[activePage] ?? false}
+                onNeedFullHistory={() => ensureTalentFullHistory(activePage)}
               />
             )
           )}
@@ -1,7 +1,7 @@
 import { useState, useRef, useEffect } from 'react'
 import Plot from 'react-plotly.js'
-import { DashboardSummary, SingerRankItem, VideoRankItem, VideoType, VideoFlags } from '../types'
-import { buildDashboardData, buildStatsData, buildDailyViewsByTalent, buildDashboardDailyViewsBreakdown, DailyViewsEntry } from '../utils/data'
+import { DashboardSummary, SingerRankItem, VideoRankItem, VideoType, VideoFlags, WindowRankItem } from '../types'
+import { buildDashboardData, buildWindowRankings, buildStatsData, buildDailyViewsByTalent, buildDashboardDailyViewsBreakdown, DailyViewsEntry } from '../utils/data'
 import { niceScale, fmtDiff, diffColor } from '../utils/chartUtils'
 
 interface Props {
@@ -86,6 +86,39 @@ function VideoTable({ rows, valKey, diffKey, rateKey, top = 20 }: {
   )
 }
 
+// 期間別ランキング（サマリーに上位のみ収録済み・並べ替え済み）
+function WindowTable({ rows, top = 20 }: { rows: WindowRankItem[]; top?: number }) {
+  return (
+    <table className="rank-table">
+      <tbody>
+        {rows.slice(0, top).map((r, i) => (
+          <tr key={r.vid_id ?? r.talent} className={i % 2 === 0 ? 'row-even' : ''}>
+            <td className="rank-no">{i + 1}.</td>
+            <td className="rank-name">
+              {r.vid_id ? (
+                <>
+                  <span className="rank-talent">{r.talent}</span>
+                  <a
+                    href={`https://www.youtube.com/watch?v=${r.vid_id}`}
+                    target="_blank" rel="noopener noreferrer"
+                    title={r.title}
+                  >
+                    {r.title && r.title.length > 22 ? r.title.slice(0, 22) + '…' : r.title}
+                  </a>
+                </>
+              ) : r.talent}
+            </td>
+            <td className="rank-val">{r.value.toLocaleString()}</td>
+            <td className="rank-diff" style={{ color: diffColor(r.diff) }}>
+              {fmtDiff(r.diff, r.rate)}
+            </td>
+          </tr>
+        ))}
+      </tbody>
+    </table>
+  )
+}
+
 type StatsPoint = { date: string; subs: number; views: number }
 
 function fmtY(v: number): string {
@@ -450,9 +483,39 @@ const VIDEO_SECTIONS: { type: VideoType; label: string }[] = [
   { type: 'LiveArchive', label: 'ライブ部門' },
 ]
 
+// ランキングの集計期間（日）。1 は前日比（summary の videos から全件を集計）、それ以外は rankings の上位のみ
+const RANKING_WINDOWS: { days: number; label: string }[] = [
+  { days: 1,  label: '前日比' },
+  { days: 7,  label: '7日間' },
+  { days: 30, label: '30日間' },
+]
+
+function RankingWindowTabs({ options, value, onChange }: {
+  options: { days: number; label: string }[]
+  value: number
+  onChange: (days: number) => void
+}) {
+  return (
+    <div className="tabs">
+      {options.map(w => (
+        <button
+          key={w.days}
+          className={`type-tab-btn${value === w.days ? ' active' : ''}`}
+          onClick={() => onChange(w.days)}
+        >
+          {w.label}
+        </button>
+      ))}
+    </div>
+  )
+}
+
 export default function DashboardPage({ summary, flags }: Props) {
   const [view, setView] = useState<'ranking' | 'stats'>('ranking')
+  const [windowDays, setWindowDays] = useState(1)
   const data = buildDashboardData(summary, flags)
+  const windowData = windowDays === 1 ? null : buildWindowRankings(summary, windowDays)
+  const windowOptions = RANKING_WINDOWS.filter(w => w.days === 1 || summary.rankings?.windows.includes(w.days))
   const statsPoints = buildStatsData(summary)
   const dailyViewsByTalent = buildDailyViewsByTalent(summary)
 
@@ -503,8 +566,54 @@ export default function DashboardPage({ summary, flags }: Props) {
         </div>
       ) : !data ? (
         <p className="muted">データがありません</p>
+      ) : windowData ? (
+        <>
+          <RankingWindowTabs options={windowOptions} value={windowDays} onChange={setWindowDays} />
+          <p className="date-label">集計基準日: {data.n_date}（{windowData.base} からの伸び）</p>
+
+          {/* Singer別 */}
+          <h3>Singer別</h3>
+          <div className="three-col">
+            <div>
+              <div className="col-label">登録者数</div>
+              <WindowTable rows={windowData.singerData.subscribers} />
+            </div>
+            <div>
+              <div className="col-label">総再生数</div>
+              <WindowTable rows={windowData.singerData.views} />
+            </div>
+          </div>
+
+          {/* 動画部門 */}
+          {VIDEO_SECTIONS.map(({ type, label }) => {
+            const rows = windowData.videoData[type]
+            if (!rows.views.length) return null
+            return (
+              <div key={type}>
+                <h3>{label}</h3>
+                <div className="three-col">
+                  <div>
+                    <div className="col-label">再生数</div>
+                    <WindowTable rows={rows.views} />
+                  </div>
+                  <div>
+                    <div className="col-label">高評価数</div>
+                    <WindowTable rows={rows.likes} />
+                  </div>
+                  <div>
+                    <div className="col-label">コメント数</div>
+                    <WindowTable rows={rows.comments} />
+                  </div>
+                </div>
+              </div>
+            )
+          })}
+        </>
       ) : (
         <>
+          {windowOptions.length > 1 && (
+            <RankingWindowTabs options={windowOptions} value={windowDays} onChange={setWindowDays} />
+          )}
           <p className="date-label">集計基準日: {data.n_date}（前日比）</p>
 
           {/* Singer別 */}
@@ -1,8 +1,8 @@
 import { useState, useRef, useEffect } from 'react'
-import { VideoCard, VideoType, VideoFlags, AllHistory, AllComments, VideoCommentData } from '../types'
+import { VideoCard, VideoType, VideoFlags, AllHistory, AllComments, VideoCommentData, TalentSeries } from '../types'
 import {
   getLatestChannelStats, buildTalentVideoList,
-  buildPostingCalendar, buildVelocityCurveData, buildDailyViewsBreakdown,
+  buildPostingCalendar, buildVelocityCurveData, buildVelocityCurveDataFromSeries, buildDailyViewsBreakdown,
   buildMonthlyViewsBreakdown,
   PostingCalendarEntry, VelocityCurveItem, DailyViewsEntry, MonthlyViewsEntry,
 } from '../utils/data'
@@ -13,6 +13,10 @@ interface Props {
   talentName: string
   flags: VideoFlags
   comments: AllComments
+  series?: TalentSeries | null   // グラフ用に間引いた動画別推移（無ければ履歴から組み立てる）
+  partialHistory?: boolean       // 直近の月別シャードのみ取得済み（古い月は未取得）
+  historyLoading?: boolean       // 古い月を追加取得中
+  onNeedFullHistory?: () => void // 全期間が必要になったときに呼ぶ（分析タブ）
 }
 
 type SortKey = '再生数' | '高評価数' | 'コメント数' | '再生数15d増加' | '高評価15d増加' | 'キリ番到達日'
@@ -755,13 +759,16 @@ function MonthlyViewsChart({ data }: { data: MonthlyViewsEntry[] }) {
 // 分析タブ
 // ----------------------------------------------------------------
 
-function AnalysisTab({ history, talentName, flags }: {
+function AnalysisTab({ history, talentName, flags, series }: {
   history: AllHistory
   talentName: string
   flags: VideoFlags
+  series: TalentSeries | null
 }) {
   const calendarData      = buildPostingCalendar(history, talentName, flags)
-  const velocityItems     = buildVelocityCurveData(history, talentName, flags)
+  const velocityItems     = series
+    ? buildVelocityCurveDataFromSeries(series, talentName, flags)
+    : buildVelocityCurveData(history, talentName, flags)
   const dailyViewsData    = buildDailyViewsBreakdown(history, talentName, flags, 15)
   const monthlyViewsData  = buildMonthlyViewsBreakdown(history, talentName, flags)
 
@@ -819,7 +826,9 @@ function AnalysisTab({ history, talentName, flags }: {
 // メインコンポーネント
 // ----------------------------------------------------------------
 
-export default function TalentPage({ history, talentName, flags, comments }: Props) {
+export default function TalentPage({
+  history, talentName, flags, comments, series = null, partialHistory = false, historyLoading = false, onNeedFullHistory,
+}: Props) {
   const { stats, diff } = getLatestChannelStats(history, talentName)
   const allVideos = buildTalentVideoList(history, talentName, flags)
 
@@ -839,6 +848,11 @@ export default function TalentPage({ history, talentName, flags, comments }: Pro
 
   const talentComments = comments[talentName] ?? {}
 
+  // 月別・年別の集計は全期間が必要なので、分析タブを開いたときに古い月を追加取得する
+  useEffect(() => {
+    if (activeType === '分析' && partialHistory) onNeedFullHistory?.()
+  }, [activeType, partialHistory])
+
   function fmtStatDiff(v: number | null) {
     if (v === null) return null
     const sign = v >= 0 ? '+' : ''
@@ -892,7 +906,14 @@ export default function TalentPage({ history, talentName, flags, comments }: Pro
           </div>
 
           {activeType === '分析' ? (
-            <AnalysisTab history={history} talentName={talentName} flags={flags} />
+            <>
+              {partialHistory && (
+                <p className="muted" style={{ marginTop: 8 }}>
+                  {historyLoading ? '過去の履歴を読み込み中...' : '直近の履歴のみ表示しています。'}
+                </p>
+              )}
+              <AnalysisTab key={partialHistory ? 'recent' : 'all'} history={history} talentName={talentName} flags={flags} series={series} />
+            </>
           ) : (
             <>
               {/* ソート＋コラボフィルター */}
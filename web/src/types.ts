@@ -29,6 +29,125 @@ export interface AllHistory {
   [talentName: string]: TalentHistory
 }
 
+// ----------------------------------------------------------------
+// history_{talent}.json の列指向コンパクト形式（auto_check.py / history_store.py が生成）
+// ----------------------------------------------------------------
+
+export interface CompactVideoHistory {
+  ti: string                  // タイトル
+  pd: string                  // 公開日
+  ty: VideoType
+  du: number                  // duration（秒）
+  o: number                   // 先頭レコードの dates インデックス
+  // version 3 では直前と同じ値の連続が負の数 -k（直前の値が更に k 日続く）にまとめられている
+  v: (number | null)[]        // 再生数（dates[o] から）
+  l: (number | null)[]        // 高評価数
+  c: (number | null)[]        // コメント数
+}
+
+export interface CompactTalentHistory {
+  format: 'rkpfr-history'
+  version: number
+  talent: string
+  dates: string[]
+  cs: {
+    s: (number | null)[]      // 登録者数
+    v: (number | null)[]      // 総再生数
+    n: (number | null)[]      // 動画数
+  }
+  videos: Record<string, CompactVideoHistory>
+}
+
+// history_{talent}.journal.jsonl の1行（未畳み込みの日次差分）
+export interface HistoryJournalEntry {
+  date: string
+  cs?: [number, number, number]                       // [登録者数, 総再生数, 動画数]
+  r: Record<string, [number, number, number]>         // [再生数, 高評価数, コメント数]
+  ff?: boolean                // true = r は前日から値の変わった動画のみ（他は前日の値のまま）
+  x?: string[]                // ff の行で、前日に記録があって当日は取得されなかった動画
+  m?: Record<string, Partial<Pick<CompactVideoHistory, 'ti' | 'pd' | 'ty' | 'du'>>>
+}
+
+// history/{talent}/manifest.json（月別シャードの一覧。history_shards.py が生成）
+export interface HistoryShardInfo {
+  month: string               // "2026-10"
+  file: string                // "2026-10.json"（manifest と同じディレクトリ）
+  first: string | null        // シャード内の最初の日付
+  last: string | null         // シャード内の最後の日付
+  videos: number
+  bytes: number
+}
+
+export interface HistoryManifest {
+  talent: string
+  shards: HistoryShardInfo[]
+}
+
+// series_{talent}.json（グラフ用に間引いた動画別の再生数推移。history_series.py が生成）
+export interface VideoSeries {
+  ti: string
+  pd: string
+  ty: VideoType
+  d: number[]                 // base からの日数（差分符号化）
+  v: number[]                 // 再生数（差分符号化）
+}
+
+export interface TalentSeries {
+  format: 'rkpfr-series'
+  version: number
+  talent: string
+  base: string | null         // 日数オフセットの起点
+  last: string | null
+  videos: Record<string, VideoSeries>
+}
+
+// analytics_{talent}.json（動画別の伸びの指標。history_analytics.py が生成）
+export interface VideoAnalytics {
+  ti: string
+  pd: string
+  ty: VideoType
+  v: number
+  l: number | null
+  c: number | null
+  dv: (number | null)[]       // dates の日別の再生数の増分
+  dl: (number | null)[]
+  dc: (number | null)[]
+  a7: number | null           // 7日移動平均（1日あたりの再生数の伸び）
+  a28: number | null
+  g7: number | null           // 7日間の伸び率（0.05 = +5%）
+  g28: number | null
+  k: number                   // 1日あたりの伸びの減衰率
+  f7: number                  // 7日後の再生数の予測
+  f30: number
+  m: number | null            // 次の節目の再生数
+  eta: string | null          // 節目への到達予測日
+}
+
+export interface TalentAnalytics {
+  format: 'rkpfr-analytics'
+  version: number
+  talent: string
+  date: string | null
+  dates: string[]
+  total: { dv: (number | null)[]; a7: number; a28: number; f7: number; f30: number }
+  videos: Record<string, VideoAnalytics>
+}
+
+// data_manifest.json（Web公開用の論理名 → 内容ハッシュ付きファイル。publish_data.py が生成）
+export interface DataManifestEntry {
+  path: string                // "data/dashboard_summary.3f9a1c2b7d4e.json"
+  hash: string
+  bytes: number
+  gz?: number                 // publish_data.PRECOMPRESS の場合のみ
+  br?: number
+}
+
+export interface DataManifest {
+  version: number
+  generated_at: string
+  files: Record<string, DataManifestEntry>
+}
+
 export interface SingerRankItem {
   talent: string
   subs_n: number
@@ -61,6 +180,16 @@ export interface VideoRankItem {
   comments_diff: number | null
 }
 
+// 期間別ランキングの1行（DashboardRankings から。vid_id・title は動画のみ）
+export interface WindowRankItem {
+  talent: string
+  vid_id?: string
+  title?: string
+  value: number
+  diff: number
+  rate: number | null
+}
+
 export interface VideoCard {
   id: string
   タイトル: string
@@ -122,6 +251,32 @@ export interface DailyTypeBreakdownEntry {
   LiveArchive: number
 }
 
+// 期間別ランキング（auto_check.py / rankings.py）。期間の伸び d の大きい上位 k 件のみ
+export type RankingVideoMetric = 'views' | 'likes' | 'comments'
+export type RankingChannelMetric = 'subscribers' | 'views'
+
+export interface RankingVideoEntry {
+  t: string       // talent
+  id: string      // vid_id
+  ti: string      // タイトル
+  n: number       // n_date の値
+  d: number       // 期間の伸び（基準日以前の最新の記録との差。期間中の新作は n と同じ）
+}
+
+export interface RankingChannelEntry {
+  t: string
+  n: number
+  d: number
+}
+
+export interface DashboardRankings {
+  k: number
+  windows: number[]
+  base: Record<string, string>  // 期間（日数）→ 基準日
+  videos: Record<string, Record<VideoType, Record<RankingVideoMetric, RankingVideoEntry[]>>>
+  channels: Record<string, Record<RankingChannelMetric, RankingChannelEntry[]>>
+}
+
 export interface DashboardSummary {
   generated_at: string
   n_date: string
@@ -129,4 +284,5 @@ export interface DashboardSummary {
   channel_stats: Record<string, Record<string, ChannelStats>>
   daily_type_breakdown: DailyTypeBreakdownEntry[]
   videos: DashboardVideoSnapshot[]
+  rankings?: DashboardRankings  // 導入前のサマリーには無い
 }
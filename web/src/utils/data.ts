@@ -1,8 +1,10 @@
 import {
-  AllHistory, TalentHistory, ChannelStats, VideoType, VideoFlags,
-  SingerRankItem, VideoRankItem, VideoCard,
+  AllHistory, TalentHistory, CompactTalentHistory, HistoryJournalEntry, VideoHistoryEntry, HistoryManifest,
+  TalentSeries, TalentAnalytics, DataManifest,
+  ChannelStats, VideoType, VideoFlags,
+  SingerRankItem, VideoRankItem, VideoCard, VideoRecord,
   ChannelComments,
-  DashboardSummary,
+  DashboardSummary, RankingVideoMetric, WindowRankItem,
 } from '../types'
 
 export const TALENT_ORDER = [
@@ -17,8 +19,8 @@ const HISTORY_BASE_URL =
   import.meta.env.VITE_HISTORY_BASE_URL ??
   'https://raw.githubusercontent.com/Kinshutei/RKMusic_AllSinger_PFR/main'
 
-const FLAGS_URL = `${HISTORY_BASE_URL}/video_flags.json`
-const SUMMARY_URL = `${HISTORY_BASE_URL}/dashboard_summary.json`
+const DATA_MANIFEST_URL = `${HISTORY_BASE_URL}/data_manifest.json`
+const DATA_CACHE_NAME = 'rkpfr-data'
 
 const FETCH_RETRIES = 3
 const FETCH_RETRY_DELAY_MS = 1000
@@ -29,10 +31,16 @@ interface FetchResult<T> {
 }
 
 async function fetchJsonWithRetry<T>(url: string): Promise<FetchResult<T>> {
+  return fetchWithRetry(url, async res => await res.json() as T)
+}
+
+async function fetchWithRetry<T>(
+  url: string, parse: (res: Response) => Promise<T>, init?: RequestInit
+): Promise<FetchResult<T>> {
   for (let attempt = 0; attempt <= FETCH_RETRIES; attempt++) {
     try {
-      const res = await fetch(url)
-      if (res.ok) return { data: await res.json() as T, failed: false }
+      const res = await fetch(url, init)
+      if (res.ok) return { data: await parse(res), failed: false }
       if (res.status === 404) return { data: null, failed: false }
     } catch {
       // ネットワークエラーはリトライへ
@@ -44,28 +52,278 @@ async function fetchJsonWithRetry<T>(url: string): Promise<FetchResult<T>> {
   return { data: null, failed: true }
 }
 
+// ----------------------------------------------------------------
+// 公開データ（data_manifest.json 経由）
+// ----------------------------------------------------------------
+
+// 論理名（'history/MEMESIA/2026-10.json' など）の各セグメントをエンコードしてURLにする。
+function dataUrl(path: string): string {
+  return `${HISTORY_BASE_URL}/${path.split('/').map(encodeURIComponent).join('/')}`
+}
+
+let dataManifestPromise: Promise<DataManifest | null> | null = null
+let dataCachePromise: Promise<Cache | null> | null = null
+
+// manifest は毎回サーバーに確認する（no-cache）。取得できなければ null（従来のファイル名で取得する）。
+function loadDataManifest(): Promise<DataManifest | null> {
+  if (!dataManifestPromise) {
+    dataManifestPromise = fetchWithRetry(
+      DATA_MANIFEST_URL, async res => await res.json() as DataManifest, { cache: 'no-cache' }
+    ).then(res => {
+      if (res.data) void pruneDataCache(res.data)
+      return res.data
+    })
+  }
+  return dataManifestPromise
+}
+
+function openDataCache(): Promise<Cache | null> {
+  if (!dataCachePromise) {
+    dataCachePromise = typeof caches === 'undefined'
+      ? Promise.resolve(null)
+      : caches.open(DATA_CACHE_NAME).catch(() => null)
+  }
+  return dataCachePromise
+}
+
+// 現在の manifest が参照しないハッシュ付きファイルをキャッシュから削除する。
+async function pruneDataCache(manifest: DataManifest) {
+  const cache = await openDataCache()
+  if (!cache) return
+  const current = new Set(
+    Object.values(manifest.files).map(e => new URL(dataUrl(e.path), location.href).href)
+  )
+  for (const req of await cache.keys()) {
+    if (!current.has(req.url)) await cache.delete(req)
+  }
+}
+
+// ハッシュ付きファイルは内容が変わらないので、Cache Storage にあればネットワークに出ない。
+async function fetchImmutableJson<T>(url: string): Promise<FetchResult<T>> {
+  const cache = await openDataCache()
+  const hit = await cache?.match(url).catch(() => undefined)
+  if (hit) return { data: await hit.json() as T, failed: false }
+  return fetchWithRetry(url, async res => {
+    if (cache) await cache.put(url, res.clone()).catch(() => undefined)
+    return await res.json() as T
+  })
+}
+
+// 論理名で公開データを取得する。manifest に無いファイルは不在として扱う（404と同じ）。
+// manifest 自体が無い（公開ステージ導入前）場合は従来どおり元のファイル名で取得する。
+async function fetchDataJson<T>(name: string): Promise<FetchResult<T>> {
+  const manifest = await loadDataManifest()
+  if (!manifest) return fetchJsonWithRetry<T>(dataUrl(name))
+  const entry = manifest.files[name]
+  if (!entry) return { data: null, failed: false }
+  return fetchImmutableJson<T>(dataUrl(entry.path))
+}
+
 // Dashboardは事前集約済みの軽量サマリー1件のみ取得する（全タレントのhistoryを都度取得しない）。
 export async function loadDashboardSummary(): Promise<DashboardSummary | null> {
-  return (await fetchJsonWithRetry<DashboardSummary>(SUMMARY_URL)).data
+  return (await fetchDataJson<DashboardSummary>('dashboard_summary.json')).data
 }
 
 export async function loadVideoFlags(): Promise<VideoFlags> {
-  return (await fetchJsonWithRetry<VideoFlags>(FLAGS_URL)).data ?? {}
+  return (await fetchDataJson<VideoFlags>('video_flags.json')).data ?? {}
+}
+
+// タレント個別ページで最初に取得する直近の月数（月別シャード）。
+// 動画一覧・直近15日の集計はこの範囲で足りる。全期間が必要な分析タブは残りを追加取得する。
+export const HISTORY_RECENT_MONTHS = 3
+
+export interface TalentHistoryResult {
+  data: TalentHistory | null
+  failed: boolean
+  olderMonths: string[] // まだ取得していない古い月（空なら全期間取得済み）
 }
 
 // タレント個別ページ表示時にのみ、そのタレント1人分だけ取得する（遅延読み込み）。
-export async function loadTalentHistory(talent: string): Promise<{ data: TalentHistory | null; failed: boolean }> {
-  const { data, failed } = await fetchJsonWithRetry<AllHistory>(
-    `${HISTORY_BASE_URL}/history_${encodeURIComponent(talent)}.json`
-  )
-  return { data: data?.[talent] ?? null, failed }
+// 月別シャードの manifest があれば直近 HISTORY_RECENT_MONTHS か月分のシャードだけを取得する。
+// manifest が無い（シャード導入前のデータ）場合は全期間の history_{talent}.json を取得する。
+export async function loadTalentHistory(talent: string): Promise<TalentHistoryResult> {
+  const manifest = await fetchDataJson<HistoryManifest>(`history/${talent}/manifest.json`)
+  if (manifest.failed) return { data: null, failed: true, olderMonths: [] }
+  if (!manifest.data) return { ...(await loadTalentHistoryFull(talent)), olderMonths: [] }
+
+  const months = manifest.data.shards.map(s => s.month).sort()
+  const recent = months.slice(-HISTORY_RECENT_MONTHS)
+  const { data, failed } = await loadTalentHistoryMonths(talent, recent)
+  return { data, failed, olderMonths: months.slice(0, months.length - recent.length) }
+}
+
+// 指定した月のシャードを並列に取得して1つの履歴にまとめる。
+export async function loadTalentHistoryMonths(
+  talent: string, months: string[]
+): Promise<{ data: TalentHistory | null; failed: boolean }> {
+  const shards = await Promise.all(months.map(month =>
+    fetchDataJson<CompactTalentHistory>(`history/${talent}/${month}.json`)
+  ))
+  const failed = shards.some(s => s.failed)
+  const parts = shards.flatMap(s => isCompactHistory(s.data) ? [expandCompactHistory(s.data)] : [])
+  if (parts.length === 0) return { data: null, failed }
+  return { data: parts.reduce(mergeTalentHistory, { _channel_stats: {} }), failed }
+}
+
+// b を a にマージして返す（a を書き換える）。レコードは日付ごとに合算、
+// タイトル・種別などのメタ情報は b（新しい月）を優先する。
+export function mergeTalentHistory(a: TalentHistory, b: TalentHistory): TalentHistory {
+  Object.assign(a._channel_stats, b._channel_stats)
+  for (const [vid_id, raw] of Object.entries(b)) {
+    if (vid_id === '_channel_stats') continue
+    const vid = raw as VideoHistoryEntry
+    const cur = a[vid_id] as VideoHistoryEntry | undefined
+    a[vid_id] = cur ? { ...vid, records: { ...cur.records, ...vid.records } } : vid
+  }
+  return a
+}
+
+// 全期間の history_{talent}.json に、未畳み込みの日次ジャーナル（.journal.jsonl）を重ねて返す。
+// ジャーナルは畳み込み直後は存在しない（404は想定内）。
+async function loadTalentHistoryFull(talent: string): Promise<{ data: TalentHistory | null; failed: boolean }> {
+  const [base, journal] = await Promise.all([
+    fetchJsonWithRetry<AllHistory | CompactTalentHistory>(
+      `${HISTORY_BASE_URL}/history_${encodeURIComponent(talent)}.json`
+    ),
+    fetchWithRetry(
+      `${HISTORY_BASE_URL}/history_${encodeURIComponent(talent)}.journal.jsonl`,
+      async res => parseHistoryJournal(await res.text())
+    ),
+  ])
+  const failed = base.failed || journal.failed
+  const history = isCompactHistory(base.data)
+    ? expandCompactHistory(base.data)
+    : base.data?.[talent] ?? null
+  if (!journal.data?.length) return { data: history, failed }
+  return { data: applyHistoryJournal(history ?? { _channel_stats: {} }, journal.data), failed }
+}
+
+function isCompactHistory(data: unknown): data is CompactTalentHistory {
+  return (data as CompactTalentHistory | null)?.format === 'rkpfr-history'
+}
+
+// 列指向コンパクト形式を従来の { _channel_stats, [動画ID]: { records } } 形式に展開する。
+// 以降の集計関数は従来形式のまま扱える。version 3（変化分のみ）は前方補完して展開する。
+function expandCompactHistory(doc: CompactTalentHistory): TalentHistory {
+  const { dates } = doc
+  const sparse = doc.version >= 3
+  const col = (values: (number | null)[]) => sparse ? decodeRuns(values) : values
+  const cs = { s: col(doc.cs.s), v: col(doc.cs.v), n: col(doc.cs.n) }
+  const channelStats: Record<string, ChannelStats> = {}
+  for (let i = 0; i < dates.length; i++) {
+    if (cs.s[i] === null) continue
+    channelStats[dates[i]] = { 登録者数: cs.s[i] ?? 0, 総再生数: cs.v[i] ?? 0, 動画数: cs.n[i] ?? 0 }
+  }
+
+  const result: TalentHistory = { _channel_stats: channelStats }
+  for (const [vid_id, raw] of Object.entries(doc.videos)) {
+    const v = { v: col(raw.v), l: col(raw.l), c: col(raw.c) }
+    const records: Record<string, VideoRecord> = {}
+    for (let pos = 0; pos < v.v.length; pos++) {
+      const views = v.v[pos]
+      if (views === null) continue
+      records[dates[raw.o + pos]] = { 再生数: views, 高評価数: v.l[pos] ?? 0, コメント数: v.c[pos] ?? 0 }
+    }
+    result[vid_id] = { タイトル: raw.ti, 公開日: raw.pd, type: raw.ty, records }
+  }
+  return result
+}
+
+// 負の数 -k を直前の値 k 個に展開する（history_store.py の decode_runs と同じ）。
+function decodeRuns(values: (number | null)[]): (number | null)[] {
+  const out: (number | null)[] = []
+  for (const value of values) {
+    if (value !== null && value < 0) {
+      const prev = out[out.length - 1]
+      for (let k = 0; k < -value; k++) out.push(prev)
+    } else {
+      out.push(value)
+    }
+  }
+  return out
+}
+
+function parseHistoryJournal(text: string): HistoryJournalEntry[] {
+  const entries: HistoryJournalEntry[] = []
+  for (const line of text.split('\n')) {
+    if (!line.trim()) continue
+    try {
+      entries.push(JSON.parse(line) as HistoryJournalEntry)
+    } catch {
+      // 書き込み途中で壊れた行は読み飛ばす（auto_check.py側と同じ扱い）
+    }
+  }
+  return entries
+}
+
+// ジャーナルの各行を行順に反映する（同日は後勝ち）。
+// ff の行は前日（それより前の最新の日付）の記録で前方補完する（history_store.py の journal_rows と同じ）。
+function applyHistoryJournal(history: TalentHistory, entries: HistoryJournalEntry[]): TalentHistory {
+  const channelStats = history._channel_stats
+  const byDate = new Map<string, Record<string, [number, number, number]>>()
+  for (const entry of entries) {
+    if (entry.cs) {
+      const [s, v, n] = entry.cs
+      channelStats[entry.date] = { 登録者数: s, 総再生数: v, 動画数: n }
+    }
+    for (const [vid_id, m] of Object.entries(entry.m ?? {})) {
+      const vid: VideoHistoryEntry = (history[vid_id] as VideoHistoryEntry | undefined)
+        ?? { タイトル: vid_id, 公開日: '', type: 'Movie', records: {} }
+      if (m.ti !== undefined) vid.タイトル = m.ti
+      if (m.pd !== undefined) vid.公開日   = m.pd
+      if (m.ty !== undefined) vid.type     = m.ty
+      history[vid_id] = vid
+    }
+
+    let rows = entry.r
+    if (entry.ff) {
+      const before = [...byDate.keys()].filter(d => d < entry.date).sort().at(-1)
+      const missing = new Set(entry.x ?? [])
+      rows = {}
+      for (const [vid_id, values] of Object.entries(before ? byDate.get(before)! : {})) {
+        if (!missing.has(vid_id)) rows[vid_id] = values
+      }
+      Object.assign(rows, entry.r)
+    }
+    byDate.set(entry.date, { ...(byDate.get(entry.date) ?? {}), ...rows })
+
+    for (const [vid_id, [views, likes, comments]] of Object.entries(rows)) {
+      const vid: VideoHistoryEntry = (history[vid_id] as VideoHistoryEntry | undefined)
+        ?? { タイトル: vid_id, 公開日: '', type: 'Movie', records: {} }
+      vid.records[entry.date] = { 再生数: views, 高評価数: likes, コメント数: comments }
+      history[vid_id] = vid
+    }
+  }
+  return history
+}
+
+// グラフ用に間引いた動画別の再生数推移（series_{talent}.json）。
+// 生成前のタレントでは404になり、その場合は履歴から組み立てる（呼び出し側でフォールバック）。
+export async function loadTalentSeries(talent: string): Promise<TalentSeries | null> {
+  const res = await fetchDataJson<TalentSeries>(`series_${talent}.json`)
+  return res.data?.format === 'rkpfr-series' ? res.data : null
+}
+
+// 動画別の伸びの指標（analytics_{talent}.json）。生成前のタレントでは null。
+export async function loadTalentAnalytics(talent: string): Promise<TalentAnalytics | null> {
+  const res = await fetchDataJson<TalentAnalytics>(`analytics_${talent}.json`)
+  return res.data?.format === 'rkpfr-analytics' ? res.data : null
+}
+
+// 差分符号化された配列を累積して元の値に戻す。
+function decodeDelta(deltas: number[]): number[] {
+  const out: number[] = []
+  let acc = 0
+  for (const d of deltas) {
+    acc += d
+    out.push(acc)
+  }
+  return out
 }
 
 // comments_*.json は収集対象外のタレントが多く404が正常に発生する（想定内）。
 export async function loadTalentComments(talent: string): Promise<ChannelComments> {
-  return (await fetchJsonWithRetry<ChannelComments>(
-    `${HISTORY_BASE_URL}/comments_${encodeURIComponent(talent)}.json`
-  )).data ?? {}
+  return (await fetchDataJson<ChannelComments>(`comments_${talent}.json`)).data ?? {}
 }
 
 // ----------------------------------------------------------------
@@ -178,6 +436,35 @@ export function buildDashboardData(summary: DashboardSummary, flags: VideoFlags
   return { singerData, videoData, n_date }
 }
 
+// サマリーの期間別ランキング（window 日間の伸びの上位のみ）を表示用に変換する。
+// rankings の無い（導入前の）サマリーや、その期間が無ければ null。
+export function buildWindowRankings(summary: DashboardSummary, window: number) {
+  const key = String(window)
+  const rankings = summary.rankings
+  if (!rankings?.videos[key] || !rankings.channels[key]) return null
+
+  const channels = rankings.channels[key]
+  const singerData = {
+    subscribers: channels.subscribers.map(e => ({ talent: e.t, value: e.n, diff: e.d, rate: rate(e.n, e.d) })),
+    views:       channels.views.map(e => ({ talent: e.t, value: e.n, diff: e.d, rate: rate(e.n, e.d) })),
+  }
+
+  const toVideoRows = (vtype: VideoType, metric: RankingVideoMetric): WindowRankItem[] =>
+    (rankings.videos[key][vtype]?.[metric] ?? []).map(e => ({
+      talent: e.t, vid_id: e.id, title: e.ti, value: e.n, diff: e.d, rate: rate(e.n, e.d),
+    }))
+  const videoData = {} as Record<VideoType, Record<RankingVideoMetric, WindowRankItem[]>>
+  for (const vtype of ['Movie', 'Short', 'LiveArchive'] as VideoType[]) {
+    videoData[vtype] = {
+      views:    toVideoRows(vtype, 'views'),
+      likes:    toVideoRows(vtype, 'likes'),
+      comments: toVideoRows(vtype, 'comments'),
+    }
+  }
+
+  return { base: rankings.base[key], singerData, videoData }
+}
+
 export function buildStatsData(summary: DashboardSummary): { date: string; subs: number; views: number }[] {
   const dateMap = new Map<string, { subs: number; views: number }>()
 
@@ -520,3 +807,39 @@ export function buildVelocityCurveData(
     .sort((a, b) => b.公開日.localeCompare(a.公開日))
     .slice(0, maxVideos)
 }
+
+// buildVelocityCurveData の series_{talent}.json 版（全履歴を走査しない）。
+// 直近28日より前の区間は間引かれているが、曲線の形は保たれる（history_series.py 参照）。
+export function buildVelocityCurveDataFromSeries(
+  series: TalentSeries,
+  talentName: string,
+  flags: VideoFlags = {},
+  maxVideos = 10,
+  maxDays = 60
+): VelocityCurveItem[] {
+  if (!series.base) return []
+  const baseTime = new Date(series.base).getTime()
+
+  const items: VelocityCurveItem[] = []
+  const candidates = Object.entries(series.videos)
+    .filter(([vid_id, v]) => v.pd && (flags[talentName]?.[vid_id] ?? v.ty ?? 'Movie') === 'Movie')
+    .sort(([, a], [, b]) => b.pd.localeCompare(a.pd))
+
+  for (const [vid_id, v] of candidates) {
+    if (items.length >= maxVideos) break
+    const pubTime = new Date(v.pd).getTime()
+    const days = decodeDelta(v.d)
+    const views = decodeDelta(v.v)
+
+    const curve: VelocityCurvePoint[] = []
+    for (let i = 0; i < days.length; i++) {
+      const elapsed = Math.round((baseTime + days[i] * 86400000 - pubTime) / 86400000)
+      if (elapsed < 0 || elapsed > maxDays) continue
+      curve.push({ day: elapsed, views: views[i] })
+    }
+
+    if (curve.length < 2) continue
+    items.push({ vid_id, title: v.ti || vid_id, 公開日: v.pd, curve })
+  }
+  return items
+}